@@ -6,9 +6,9 @@ class Auth:
         self.jwt = JWTManager(app)
 
     @staticmethod
-    def create_access_token(identity, expires_delta=timedelta(minutes=30)):
-        """Create an access token."""
-        return jwt_create_access_token(identity=identity, expires_delta=expires_delta)
+    def create_access_token(identity, expires_delta=timedelta(minutes=30), additional_claims=None):
+        """Create an access token, optionally carrying additional claims."""
+        return jwt_create_access_token(identity=identity, expires_delta=expires_delta, additional_claims=additional_claims)
 
     @staticmethod
     def create_refresh_token(identity):
@@ -1,10 +1,15 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 from urllib.parse import quote
 from sqlalchemy import MetaData
+from app.utils.metrics import LatencyHistogram
+from app.config.query_index_audit import QueryIndexAudit
 
 # Load environment variables from a .env file
 load_dotenv()
@@ -23,17 +28,114 @@ database = os.environ.get("DB_NAME")
 # Construct the database URI
 DATABASE_URI = f"postgresql://{username}:{password}@{host}:{port}/{database}"
 
+# Engine / connection pool profile. Every knob can be overridden from the environment.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))  # seconds
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))  # 0 disables the timeout
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+DB_INDEX_AUDIT = os.getenv("DB_INDEX_AUDIT", "0") == "1"  # log queries that are not index-backed (development only)
+
+
+class PoolMetrics:
+    """Thread-safe counters describing how long callers wait for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_latency = LatencyHistogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, seconds):
+        """Record a successful checkout that took `seconds` to obtain a connection."""
+        self.checkout_latency.observe(seconds)
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_timeout(self, seconds):
+        """Record a checkout that gave up after waiting `seconds` for a connection."""
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self, pool):
+        """Return live pool occupancy together with the accumulated wait statistics."""
+        with self._lock:
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait_seconds, self.max_wait_seconds
+        return {
+            'pool_size': pool.size(),
+            'max_overflow': DB_MAX_OVERFLOW,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'total_wait_ms': round(total_wait * 1000.0, 3),
+            'max_wait_ms': round(max_wait * 1000.0, 3),
+            'checkout_latency': self.checkout_latency.snapshot()
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout(time.perf_counter() - started)
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+connect_args = {'connect_timeout': DB_CONNECT_TIMEOUT}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args['options'] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
 # Create the SQLAlchemy engine.
-engine = create_engine(DATABASE_URI, echo=True)
+engine = create_engine(
+    DATABASE_URI,
+    echo=DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args
+)
+
+if DB_INDEX_AUDIT:
+    query_index_audit = QueryIndexAudit(engine)
+
+
+def get_pool_status():
+    """Return live connection pool statistics for the shared engine."""
+    return pool_metrics.snapshot(engine.pool)
 
 # Create a declarative base class for your ORM models.
 Base = declarative_base()
 
-# Create a session factory bound to the engine.
-session_factory = sessionmaker(bind=engine)
+# Create a session factory bound to the engine. Objects stay loaded after commit so the
+# request boundary commit does not trigger refresh queries.
+session_factory = sessionmaker(bind=engine, expire_on_commit=False)
 
 # Create a scoped session to handle thread-local sessions.
 scoped_session_factory = scoped_session(session_factory)
 
 # Optionally, specify the default schema here if you want all tables to use it
-metadata = MetaData(schema="app")
\ No newline at end of file
+metadata = MetaData(schema="app")
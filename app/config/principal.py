@@ -0,0 +1,58 @@
+import os
+from functools import wraps
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from app.v1.repository.UsersRepository import UsersRepository, Principal
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the principal loader
+logger = LogConfig.setup_logger(__name__)
+
+users_repository = UsersRepository(scoped_session_factory)
+
+# When enabled, access tokens carry the principal as a claim and authorization needs no
+# database hit at all. Role changes then take effect when the token is next refreshed.
+AUTH_EMBED_CLAIMS = os.getenv("AUTH_EMBED_CLAIMS", "0") == "1"
+PRINCIPAL_CLAIM = 'principal'
+
+def principal_claims(principal):
+    """Return the additional JWT claims describing `principal`, or None when embedding is disabled."""
+    if not AUTH_EMBED_CLAIMS or principal is None:
+        return None
+    claims = principal._asdict()
+    del claims['id']  # already carried by the token identity
+    return {PRINCIPAL_CLAIM: claims}
+
+def load_principal():
+    """Resolve the principal of the current JWT once per request and keep it on flask.g."""
+    if 'current_user' in g:
+        return g.current_user
+
+    user_id = get_jwt_identity()
+    claims = get_jwt().get(PRINCIPAL_CLAIM) if AUTH_EMBED_CLAIMS else None
+    if claims:
+        principal = Principal(id=int(user_id), **claims)
+    else:
+        principal = users_repository.get_principal(user_id)
+    g.current_user = principal
+    return principal
+
+def require_role(*roles):
+    """
+    Load the current principal into g.current_user and reject the request with 403 unless
+    the user exists and, when roles are given, has one of them. Stack under @jwt_required().
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                principal = load_principal()
+            except Exception as e:
+                logger.error(f"Error loading user principal: {e}")
+                return jsonify({'error': 'An error occurred while loading the user'}), 500
+            if not principal or (roles and principal.role not in roles):
+                return jsonify({'error': 'Unauthorized access'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
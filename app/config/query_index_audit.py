@@ -0,0 +1,76 @@
+import threading
+from sqlalchemy import event
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the index audit
+logger = LogConfig.setup_logger(__name__)
+
+class QueryIndexAudit:
+    """
+    Explains every distinct statement executed on an engine and records the ones that
+    PostgreSQL can only answer with a sequential scan.
+
+    Plans are produced with enable_seqscan turned off, so the planner picks any usable index
+    regardless of table size; a Seq Scan that survives means no index backs that access path.
+    Unfiltered scans outside a join (reading a whole table on purpose) are not reported.
+    """
+
+    AUDITED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+    def __init__(self, engine, log_findings=True):
+        self.log_findings = log_findings
+        self.findings = {}
+        self._explained = set()
+        self._lock = threading.Lock()
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self.engine = engine
+
+    def remove(self):
+        """Stop auditing the engine."""
+        event.remove(self.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(self.AUDITED_STATEMENTS):
+            return
+        with self._lock:
+            if statement in self._explained:
+                return
+            self._explained.add(statement)
+
+        seq_scan_tables = self._explain(cursor.connection, statement, parameters)
+        if seq_scan_tables:
+            with self._lock:
+                self.findings[statement] = seq_scan_tables
+            if self.log_findings:
+                logger.warning(f"Query is not index-backed (sequential scan on {', '.join(seq_scan_tables)}): {statement}")
+
+    def _explain(self, dbapi_connection, statement, parameters):
+        """Return the tables the statement would sequentially scan, inside a savepoint."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT query_index_audit")
+            try:
+                cursor.execute("SET enable_seqscan = off")
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = cursor.fetchone()[0]
+                cursor.execute("RESET enable_seqscan")
+                cursor.execute("RELEASE SAVEPOINT query_index_audit")
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT query_index_audit")
+                cursor.execute("RELEASE SAVEPOINT query_index_audit")
+                logger.error(f"Error explaining statement for index audit: {e}")
+                return []
+        finally:
+            cursor.close()
+        return sorted(self._seq_scan_tables(plan[0]['Plan']))
+
+    @classmethod
+    def _seq_scan_tables(cls, node, in_join=False):
+        tables = set()
+        node_type = node.get('Node Type', '')
+        if node_type == 'Seq Scan' and (in_join or 'Filter' in node):
+            tables.add(node['Relation Name'])
+        in_join = in_join or node_type.endswith('Join') or node_type == 'Nested Loop'
+        for child in node.get('Plans', []):
+            tables |= cls._seq_scan_tables(child, in_join)
+        return tables
@@ -0,0 +1,125 @@
+from contextlib import contextmanager
+from flask import jsonify
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the unit of work
+logger = LogConfig.setup_logger(__name__)
+
+AFTER_COMMIT_CALLBACKS = 'after_commit_callbacks'
+AFTER_ROLLBACK_CALLBACKS = 'after_rollback_callbacks'
+
+class UnitOfWork:
+    """
+    Ties the thread-local SQLAlchemy session to the Flask request lifecycle.
+
+    Every repository used while handling a request shares the same session, and therefore
+    a single pooled connection. Repositories only flush their changes; the transaction is
+    committed once the view has produced a successful response and rolled back otherwise.
+    """
+
+    def __init__(self, app, session_factory=scoped_session_factory):
+        self.session_factory = session_factory
+        app.after_request(self._commit_or_rollback)
+        app.teardown_request(self._remove_session)
+
+    def _commit_or_rollback(self, response):
+        """Commit the request transaction for successful responses, roll it back otherwise."""
+        if not self.session_factory.registry.has():
+            return response
+
+        session = self.session_factory()
+        if response.status_code >= 400:
+            self._rollback(session)
+            return response
+
+        try:
+            session.commit()
+        except Exception as e:
+            self._rollback(session)
+            logger.error(f"Error committing request transaction: {e}")
+            error_response = jsonify({'error': 'An error occurred while saving changes'})
+            error_response.status_code = 500
+            return error_response
+        self._run_after_commit(session)
+        return response
+
+    def _remove_session(self, exception=None):
+        """Release the request session and return its connection to the pool."""
+        self.session_factory.remove()
+
+    @staticmethod
+    def release(session_factory=scoped_session_factory):
+        """
+        Commit the current request's work so far and return its connection to the pool, e.g.
+        before a slow outbound call that should not hold a pooled connection idle in
+        transaction. Later repository calls start a new transaction on a fresh session.
+        """
+        if not session_factory.registry.has():
+            return
+        session = session_factory()
+        try:
+            session.commit()
+        except Exception:
+            UnitOfWork._rollback(session)
+            session_factory.remove()
+            raise
+        UnitOfWork._run_after_commit(session)
+        session_factory.remove()
+
+    @staticmethod
+    def after_commit(callback, session_factory=scoped_session_factory):
+        """
+        Run `callback` once the current transaction has committed, e.g. to delete files that
+        the transaction stopped referencing. Callbacks are discarded if it rolls back instead.
+        """
+        session = session_factory()
+        session.info.setdefault(AFTER_COMMIT_CALLBACKS, []).append(callback)
+
+    @staticmethod
+    def after_rollback(callback, session_factory=scoped_session_factory):
+        """
+        Run `callback` if the current transaction rolls back, e.g. to delete files written for
+        rows that will never exist. Callbacks are discarded if it commits instead.
+        """
+        session = session_factory()
+        session.info.setdefault(AFTER_ROLLBACK_CALLBACKS, []).append(callback)
+
+    @staticmethod
+    def _rollback(session):
+        session.info.pop(AFTER_COMMIT_CALLBACKS, None)
+        callbacks = session.info.pop(AFTER_ROLLBACK_CALLBACKS, [])
+        session.rollback()
+        UnitOfWork._run_callbacks(callbacks, 'after-rollback')
+
+    @staticmethod
+    def _run_after_commit(session):
+        session.info.pop(AFTER_ROLLBACK_CALLBACKS, None)
+        UnitOfWork._run_callbacks(session.info.pop(AFTER_COMMIT_CALLBACKS, []), 'after-commit')
+
+    @staticmethod
+    def _run_callbacks(callbacks, kind):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error running {kind} callback: {e}")
+
+    @staticmethod
+    @contextmanager
+    def scope(session_factory=scoped_session_factory):
+        """
+        Run a block of repository calls as one transaction outside a request
+        (CLI commands, background workers).
+        """
+        session = session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            UnitOfWork._rollback(session)
+            raise
+        else:
+            UnitOfWork._run_after_commit(session)
+        finally:
+            session_factory.remove()
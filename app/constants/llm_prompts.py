@@ -32,3 +32,23 @@ You are EduPal, a chatbot that assists parents with questions about their studen
 
 Using the provided information and the parent's question, generate a clear answer that directly addresses the parent's query. If the provided information is empty, output a response stating that the requested information is not available. Your output must be only the final answer (with no additional explanation, additional heading, internal reasoning, or meta-information) and formatted in markdown for display in the chatbot UI.
 """
+
+CONVERSATION_SUMMARY_PROMPT = """
+**Conversation Summary Prompt for EduPal Chatbot**
+
+You maintain the memory of an ongoing conversation between a parent and EduPal, a chatbot that answers questions about their child's school records. Update the summary below with the new turns so that EduPal can continue the conversation without seeing them again.
+
+**Instructions:**
+
+1. Keep the facts the parent asked about and the key figures, dates and conclusions EduPal gave (attendance, grades, behaviour, activities), and any preferences or concerns the parent expressed.
+2. Drop greetings, repetition and formatting. Prefer the newest information when turns disagree.
+3. Write at most {max_words} words of plain prose in the third person ("The parent asked...").
+
+**Current Summary:**
+{summary}
+
+**New Turns:**
+{turns}
+
+Output only the updated summary, without any heading or explanation.
+"""
@@ -1,8 +1,5 @@
 
-SENTIMENT_ANALYSIS_PROMPT = """
-You are an AI assistant. Your task is to analyze the sentiment of the given text describing a student's behavior as observed by a parent or teacher. Based on the text, classify it into an appropriate behavior type and provide a sentiment score that is a number between -1 (very negative) and 1 (very positive).
-
-Below are some sample behavior types and their corresponding sentiment scores for reference:
+BEHAVIOR_TYPE_EXAMPLES = """Below are some sample behavior types and their corresponding sentiment scores for reference:
 - "Positive": 0.85
 - "Classroom Participation": 0.85
 - "Homework Completion": 0.90
@@ -24,7 +21,12 @@ Below are some sample behavior types and their corresponding sentiment scores fo
 - "Helpful": 0.85
 - "Cheating": -1.00
 - "Active Participation": 0.75
+"""
+
+SENTIMENT_ANALYSIS_PROMPT = """
+You are an AI assistant. Your task is to analyze the sentiment of the given text describing a student's behavior as observed by a parent or teacher. Based on the text, classify it into an appropriate behavior type and provide a sentiment score that is a number between -1 (very negative) and 1 (very positive).
 
+""" + BEHAVIOR_TYPE_EXAMPLES + """
 Text: "{text}"
 
 Response Format:
@@ -35,3 +37,18 @@ Response Format:
 
 IMPORTANT: Only output the JSON object without any additional explanation or text.
 """
+
+BATCH_SENTIMENT_ANALYSIS_PROMPT = """
+You are an AI assistant. Your task is to analyze the sentiment of each of the texts below, every one describing a student's behavior as observed by a parent or teacher. For each text, classify it into an appropriate behavior type and provide a sentiment score that is a number between -1 (very negative) and 1 (very positive). Judge every text on its own.
+
+""" + BEHAVIOR_TYPE_EXAMPLES + """
+Texts (a JSON array of objects with an "id" and a "text"):
+{texts}
+
+Response Format:
+[
+  {{"id": <id>, "behavior_type": "<behavior_type>", "sentiment_score": <sentiment_score>}}
+]
+
+IMPORTANT: Output exactly one object per text, with the same "id", as a single JSON array without any additional explanation or text.
+"""
@@ -0,0 +1,22 @@
+DEFAULT_AUDIO_MIME_TYPE = 'application/octet-stream'
+
+# (offset, signature, mime type) for the audio containers teachers upload in practice
+AUDIO_SIGNATURES = (
+    (0, b'RIFF', 'audio/wav'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'\xff\xfb', 'audio/mpeg'),
+    (0, b'\xff\xf3', 'audio/mpeg'),
+    (0, b'\xff\xf2', 'audio/mpeg'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'fLaC', 'audio/flac'),
+    (0, b'\x1aE\xdf\xa3', 'audio/webm'),
+    (4, b'ftyp', 'audio/mp4'),
+)
+
+
+def sniff_audio_mime_type(header):
+    """Guess an audio MIME type from the first bytes of a file, falling back to octet-stream."""
+    for offset, signature, mime_type in AUDIO_SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            return mime_type
+    return DEFAULT_AUDIO_MIME_TYPE
@@ -0,0 +1,48 @@
+import threading
+
+
+class LatencyHistogram:
+    """
+    A small thread-safe latency histogram with fixed millisecond buckets.
+
+    Observations are recorded in seconds (as returned by time.perf_counter deltas)
+    and reported in milliseconds so the numbers can be read directly off a dashboard.
+    """
+
+    DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self._lock = threading.Lock()
+        self._bounds = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+
+    def observe(self, seconds):
+        """Record a single observation expressed in seconds."""
+        elapsed_ms = seconds * 1000.0
+        index = len(self._bounds)
+        for i, bound in enumerate(self._bounds):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def snapshot(self):
+        """Return a JSON-serialisable view of the histogram."""
+        with self._lock:
+            counts = list(self._counts)
+            count, sum_ms, max_ms = self._count, self._sum_ms, self._max_ms
+        buckets = {f"le_{bound}ms": counts[i] for i, bound in enumerate(self._bounds)}
+        buckets['gt_max'] = counts[-1]
+        return {
+            'count': count,
+            'avg_ms': round(sum_ms / count, 3) if count else 0.0,
+            'max_ms': round(max_ms, 3),
+            'buckets': buckets
+        }
@@ -0,0 +1,57 @@
+import base64
+import json
+import os
+from datetime import datetime
+from sqlalchemy import tuple_
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) keyset position as an opaque URL-safe token."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a token produced by encode_cursor back into (created_at, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def page_size(limit):
+    """Clamp a requested page size to [1, PAGE_SIZE_MAX], defaulting to PAGE_SIZE_DEFAULT."""
+    if not limit:
+        return PAGE_SIZE_DEFAULT
+    return max(1, min(int(limit), PAGE_SIZE_MAX))
+
+
+def paginate(query, created_at_column, id_column, cursor=None, limit=None):
+    """
+    Return one page of `query`, newest first, as (items, next_cursor).
+
+    Pages are addressed by the (created_at, id) of the last row seen rather than an offset,
+    so each page is a bounded index range scan however deep the client pages. created_at must
+    be NOT NULL: a NULL sorts outside the keyset comparison. next_cursor is None on the last page.
+    """
+    size = page_size(limit)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_at_column, id_column) < tuple_(created_at, row_id))
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(size + 1).all()
+
+    items = rows[:size]
+    next_cursor = None
+    if len(rows) > size:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key))
+    return items, next_cursor
@@ -0,0 +1,8 @@
+import json
+
+CHARS_PER_TOKEN = 4  # rough average for English text with Llama/GPT-style tokenizers
+
+def estimate_tokens(value):
+    """Cheap, tokenizer-free estimate of the prompt tokens `value` takes (non-strings are measured as JSON)."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str, separators=(',', ':'))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A bounded, thread-safe in-process cache with least-recently-used eviction and a
+    per-entry time to live.
+
+    Entries expire `ttl_seconds` after they were stored; once `max_size` entries are held
+    the least recently read or written entry is evicted to make room.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_size=1024, ttl_seconds=60.0):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for `key`, or `default` when absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, self._MISSING)
+            if entry is self._MISSING or entry[0] <= now:
+                if entry is not self._MISSING:
+                    del self._entries[key]
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store `value` under `key`, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key):
+        """Drop `key` from the cache if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a JSON-serialisable view of the cache counters."""
+        with self._lock:
+            hits, misses = self._hits, self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': hits,
+                'misses': misses,
+                'evictions': self._evictions,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0
+            }
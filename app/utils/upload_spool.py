@@ -0,0 +1,66 @@
+import hashlib
+import os
+import tempfile
+
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(1024 * 1024)))  # spill to disk beyond this
+UPLOAD_COPY_CHUNK_SIZE = 64 * 1024
+UPLOAD_HEADER_BYTES = 16  # leading bytes kept for content sniffing
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds its size cap while being spooled."""
+
+
+class SpooledUpload:
+    """An upload copied into a temporary spool, along with its size, SHA-256 and leading bytes."""
+
+    def __init__(self, file, size, sha256, header):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.header = header
+
+    def read(self):
+        """Return the whole spooled content."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def spool_upload(stream, max_bytes, memory_bytes=UPLOAD_SPOOL_MEMORY_BYTES):
+    """
+    Copy a binary stream into a SpooledTemporaryFile in fixed-size chunks, hashing as it goes.
+
+    Small uploads stay in memory and larger ones spill to a temporary file, so memory use is
+    bounded by `memory_bytes` plus one chunk. Raises UploadTooLarge as soon as more than
+    `max_bytes` have been read, without consuming the rest of the stream.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+    digest = hashlib.sha256()
+    size = 0
+    header = b''
+    try:
+        while True:
+            chunk = stream.read(UPLOAD_COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+            if len(header) < UPLOAD_HEADER_BYTES:
+                header += chunk[:UPLOAD_HEADER_BYTES - len(header)]
+            digest.update(chunk)
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return SpooledUpload(spool, size, digest.hexdigest(), header)
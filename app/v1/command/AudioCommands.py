@@ -0,0 +1,76 @@
+import hashlib
+import io
+import click
+from flask.cli import AppGroup
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.v1.repository.AudioBlobRepository import AudioBlobRepository
+from app.v1.repository.AudioResourceRepository import AudioResourceRepository
+from app.v1.service.AudioProcessingService import AudioProcessingService
+from app.v1.service.AudioStorageService import BLOB_ORPHAN_GRACE_SECONDS, AudioStorageService
+from app.v1.service.BlobStore import get_blob_store
+
+# Set up a logger for the audio commands
+logger = LogConfig.setup_logger(__name__)
+
+audio_cli = AppGroup('audio', help='Audio resource storage maintenance.')
+
+def build_audio_storage_service():
+    return AudioStorageService(AudioBlobRepository(scoped_session_factory), get_blob_store())
+
+@audio_cli.command('export-blobs')
+@click.option('--batch-size', type=int, default=20, show_default=True, help='Resources moved per transaction.')
+def export_blobs(batch_size):
+    """Move audio still stored inline in app.audio_resources into the blob store."""
+    audio_resource_repository = AudioResourceRepository(scoped_session_factory)
+    service = build_audio_storage_service()
+    exported = 0
+    while True:
+        with UnitOfWork.scope():
+            resource_ids = audio_resource_repository.get_inline_audio_resource_ids(batch_size)
+            for resource_id in resource_ids:
+                audio_data = audio_resource_repository.get_audio_data(resource_id)
+                sha256 = hashlib.sha256(audio_data).hexdigest()
+                resource = audio_resource_repository.get_audio_resource_by_id(resource_id)
+                service.store(io.BytesIO(audio_data), sha256, len(audio_data), resource.mime_type)
+                audio_resource_repository.move_audio_to_blob(resource_id, sha256, len(audio_data))
+        if not resource_ids:
+            break
+        exported += len(resource_ids)
+        click.echo(f"Exported {exported} audio resource(s)...")
+    click.echo(f"Done: {exported} audio resource(s) moved to the blob store. "
+               f"Run VACUUM FULL (or pg_repack) on app.audio_resources to reclaim the space.")
+
+@audio_cli.command('process')
+@click.option('--retry-failed', is_flag=True, help='Also reprocess resources whose processing failed.')
+@click.option('--batch-size', type=int, default=50, show_default=True)
+def process_audio(retry_failed, batch_size):
+    """Process pending audio resources (e.g. after a restart or an export) in this process."""
+    audio_resource_repository = AudioResourceRepository(scoped_session_factory)
+    blob_store = get_blob_store()
+    service = AudioProcessingService(
+        audio_resource_repository,
+        AudioStorageService(AudioBlobRepository(scoped_session_factory), blob_store),
+        blob_store
+    )
+    statuses = ('pending', 'failed') if retry_failed else ('pending',)
+    outcomes = {'ready': 0, 'failed': 0, None: 0}
+    last_id = 0
+    while True:
+        with UnitOfWork.scope():
+            resource_ids = audio_resource_repository.get_audio_resource_ids_by_status(statuses, batch_size, last_id)
+        if not resource_ids:
+            break
+        for resource_id in resource_ids:
+            outcomes[service.process(resource_id, statuses)] += 1
+        last_id = resource_ids[-1]
+    click.echo(f"Processed audio resources: {outcomes['ready']} ready, {outcomes['failed']} failed, {outcomes[None]} skipped.")
+
+@audio_cli.command('gc-blobs')
+@click.option('--orphan-grace', type=int, default=BLOB_ORPHAN_GRACE_SECONDS, show_default=True, metavar='SECONDS',
+              help='Only delete unregistered blob files at least this old.')
+def gc_blobs(orphan_grace):
+    """Delete blobs that no audio resource references any more, and blob files with no row at all."""
+    deleted = build_audio_storage_service().collect_garbage(orphan_grace_seconds=orphan_grace)
+    click.echo(f"Deleted {deleted} unreferenced blob(s).")
@@ -0,0 +1,34 @@
+import time
+import click
+from flask.cli import AppGroup
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.v1.repository.BehaviorRecordsRepository import BehaviorRecordsRepository
+from app.v1.service.LLMClient import llm_client
+from app.v1.service.SentimentScoringService import SentimentScoringService
+
+# Set up a logger for the behaviour commands
+logger = LogConfig.setup_logger(__name__)
+
+behaviour_cli = AppGroup('behaviour', help='Behaviour record maintenance.')
+
+@behaviour_cli.command('score-sentiment')
+@click.option('--retry-failed', is_flag=True, help='Also rescore records whose scoring failed.')
+@click.option('--watch', type=int, default=0, metavar='SECONDS',
+              help='Keep running as a worker, checking for pending records every SECONDS.')
+def score_sentiment(retry_failed, watch):
+    """Score behaviour records whose sentiment is still pending (e.g. after a restart or an LLM outage)."""
+    behavior_records_repository = BehaviorRecordsRepository(scoped_session_factory)
+    service = SentimentScoringService(behavior_records_repository, llm_client)
+    if retry_failed:
+        with UnitOfWork.scope():
+            reset = behavior_records_repository.reset_failed_sentiment()
+        click.echo(f"Reset {reset} failed record(s) to pending.")
+    while True:
+        outcomes = service.drain()
+        click.echo(f"Scored behaviour records: {outcomes['scored']} scored, "
+                   f"{outcomes['retrying']} to retry, {outcomes['failed']} failed.")
+        if not watch:
+            break
+        time.sleep(watch)
@@ -0,0 +1,226 @@
+import datetime
+import os
+import re
+import sys
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app.config.postgres_orm_config import engine, scoped_session_factory
+from app.config.query_index_audit import QueryIndexAudit
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.v1.repository.AcademicRecordsRepository import AcademicRecordsRepository
+from app.v1.repository.ActivitiesRepository import ActivitiesRepository
+from app.v1.repository.AssessmentRepository import AssessmentRepository
+from app.v1.repository.AttendanceRepository import AttendanceRepository
+from app.v1.repository.AudioResourceRepository import AudioResourceRepository
+from app.v1.repository.BehaviorRecordsRepository import BehaviorRecordsRepository
+from app.v1.repository.ChatbotConversationsRepository import ChatbotConversationsRepository
+from app.v1.repository.CommunityForumRepository import CommunityForumRepository
+from app.v1.repository.CommunityPollRepository import CommunityPollRepository
+from app.v1.repository.EventRepository import EventRepository
+from app.v1.repository.NotificationsRepository import NotificationsRepository
+from app.v1.repository.ParentTeacherChatRepository import ParentTeacherChatRepository
+from app.v1.repository.StudentsRepository import StudentsRepository
+from app.v1.repository.TalentProfilesRepository import TalentProfilesRepository
+from app.v1.repository.TimeTableRepository import TimeTableRepository
+from app.v1.repository.UsersRepository import UsersRepository
+
+# Set up a logger for the database commands
+logger = LogConfig.setup_logger(__name__)
+
+database_cli = AppGroup('db', help='Schema migrations and database checks.')
+
+MIGRATIONS_DIR = os.getenv("MIGRATIONS_DIR", os.path.join(os.path.dirname(__file__), '..', '..', '..', 'migrations'))
+MIGRATION_FILE_PATTERN = re.compile(r'^V(\d+)__(\w+)\.sql$')
+NO_TRANSACTION_MARKER = '-- migrate:no-transaction'
+MIGRATION_LOCK_ID = 7303001
+NO_TRANSACTION_ATTEMPTS = int(os.getenv("MIGRATION_NO_TRANSACTION_ATTEMPTS", "3"))  # runs of a no-transaction file before giving up
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)\s+ON\s+(\w+)\.', re.IGNORECASE
+)
+
+def discover_migrations():
+    """Return (version, name, path) for every migration file, ordered by version."""
+    migrations = []
+    for file_name in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, file_name)))
+    return sorted(migrations)
+
+def split_statements(sql):
+    """
+    Split a migration file into statements. Comment lines are dropped and statements are
+    split on semicolons, so migrations should stay plain DDL/DML (no function bodies).
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+def ensure_migrations_table(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS app.schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "name TEXT NOT NULL, "
+        "applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now())"
+    ))
+
+def applied_versions(connection):
+    return {row.version for row in connection.execute(text("SELECT version FROM app.schema_migrations"))}
+
+def drop_invalid_index(connection, statement):
+    """
+    A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind, which IF NOT EXISTS
+    would then skip. Drop it first so the statement builds it again.
+    """
+    match = CONCURRENT_INDEX_PATTERN.search(statement)
+    if not match:
+        return
+    index_name, schema = match.groups()
+    invalid = connection.execute(text(
+        "SELECT 1 FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = :schema AND c.relname = :index_name AND NOT i.indisvalid"
+    ), {'schema': schema, 'index_name': index_name}).scalar()
+    if invalid:
+        logger.warning(f"Dropping invalid index {schema}.{index_name} left by an earlier build")
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{index_name}"))
+
+def apply_migration(version, name, path):
+    """
+    Apply one migration file. Files starting with the no-transaction marker run statement by
+    statement in autocommit mode (required for CREATE INDEX CONCURRENTLY); all others run in
+    a single transaction together with their bookkeeping row. No-transaction files must be
+    safe to re-run: one that fails on a unique violation (e.g. a duplicate written while a
+    unique index was being built) is run again from the top, up to NO_TRANSACTION_ATTEMPTS times.
+    """
+    with open(path) as migration_file:
+        sql = migration_file.read()
+    statements = split_statements(sql)
+
+    if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+        for attempt in range(1, NO_TRANSACTION_ATTEMPTS + 1):
+            try:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                    for statement in statements:
+                        drop_invalid_index(connection, statement)
+                        connection.execute(text(statement))
+                    connection.execute(text("INSERT INTO app.schema_migrations (version, name) VALUES (:version, :name)"),
+                                       {'version': version, 'name': name})
+                return
+            except IntegrityError as e:
+                if attempt == NO_TRANSACTION_ATTEMPTS:
+                    raise
+                logger.warning(f"V{version:03d}__{name} failed on attempt {attempt}, running it again: {e.orig}")
+    else:
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+            connection.execute(text("INSERT INTO app.schema_migrations (version, name) VALUES (:version, :name)"),
+                               {'version': version, 'name': name})
+
+@database_cli.command('migrate')
+def migrate():
+    """Apply pending schema migrations in version order."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_connection:
+        # Serialise concurrent deploys on a session-level advisory lock.
+        lock_connection.execute(text("SELECT pg_advisory_lock(:lock_id)"), {'lock_id': MIGRATION_LOCK_ID})
+        try:
+            ensure_migrations_table(lock_connection)
+            done = applied_versions(lock_connection)
+            pending = [migration for migration in discover_migrations() if migration[0] not in done]
+            if not pending:
+                click.echo("Database schema is up to date.")
+                return
+            for version, name, path in pending:
+                click.echo(f"Applying V{version:03d}__{name} ...")
+                apply_migration(version, name, path)
+                logger.info(f"Applied migration V{version:03d}__{name}")
+            click.echo(f"Applied {len(pending)} migration(s).")
+        finally:
+            lock_connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {'lock_id': MIGRATION_LOCK_ID})
+
+@database_cli.command('status')
+def status():
+    """List migrations and whether they have been applied."""
+    with engine.begin() as connection:
+        ensure_migrations_table(connection)
+        done = applied_versions(connection)
+    for version, name, _ in discover_migrations():
+        click.echo(f"[{'x' if version in done else ' '}] V{version:03d}__{name}")
+
+def repository_read_calls():
+    """Representative calls covering every repository read path, used by `flask db check-indexes`."""
+    users_repository = UsersRepository(scoped_session_factory)
+    students_repository = StudentsRepository(scoped_session_factory)
+    academic_records_repository = AcademicRecordsRepository(scoped_session_factory)
+    activities_repository = ActivitiesRepository(scoped_session_factory)
+    assessment_repository = AssessmentRepository(scoped_session_factory)
+    attendance_repository = AttendanceRepository(scoped_session_factory)
+    audio_resource_repository = AudioResourceRepository(scoped_session_factory)
+    behavior_records_repository = BehaviorRecordsRepository(scoped_session_factory)
+    chatbot_conversations_repository = ChatbotConversationsRepository(scoped_session_factory)
+    community_forum_repository = CommunityForumRepository(scoped_session_factory)
+    community_poll_repository = CommunityPollRepository(scoped_session_factory)
+    event_repository = EventRepository(scoped_session_factory)
+    notifications_repository = NotificationsRepository(scoped_session_factory)
+    parent_teacher_chat_repository = ParentTeacherChatRepository(scoped_session_factory)
+    talent_profiles_repository = TalentProfilesRepository(scoped_session_factory)
+    time_table_repository = TimeTableRepository(scoped_session_factory)
+
+    today = datetime.date.today()
+    conversation_id = '00000000-0000-0000-0000-000000000000'
+    return [
+        (users_repository.get_user_by_id, (1,)),
+        (users_repository.get_user_by_email, ('audit@example.com',)),
+        (users_repository.get_users_by_role, ('teacher',)),
+        (students_repository.get_students_by_class_and_section, ('1', 'A')),
+        (students_repository.get_student_by_id, (1,)),
+        (academic_records_repository.get_records_by_student_id, (1, today, today)),
+        (academic_records_repository.get_records_by_class_and_section, ('1', 'A', today, today)),
+        (activities_repository.get_activities_by_student_id, (1,)),
+        (activities_repository.get_activities_by_class_and_section, ('1', 'A')),
+        (assessment_repository.get_upcoming_assessments, ('1', 'A')),
+        (assessment_repository.get_previous_assessments, ('1', 'A')),
+        (attendance_repository.get_attendance_by_student_id, (1, today.month, today.year)),
+        (attendance_repository.get_attendance_by_class_and_section, ('1', 'A', today.month, today.year)),
+        (audio_resource_repository.get_audio_resources_by_class_and_section, ('1', 'A')),
+        (behavior_records_repository.get_records_by_student_id, (1, today, today)),
+        (behavior_records_repository.get_records_by_class_and_section, ('1', 'A', today, today)),
+        (chatbot_conversations_repository.get_conversation_by_id, (conversation_id,)),
+        (chatbot_conversations_repository.get_conversations_by_user_id, (1,)),
+        (chatbot_conversations_repository.get_last_n_conversations, (1, conversation_id, 1)),
+        (community_forum_repository.get_all_forums, ()),
+        (community_forum_repository.get_replies_by_forum_id, (1,)),
+        (community_poll_repository.get_all_polls, ()),
+        (event_repository.get_upcoming_events, ('1', 'A')),
+        (event_repository.get_previous_events, ('1', 'A')),
+        (notifications_repository.get_notifications_by_user_id, (1,)),
+        (parent_teacher_chat_repository.get_chats_by_teacher_id, (1,)),
+        (parent_teacher_chat_repository.get_chats_by_parent_id, (1,)),
+        (parent_teacher_chat_repository.get_chats_by_teacher_id_parent_id, (1, 1)),
+        (talent_profiles_repository.get_profiles_by_student_id, (1,)),
+        (time_table_repository.get_time_table_by_class_and_section, ('1', 'A')),
+    ]
+
+@database_cli.command('check-indexes')
+def check_indexes():
+    """Report repository queries that PostgreSQL cannot answer from an index."""
+    audit = QueryIndexAudit(engine, log_findings=False)
+    try:
+        with UnitOfWork.scope() as session:
+            for method, args in repository_read_calls():
+                method(*args)
+            session.rollback()
+    finally:
+        audit.remove()
+
+    if not audit.findings:
+        click.echo("All audited repository queries are index-backed.")
+        return
+    click.echo(f"{len(audit.findings)} repository quer{'y is' if len(audit.findings) == 1 else 'ies are'} not index-backed:")
+    for statement, tables in audit.findings.items():
+        click.echo(f"\n- sequential scan on {', '.join(tables)}:\n  {' '.join(statement.split())}")
+    sys.exit(1)
@@ -0,0 +1,37 @@
+import click
+from flask.cli import AppGroup
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.v1.repository.AcademicRecordsRepository import AcademicRecordsRepository
+from app.v1.repository.StudentsRepository import StudentsRepository
+from app.v1.service.GradeImportService import GradeImportService, GradeImportError, GRADE_IMPORT_CHUNK_SIZE, detect_format
+
+# Set up a logger for the grade commands
+logger = LogConfig.setup_logger(__name__)
+
+grades_cli = AppGroup('grades', help='Academic record maintenance.')
+
+@grades_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension.')
+@click.option('--teacher-id', type=int, help='Teacher recorded against every imported grade.')
+@click.option('--chunk-size', type=int, default=GRADE_IMPORT_CHUNK_SIZE, show_default=True, help='Rows per COPY.')
+def import_grades(path, file_format, teacher_id, chunk_size):
+    """Import grades from a CSV or NDJSON file in a single transaction."""
+    academic_records_repository = AcademicRecordsRepository(scoped_session_factory)
+    students_repository = StudentsRepository(scoped_session_factory)
+    service = GradeImportService(academic_records_repository, students_repository, chunk_size=chunk_size)
+    try:
+        file_format = detect_format(path, requested_format=file_format)
+        with open(path, 'rb') as grades_file, UnitOfWork.scope():
+            report = service.import_stream(grades_file, file_format, teacher_id=teacher_id)
+    except GradeImportError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"Read {report['rows_read']} rows: {report['rows_imported']} imported, {report['rows_rejected']} rejected "
+               f"in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s, {report['chunks']} chunks).")
+    for error in report['errors']:
+        click.echo(f"  line {error['line']}: {error['error']}")
+    if report['rows_rejected'] > len(report['errors']):
+        click.echo(f"  ... and {report['rows_rejected'] - len(report['errors'])} more")
@@ -0,0 +1,19 @@
+import click
+from flask.cli import AppGroup
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.v1.repository.LLMCacheRepository import LLMCacheRepository
+
+# Set up a logger for the LLM commands
+logger = LogConfig.setup_logger(__name__)
+
+llm_cli = AppGroup('llm', help='LLM integration maintenance.')
+
+@llm_cli.command('cache-purge')
+@click.option('--all', 'purge_all', is_flag=True, help='Also delete entries that have not expired yet.')
+def purge_cache(purge_all):
+    """Delete expired entries from the persistent LLM response cache."""
+    with UnitOfWork.scope():
+        deleted = LLMCacheRepository(scoped_session_factory).delete_expired(include_unexpired=purge_all)
+    click.echo(f"Deleted {deleted} LLM cache entries.")
@@ -1,50 +1,126 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context, url_for
+from flask_jwt_extended import jwt_required
+from app.v1.repository.AudioBlobRepository import AudioBlobRepository
 from app.v1.repository.AudioResourceRepository import AudioResourceRepository
-from app.v1.repository.UsersRepository import UsersRepository
 from app.v1.repository.StudentsRepository import StudentsRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
-from datetime import datetime
+from app.config.principal import require_role
+from app.config.unit_of_work import UnitOfWork
+from app.utils.media_types import DEFAULT_AUDIO_MIME_TYPE, sniff_audio_mime_type
+from app.utils.upload_spool import UploadTooLarge, spool_upload
+from app.v1.service.AudioProcessingService import AudioProcessingService
+from app.v1.service.AudioStorageService import AudioStorageService
+from app.v1.service.BlobStore import get_blob_store
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.http import quote_etag
 import base64
+import io
+import os
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 audio_resource_bp = Blueprint('audio_resource', __name__)
 audio_resource_repository = AudioResourceRepository(scoped_session_factory)
-users_repository = UsersRepository(scoped_session_factory)
 students_repository = StudentsRepository(scoped_session_factory)
+blob_store = get_blob_store()
+audio_storage_service = AudioStorageService(AudioBlobRepository(scoped_session_factory), blob_store)
+audio_processing_service = AudioProcessingService(audio_resource_repository, audio_storage_service, blob_store)
+
+AUDIO_STREAM_CHUNK_SIZE = int(os.getenv("AUDIO_STREAM_CHUNK_SIZE", "262144"))  # bytes read per chunk
+AUDIO_UPLOAD_MAX_BYTES = int(os.getenv("AUDIO_UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024  # multipart boundaries and metadata fields
+
+def stream_inline_audio_chunks(resource_id, start, stop):
+    """
+    Yield the bytes in [start, stop) of audio still stored inline in the database, one chunk
+    at a time. Each chunk is read in its own short transaction, so a slow client never pins a
+    pooled connection and at most one chunk of the file is held in memory.
+    """
+    offset = start
+    while offset < stop:
+        length = min(AUDIO_STREAM_CHUNK_SIZE, stop - offset)
+        with UnitOfWork.scope():
+            chunk = audio_resource_repository.get_audio_chunk(resource_id, offset, length)
+        if not chunk:
+            break
+        yield bytes(chunk)
+        offset += len(chunk)
 
 class AudioResourceController:
     @staticmethod
     @audio_resource_bp.route('/api/audio_resources', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def create_audio_resource():
-        """Create a new audio resource."""
-        data = request.json
+        """
+        Create a new audio resource. The audio can be sent as a multipart 'file' field (metadata in
+        form fields), as the raw request body (metadata in the query string) or, for older clients,
+        base64-encoded in a JSON body. Uploads are spooled and hashed in chunks as they arrive.
+        """
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            limit = AUDIO_UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+            if request.is_json:
+                limit = limit * 4 // 3  # base64 inflation
+            if request.content_length and request.content_length > limit:
+                return jsonify({'error': f"Audio uploads are limited to {AUDIO_UPLOAD_MAX_BYTES} bytes"}), 413
+            # Also caps bodies sent without a Content-Length (chunked) while they are parsed.
+            request.max_content_length = limit
 
-            audio_data = base64.b64decode(data['audio_data'])
+            if request.mimetype == 'multipart/form-data':
+                fields = request.form.to_dict()
+                upload_file = request.files.get('file')
+                if not upload_file:
+                    return jsonify({'error': "Missing required field: 'file'"}), 400
+                stream = upload_file.stream
+                declared_mime_type = fields.get('mime_type') or upload_file.mimetype
+            elif request.is_json:
+                fields = request.json
+                stream = io.BytesIO(base64.b64decode(fields['audio_data']))
+                declared_mime_type = fields.get('mime_type')
+            else:
+                fields = request.args.to_dict()
+                stream = request.stream
+                declared_mime_type = fields.get('mime_type') or request.mimetype
+            missing = [field for field in ('title', 'class_value', 'section') if not fields.get(field)]
+            if missing:
+                return jsonify({'error': f"Missing required field(s): {', '.join(missing)}"}), 400
 
-            resource_data = {
-                'title': data['title'],
-                'description': data.get('description'),
-                'audio_data': audio_data,
-                'teacher_id': user_id,
-                'class_value': data['class_value'],
-                'section': data['section']
-            }
+            with spool_upload(stream, AUDIO_UPLOAD_MAX_BYTES) as upload:
+                if not upload.size:
+                    return jsonify({'error': 'Audio upload is empty'}), 400
+                if not declared_mime_type or declared_mime_type == DEFAULT_AUDIO_MIME_TYPE:
+                    declared_mime_type = sniff_audio_mime_type(upload.header)
 
-            resource = audio_resource_repository.create_audio_resource(resource_data)
-            return jsonify({'resource_id': resource.id, 'message': 'Audio resource created successfully.'}), 201
+                audio_storage_service.store(upload.file, upload.sha256, upload.size, declared_mime_type)
+                resource_data = {
+                    'title': fields['title'],
+                    'description': fields.get('description'),
+                    'mime_type': declared_mime_type,
+                    'content_sha256': upload.sha256,
+                    'size_bytes': upload.size,
+                    'teacher_id': g.current_user.id,
+                    'class_value': fields['class_value'],
+                    'section': fields['section']
+                }
+                resource = audio_resource_repository.create_audio_resource(resource_data)
+            resource_id = resource.id
+            UnitOfWork.after_commit(lambda: audio_processing_service.submit(resource_id))
+            return jsonify({
+                'resource_id': resource.id,
+                'processing_status': resource.processing_status,
+                'message': 'Audio resource created successfully.'
+            }), 201
         except KeyError as e:
             logger.error(f"Missing required field: {e}")
             return jsonify({'error': f"Missing required field: {e}"}), 400
+        except UploadTooLarge as e:
+            logger.error(f"Rejected audio upload: {e}")
+            return jsonify({'error': str(e)}), 413
+        except RequestEntityTooLarge as e:
+            logger.error(f"Rejected audio upload: {e}")
+            return jsonify({'error': f"Audio uploads are limited to {AUDIO_UPLOAD_MAX_BYTES} bytes"}), 413
         except Exception as e:
             logger.error(f"Error creating audio resource: {e}")
             return jsonify({'error': 'An error occurred while creating the audio resource'}), 500
@@ -52,14 +128,11 @@ class AudioResourceController:
     @staticmethod
     @audio_resource_bp.route('/api/audio_resources', methods=['GET'])
     @jwt_required()
+    @require_role('teacher', 'parent')
     def get_audio_resources():
         """Retrieve audio resources filtered by class value and section."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
-
+            user = g.current_user
             if user.role == 'teacher':
                 class_value = request.args.get('class_value')
                 section = request.args.get('section')
@@ -72,15 +145,23 @@ class AudioResourceController:
                     return jsonify({'error': 'Student not found'}), 404
                 class_value = student.class_value
                 section = student.section
-            else:
-                return jsonify({'error': 'Unauthorized access'}), 403
 
             resources = audio_resource_repository.get_audio_resources_by_class_and_section(class_value, section)
             response = [{
                 'id': resource.id,
                 'title': resource.title,
                 'description': resource.description,
-                'audio_data': base64.b64encode(resource.audio_data).decode('utf-8'),
+                'mime_type': resource.mime_type or DEFAULT_AUDIO_MIME_TYPE,
+                'size_bytes': resource.size_bytes,
+                'content_url': url_for('audio_resource.get_audio_resource_content', resource_id=resource.id),
+                'compact_content_url': url_for(
+                    'audio_resource.get_audio_resource_content', resource_id=resource.id, rendition='compact'
+                ) if resource.compact_sha256 else None,
+                'processing_status': resource.processing_status,
+                'duration_seconds': resource.duration_seconds,
+                'sample_rate': resource.sample_rate,
+                'channels': resource.channels,
+                'waveform': resource.waveform,
                 'teacher_id': resource.teacher_id,
                 'class_value': resource.class_value,
                 'section': resource.section,
@@ -92,25 +173,94 @@ class AudioResourceController:
             logger.error(f"Error retrieving audio resources: {e}")
             return jsonify({'error': 'An error occurred while retrieving audio resources'}), 500
 
+    @staticmethod
+    @audio_resource_bp.route('/api/audio_resources/<int:resource_id>/content', methods=['GET'])
+    @jwt_required()
+    @require_role('teacher', 'parent')
+    def get_audio_resource_content(resource_id):
+        """
+        Stream the audio of a single resource, honouring Range, If-Range and If-None-Match.
+        ?rendition=compact serves the speech-optimised rendition once processing has produced one.
+        """
+        try:
+            row = audio_resource_repository.get_audio_content_info(resource_id)
+            if not row:
+                return jsonify({'error': 'Audio resource not found'}), 404
+            resource, is_inline = row
+            sha256, size, mime_type = resource.content_sha256, resource.size_bytes, resource.mime_type
+            if request.args.get('rendition') == 'compact':
+                if not resource.compact_sha256:
+                    return jsonify({'error': 'Compact rendition not available'}), 404
+                is_inline = False
+                sha256, size, mime_type = resource.compact_sha256, resource.compact_size_bytes, resource.compact_mime_type
+
+            user = g.current_user
+            if user.role == 'parent':
+                student = students_repository.get_student_by_id(user.student_id)
+                if not student or (student.class_value, student.section) != (resource.class_value, resource.section):
+                    return jsonify({'error': 'Unauthorized access'}), 403
+
+            headers = {
+                'Accept-Ranges': 'bytes',
+                'Cache-Control': 'private, no-cache',
+                'Content-Disposition': f'inline; filename="audio_resource_{resource_id}"'
+            }
+            etag = sha256
+            if etag:
+                headers['ETag'] = quote_etag(etag)
+                if request.if_none_match.contains(etag):
+                    return Response(status=304, headers=headers)
+
+            # A Range is only honoured while the client's copy is still current (If-Range), and
+            # multi-range requests are answered with the whole file.
+            start, stop, status = 0, size, 200
+            byte_range = request.range
+            range_is_current = 'If-Range' not in request.headers or (etag and request.if_range.etag == etag)
+            if byte_range and len(byte_range.ranges) == 1 and range_is_current:
+                bounds = byte_range.range_for_length(size)
+                if bounds is None:
+                    headers['Content-Range'] = f"bytes */{size}"
+                    return Response(status=416, headers=headers)
+                start, stop = bounds
+                status = 206
+                headers['Content-Range'] = f"bytes {start}-{stop - 1}/{size}"
+            headers['Content-Length'] = str(stop - start)
+
+            if is_inline:
+                chunks = stream_inline_audio_chunks(resource_id, start, stop)
+            else:
+                chunks = blob_store.iter_range(sha256, start, stop, AUDIO_STREAM_CHUNK_SIZE)
+            return Response(
+                stream_with_context(chunks),
+                status=status,
+                mimetype=mime_type or DEFAULT_AUDIO_MIME_TYPE,
+                headers=headers,
+                direct_passthrough=True
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving audio resource content: {e}")
+            return jsonify({'error': 'An error occurred while retrieving the audio resource'}), 500
+
     @staticmethod
     @audio_resource_bp.route('/api/audio_resources/<int:resource_id>', methods=['DELETE'])
     @jwt_required()
+    @require_role('teacher')
     def delete_audio_resource(resource_id):
         """Delete an audio resource."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
-            resource = audio_resource_repository.get_audio_resource_by_id(resource_id)
-            if not resource:
+            row = audio_resource_repository.get_audio_content_info(resource_id)
+            if not row:
                 return jsonify({'error': 'Audio resource not found'}), 404
+            resource, is_inline = row
 
-            if resource.teacher_id != int(user_id):
+            if resource.teacher_id != g.current_user.id:
                 return jsonify({'error': 'Unauthorized access'}), 403
 
-            audio_resource_repository.delete_audio_resource(resource_id)
+            deleted = audio_resource_repository.delete_audio_resource(resource_id)
+            if deleted and not is_inline:
+                audio_storage_service.release(deleted.content_sha256)
+            if deleted and deleted.compact_sha256:
+                audio_storage_service.release(deleted.compact_sha256)
             return jsonify({'message': 'Audio resource deleted successfully.'}), 200
         except Exception as e:
             logger.error(f"Error deleting audio resource: {e}")
@@ -1,42 +1,157 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.v1.repository.ChatbotConversationsRepository import ChatbotConversationsRepository
-from app.v1.repository.UsersRepository import UsersRepository
+from app.v1.repository.ChatbotConversationSummariesRepository import ChatbotConversationSummariesRepository
 from app.v1.repository.AttendanceRepository import AttendanceRepository
 from app.v1.repository.ActivitiesRepository import ActivitiesRepository
 from app.v1.repository.BehaviorRecordsRepository import BehaviorRecordsRepository
 from app.v1.repository.AcademicRecordsRepository import AcademicRecordsRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
+from app.config.unit_of_work import UnitOfWork
+from app.utils.pagination import InvalidCursor
 from app.constants.intent_classification import INTENT_CLASSIFICATION_PROMPT
 from app.constants.llm_prompts import FINAL_ANSWER_PROMPT
-import requests
-import uuid
+from app.v1.service.LLMClient import LLMError, llm_client
+from app.v1.service.IntentClassifier import intent_classifier
+from app.v1.service.ChatContextBuilder import chat_context_builder
+from app.v1.service.ConversationMemory import ConversationMemory
+import ast
+import json
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 chatbot_conversations_bp = Blueprint('chatbot_conversations', __name__)
 chatbot_conversations_repository = ChatbotConversationsRepository(scoped_session_factory)
-users_repository = UsersRepository(scoped_session_factory)
 attendance_repository = AttendanceRepository(scoped_session_factory)
 activities_repository = ActivitiesRepository(scoped_session_factory)
 behavior_records_repository = BehaviorRecordsRepository(scoped_session_factory)
 academic_records_repository = AcademicRecordsRepository(scoped_session_factory)
+conversation_memory = ConversationMemory(
+    chatbot_conversations_repository, ChatbotConversationSummariesRepository(scoped_session_factory), llm_client
+)
+
+INTENT_TRAINING_EXAMPLES = int(os.getenv("INTENT_TRAINING_EXAMPLES", "2000"))  # logged LLM labels loaded at startup
+CHATBOT_PREFETCH_WORKERS = int(os.getenv("CHATBOT_PREFETCH_WORKERS", "8"))  # shared by all requests; each holds a DB connection
+
+# Loads the student's records an intent answers from, in the shape ChatContextBuilder summarizes.
+INTENT_DATA_LOADERS = {
+    'attendance': lambda student_id: [
+        {'date': record.attendance_date, 'status': record.status, 'notes': record.notes}
+        for record in attendance_repository.get_attendance_by_student_id(student_id)
+    ],
+    'activity': lambda student_id: [
+        {'activity_name': activity.activity_name, 'badge': activity.badge, 'description': activity.description}
+        for activity in activities_repository.get_activities_by_student_id(student_id)
+    ],
+    'behaviour': lambda student_id: [
+        {'behavior_type': record.behaviour_type, 'sentiment_score': record.sentiment_score, 'comment': record.comment, 'date': record.record_date}
+        for record in behavior_records_repository.get_records_by_student_id(student_id)
+    ],
+    'grade': lambda student_id: [
+        {'subject': grade.subject, 'grade': grade.grade, 'date': grade.record_date}
+        for grade in academic_records_repository.get_records_by_student_id(student_id)
+    ],
+}
+prefetch_executor = ThreadPoolExecutor(max_workers=CHATBOT_PREFETCH_WORKERS, thread_name_prefix='chatbot-prefetch')
+
+def load_intent_data(intent, student_id):
+    """Load an intent's records in a transaction of their own (for the prefetch pool)."""
+    with UnitOfWork.scope():
+        return INTENT_DATA_LOADERS[intent](student_id)
+
+def prefetch_intent_data(student_id):
+    """Start loading every intent's records on the prefetch pool. Returns {intent: future}."""
+    return {intent: prefetch_executor.submit(load_intent_data, intent, student_id) for intent in INTENT_DATA_LOADERS}
+
+def parse_intent_response(text):
+    """Return the intent named in an INTENT_CLASSIFICATION_PROMPT answer. Raises ValueError if it names none."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = ast.literal_eval(text.strip())
+    intent = data.get('intent') if isinstance(data, dict) else None
+    if not intent:
+        raise ValueError("Intent not found in response")
+    return intent
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event carrying `data` as JSON."""
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(data, default=str)}\n\n"
+
+def stream_answer(messages, conversation_data):
+    """
+    Relay the answer to the client as Server-Sent Events while the model generates it and store
+    the conversation once the answer is complete. Upstream errors before the first fragment
+    still produce an ordinary 500; later ones are sent as an `error` event.
+    """
+    fragments = llm_client.stream_chat_completion(messages, purpose='answer')
+    try:
+        first_fragment = next(fragments, '')
+    except LLMError as e:
+        logger.error(f"Error calling chatbot API for final response: {e}")
+        return jsonify({'error': 'An error occurred while calling the chatbot API for final response'}), 500
+
+    conversation_id = conversation_data['conversation_id']
+
+    def generate():
+        parts = []
+        try:
+            yield sse_event({'conversation_id': conversation_id}, 'start')
+            if first_fragment:
+                parts.append(first_fragment)
+                yield sse_event({'delta': first_fragment})
+            for fragment in fragments:
+                parts.append(fragment)
+                yield sse_event({'delta': fragment})
+        except LLMError as e:
+            logger.error(f"Chatbot answer stream for conversation {conversation_id} failed: {e}")
+            yield sse_event({'error': 'An error occurred while calling the chatbot API for final response'}, 'error')
+            return
+        except GeneratorExit:
+            # The client went away: stop generating and keep the unfinished answer out of the history.
+            logger.info(f"Client disconnected from the answer stream for conversation {conversation_id}")
+            raise
+        finally:
+            fragments.close()
+
+        chatbot_response = ''.join(parts)
+        try:
+            with UnitOfWork.scope():
+                chatbot_conversations_repository.create_conversation({**conversation_data, 'response': chatbot_response})
+                conversation_memory.schedule_update(conversation_id, conversation_data['user_id'])
+        except Exception as e:
+            logger.error(f"Error storing streamed conversation {conversation_id}: {e}")
+            yield sse_event({'error': 'An error occurred while saving the conversation'}, 'error')
+            return
+        logger.info(f"Conversation with ID: {conversation_id} created successfully.")
+        yield sse_event({'conversation_id': conversation_id, 'response': chatbot_response}, 'done')
+
+    # Deliberately not stream_with_context: the request's session (and its pooled connection)
+    # is released before streaming starts, and the conversation is stored in its own transaction.
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 class ChatbotConversationsController:
     @staticmethod
     @chatbot_conversations_bp.route('/api/chatbot/conversation', methods=['POST'])
     @jwt_required()
+    @require_role()
     def create_conversation():
         """Create a new chatbot conversation."""
         data = request.json
+        prefetched = {}
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+            user_id = user.id
 
             query = data.get('query')
             if not query:
@@ -45,11 +160,8 @@ class ChatbotConversationsController:
             conversation_id = data.get('conversation_id')
 
             if conversation_id:
-                previous_messages = chatbot_conversations_repository.get_last_n_conversations(user_id, conversation_id, 1)
-                messages = [{'role': 'user', 'content': query}]
-                for message in previous_messages:
-                    messages.insert(0, {'role': 'assistant', 'content': message.response})
-                    messages.insert(0, {'role': 'user', 'content': message.query})
+                # Rolling summary plus the last few turns: the prompt stays the same size however long the conversation gets
+                messages = conversation_memory.build_messages(user_id, conversation_id, query)
             else:
                 messages = [{'role': 'user', 'content': query}]
                 conversation_id = uuid.uuid4()
@@ -58,124 +170,92 @@ class ChatbotConversationsController:
             logger.info(f"Starting new conversation with ID: {conversation_id} for user ID: {user_id}")
             print("==========================================")
 
-            # Call the external chatbot API for intent classification
-            intent_classification_prompt = INTENT_CLASSIFICATION_PROMPT.format(query=query)
-            
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {os.getenv("GROQ_API_KEY")}'
-                },
-                json={
-                    'model': 'llama-3.3-70b-versatile',
-                    'messages': [{'role': 'user', 'content': intent_classification_prompt}]
-                }
+            # Classify the intent locally when the classifier is confident; otherwise ask the LLM
+            intent_classifier.load_logged_examples(
+                lambda: chatbot_conversations_repository.get_llm_labelled_queries(INTENT_TRAINING_EXAMPLES)
             )
-            
-            print(response.json())
-            if response.status_code != 200:
-                logger.error(f"Error calling chatbot API for intent classification: {response.text}")
-                return jsonify({'error': 'An error occurred while calling the chatbot API for intent classification'}), 500
+            # Nothing has been written yet: give the connection back before any LLM call
+            UnitOfWork.release()
+            classification = intent_classifier.classify(query)
+            if classification.confident:
+                intent = classification.intent
+                intent_source = 'local'
+            else:
+                # Fetch what every intent needs while the LLM classifies; the unneeded sets are discarded
+                prefetched = prefetch_intent_data(user.student_id)
+                intent_classification_prompt = INTENT_CLASSIFICATION_PROMPT.format(query=query)
 
-            response_data = response.json()
-            intent_response = response_data['choices'][0]['message']['content']
-            try:
-                intent = eval(intent_response).get('intent')
-                if not intent:
-                    raise ValueError("Intent not found in response")
-            except (SyntaxError, ValueError) as e:
-                logger.error(f"Error parsing intent response: {e}")
-                return jsonify({'error': 'An error occurred while parsing the intent response'}), 500
+                try:
+                    intent_response = llm_client.chat_completion(
+                        [{'role': 'user', 'content': intent_classification_prompt}], purpose='intent',
+                        validate=parse_intent_response
+                    )
+                except LLMError as e:
+                    logger.error(f"Error calling chatbot API for intent classification: {e}")
+                    return jsonify({'error': 'An error occurred while calling the chatbot API for intent classification'}), 500
+
+                try:
+                    intent = parse_intent_response(intent_response)
+                except (SyntaxError, ValueError) as e:
+                    logger.error(f"Error parsing intent response: {e}")
+                    return jsonify({'error': 'An error occurred while parsing the intent response'}), 500
+                intent_source = 'llm'
+                intent_classifier.learn([(query, intent)])
+                intent_classifier.retrain_if_due()
+            intent_classifier.record_route(intent_source, intent)
             print("==========================================")
-            logger.info(f"Identified intent: {intent}")
+            logger.info(f"Identified intent: {intent} ({intent_source}, score {classification.score})")
             print("==========================================")
 
             # Fetch the corresponding data based on the intent
-            student_id = user.student_id
-            if intent == 'attendance':
-                attendance_records = attendance_repository.get_attendance_by_student_id(student_id)
-                data_response = [{'date': record.attendance_date, 'status': record.status, 'notes': record.notes} for record in attendance_records]
-            elif intent == 'activity':
-                activities = activities_repository.get_activities_by_student_id(student_id)
-                data_response = [{'activity_name': activity.activity_name, 'badge': activity.badge, 'description': activity.description} for activity in activities]
-            elif intent == 'behaviour':
-                behavior_records = behavior_records_repository.get_records_by_student_id(student_id)
-                data_response = [{'behavior_type': record.behaviour_type, 'sentiment_score': record.sentiment_score, 'comment': record.comment, 'date': record.record_date} for record in behavior_records]
-            elif intent == 'grade':
-                grades = academic_records_repository.get_records_by_student_id(student_id)
-                data_response = [{'subject': grade.subject, 'grade': grade.grade, 'date': grade.record_date} for grade in grades]
-            elif intent == 'general_question':
-                # Directly call the external chatbot API for the final response
-                response = requests.post(
-                    'https://api.groq.com/openai/v1/chat/completions',
-                    headers={
-                        'Content-Type': 'application/json',
-                        'Authorization': f'Bearer {os.getenv("GROQ_API_KEY")}'
-                    },
-                    json={
-                        'model': 'llama-3.3-70b-versatile',
-                        'messages': messages
-                    }
-                )
-
-                if response.status_code != 200:
-                    logger.error(f"Error calling chatbot API for final response: {response.text}")
-                    return jsonify({'error': 'An error occurred while calling the chatbot API for final response'}), 500
-
-                response_data = response.json()
-                chatbot_response = response_data['choices'][0]['message']['content']
-
-                conversation_data = {
-                    'user_id': user_id,
-                    'chat_id': uuid.uuid4(),
-                    'conversation_id': conversation_id,
-                    'query': query,
-                    'response': chatbot_response,
-                    'emotion': data.get('emotion')
-                }
-
-                conversation = chatbot_conversations_repository.create_conversation(conversation_data)
-                logger.info(f"Conversation with ID: {conversation_id} created successfully.")
-                return jsonify({'conversation_id': conversation.conversation_id, 'response': chatbot_response}), 201
-            else:
+            context_tokens = None
+            if intent in INTENT_DATA_LOADERS:
+                future = prefetched.pop(intent, None)
+                if future is None or future.cancel():
+                    # Not prefetched, or still queued behind other requests' prefetches: load it here
+                    records = INTENT_DATA_LOADERS[intent](user.student_id)
+                else:
+                    records = future.result()
+                # Aggregates and recent items within the intent's token budget, not the whole history
+                data_response, context_tokens = chat_context_builder.build(intent, records)
+                logger.info(f"Built {intent} context of ~{context_tokens} tokens from {len(records)} records")
+            elif intent != 'general_question':
                 data_response = "I'm here to help with your questions. How can I assist you today?"
 
-            # Call the external chatbot API for the final response
-            final_answer_prompt = FINAL_ANSWER_PROMPT.format(query=query, data_response=data_response)
-            if len(messages) > 1:
-                messages[-1] = {'role': 'user', 'content': final_answer_prompt}
-            else:
-                messages[0] = {'role': 'user', 'content': final_answer_prompt}
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {os.getenv("GROQ_API_KEY")}'
-                },
-                json={
-                    'model': 'llama-3.3-70b-versatile',
-                    'messages': messages
-                }
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Error calling chatbot API for final response: {response.text}")
-                return jsonify({'error': 'An error occurred while calling the chatbot API for final response'}), 500
-
-            response_data = response.json()
-            chatbot_response = response_data['choices'][0]['message']['content']
+            if intent != 'general_question':
+                # Answer from the fetched data; general questions go to the model as asked
+                final_answer_prompt = FINAL_ANSWER_PROMPT.format(query=query, data_response=data_response)
+                if len(messages) > 1:
+                    messages[-1] = {'role': 'user', 'content': final_answer_prompt}
+                else:
+                    messages[0] = {'role': 'user', 'content': final_answer_prompt}
 
             conversation_data = {
                 'user_id': user_id,
                 'chat_id': uuid.uuid4(),
                 'conversation_id': conversation_id,
                 'query': query,
-                'response': chatbot_response,
-                'emotion': data.get('emotion')
+                'emotion': data.get('emotion'),
+                'intent': intent,
+                'intent_source': intent_source,
+                'context_tokens': context_tokens
             }
 
+            # The record load above used a fresh connection; release it before the answer call too
+            UnitOfWork.release()
+            if data.get('stream') is True:
+                return stream_answer(messages, conversation_data)
+
+            # Call the external chatbot API for the final response
+            try:
+                chatbot_response = llm_client.chat_completion(messages, purpose='answer', use_cache=False)
+            except LLMError as e:
+                logger.error(f"Error calling chatbot API for final response: {e}")
+                return jsonify({'error': 'An error occurred while calling the chatbot API for final response'}), 500
+
+            conversation_data['response'] = chatbot_response
             conversation = chatbot_conversations_repository.create_conversation(conversation_data)
+            conversation_memory.schedule_update(conversation_id, user_id)
             logger.info(f"Conversation with ID: {conversation_id} created successfully.")
             return jsonify({'conversation_id': conversation.conversation_id, 'response': chatbot_response}), 201
         except KeyError as e:
@@ -184,6 +264,9 @@ class ChatbotConversationsController:
         except Exception as e:
             logger.error(f"Error creating conversation: {e}")
             return jsonify({'error': 'An error occurred while creating the conversation'}), 500
+        finally:
+            for future in prefetched.values():
+                future.cancel()
 
     @staticmethod
     @chatbot_conversations_bp.route('/api/chatbot/conversation/<uuid:conversation_id>', methods=['GET'])
@@ -214,7 +297,9 @@ class ChatbotConversationsController:
         """Retrieve chatbot conversations by user ID."""
         try:
             user_id = get_jwt_identity()
-            conversations = chatbot_conversations_repository.get_conversations_by_user_id(user_id)
+            conversations, next_cursor = chatbot_conversations_repository.get_conversations_by_user_id(
+                user_id, request.args.get('cursor'), request.args.get('limit', type=int)
+            )
             response = [{
                 'conversation_id': conversation.conversation_id,
                 'user_id': conversation.user_id,
@@ -224,7 +309,10 @@ class ChatbotConversationsController:
                 'emotion': conversation.emotion,
                 'created_at': conversation.created_at
             } for conversation in conversations]
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error retrieving conversations: {e}")
             return jsonify({'error': 'An error occurred while retrieving conversations'}), 500
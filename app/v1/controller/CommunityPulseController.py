@@ -1,11 +1,13 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required
 from app.v1.repository.CommunityForumRepository import CommunityForumRepository
 from app.v1.repository.CommunityPollRepository import CommunityPollRepository
-from app.v1.repository.UsersRepository import UsersRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
+from app.utils.pagination import InvalidCursor
 import json
+import os
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
@@ -13,7 +15,15 @@ logger = LogConfig.setup_logger(__name__)
 community_pulse_bp = Blueprint('community_pulse', __name__)
 community_forum_repository = CommunityForumRepository(scoped_session_factory)
 community_poll_repository = CommunityPollRepository(scoped_session_factory)
-users_repository = UsersRepository(scoped_session_factory)
+
+POLL_OPTION_MAX_LENGTH = int(os.getenv("POLL_OPTION_MAX_LENGTH", "500"))  # characters; votes index the option text
+
+def poll_vote_totals(poll, counts):
+    """Per-option totals of a poll: counts from before per-user votes were recorded plus recorded votes."""
+    totals = json.loads(poll.votes) if poll.votes else {}
+    for option, count in counts.items():
+        totals[option] = totals.get(option, 0) + count
+    return totals
 
 class CommunityPulseController:
     @staticmethod
@@ -22,7 +32,7 @@ class CommunityPulseController:
     def get_forums():
         """Retrieve regional forum discussions with auto-translation support."""
         try:
-            forums = community_forum_repository.get_all_forums()
+            forums, next_cursor = community_forum_repository.get_all_forums(request.args.get('cursor'), request.args.get('limit', type=int))
             response = [{
                 'id': forum.id,
                 'parent_id': forum.parent_id,
@@ -36,7 +46,10 @@ class CommunityPulseController:
                 'created_at': forum.created_at,
                 'updated_at': forum.updated_at
             } for forum in forums]
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error retrieving forums: {e}")
             return jsonify({'error': 'An error occurred while retrieving forums'}), 500
@@ -44,14 +57,13 @@ class CommunityPulseController:
     @staticmethod
     @community_pulse_bp.route('/api/community/forums', methods=['POST'])
     @jwt_required()
+    @require_role()
     def create_forum():
         """Post a new discussion or reply (with options for anonymity)."""
         data = request.json
         try:
-            parent_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(parent_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+            parent_id = user.id
 
             forum_data = {
                 'parent_id': parent_id,
@@ -101,14 +113,13 @@ class CommunityPulseController:
     @staticmethod
     @community_pulse_bp.route('/api/community/forums/<int:forum_id>/replies', methods=['POST'])
     @jwt_required()
+    @require_role()
     def post_reply(forum_id):
         """Post a reply to a specific forum discussion."""
         data = request.json
         try:
-            parent_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(parent_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+            parent_id = user.id
 
             reply_data = {
                 'parent_id': parent_id,
@@ -135,18 +146,22 @@ class CommunityPulseController:
     def get_polls():
         """Get active anonymous polls."""
         try:
-            polls = community_poll_repository.get_all_polls()
+            polls, next_cursor = community_poll_repository.get_all_polls(request.args.get('cursor'), request.args.get('limit', type=int))
+            vote_counts = community_poll_repository.get_vote_counts([poll.id for poll in polls])
             response = [{
                 'id': poll.id,
                 'parent_id': poll.parent_id,
                 'student_id': poll.student_id,
                 'question': poll.question,
                 'options': poll.options,
-                'votes': poll.votes,
+                'votes': json.dumps(poll_vote_totals(poll, vote_counts[poll.id])),
                 'created_at': poll.created_at,
                 'updated_at': poll.updated_at
             } for poll in polls]
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error retrieving polls: {e}")
             return jsonify({'error': 'An error occurred while retrieving polls'}), 500
@@ -154,38 +169,48 @@ class CommunityPulseController:
     @staticmethod
     @community_pulse_bp.route('/api/community/polls', methods=['POST'])
     @jwt_required()
+    @require_role()
     def create_poll():
         """Submit a poll vote or new poll creation."""
         data = request.json
         try:
-            parent_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(parent_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+            parent_id = user.id
 
             if 'poll_id' in data:
-                # Update existing poll votes
+                # Record the vote: one atomic insert, deduplicated per user, no read-modify-write of the counts
                 poll_id = data['poll_id']
                 selected_option = data['selected_option']
+                if not isinstance(selected_option, str):
+                    return jsonify({'error': 'Invalid option for this poll'}), 400
+                if community_poll_repository.cast_vote(poll_id, parent_id, selected_option):
+                    return jsonify({'message': 'Poll vote submitted successfully.'}), 200
+
+                # Not counted: find out why (only this path pays for the extra reads)
                 poll = community_poll_repository.get_poll_by_id(poll_id)
                 if not poll:
                     return jsonify({'error': 'Poll not found'}), 404
-
-                votes = json.loads(poll.votes)
-                votes[selected_option] = votes.get(selected_option, 0) + 1
-                updated_poll = community_poll_repository.update_poll_votes(poll_id, json.dumps(votes))
-                return jsonify({'message': 'Poll vote submitted successfully.'}), 200
+                if community_poll_repository.get_user_vote(poll_id, parent_id) is not None:
+                    return jsonify({'error': 'You have already voted in this poll'}), 409
+                return jsonify({'error': 'Invalid option for this poll'}), 400
             else:
                 # Create new poll
                 if 'question' not in data:
                     return jsonify({'error': 'Missing required field: question'}), 400
+                options = data['options']
+                if not isinstance(options, list) or not options or not all(
+                    isinstance(option, str) and option.strip() for option in options
+                ):
+                    return jsonify({'error': 'options must be a non-empty list of non-empty strings'}), 400
+                if any(len(option) > POLL_OPTION_MAX_LENGTH for option in options):
+                    return jsonify({'error': f"Poll options are limited to {POLL_OPTION_MAX_LENGTH} characters"}), 400
 
                 poll_data = {
                     'parent_id': parent_id,
                     'student_id': user.student_id,
                     'question': data['question'],
-                    'options': json.dumps(data['options']),
-                    'votes': json.dumps({option: 0 for option in data['options']})
+                    'options': json.dumps(options),
+                    'votes': json.dumps({option: 0 for option in options})
                 }
 
                 poll = community_poll_repository.create_poll(poll_data)
@@ -200,13 +225,11 @@ class CommunityPulseController:
     @staticmethod
     @community_pulse_bp.route('/api/community/engagement', methods=['GET'])
     @jwt_required()
+    @require_role()
     def get_engagement():
         """Retrieve the 'Engagement Score' and rewards status."""
-        parent_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(parent_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            parent_id = g.current_user.id
 
             # Placeholder for engagement score and rewards status logic
             engagement_score = 85
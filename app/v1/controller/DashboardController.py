@@ -1,61 +1,96 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.v1.repository.UsersRepository import UsersRepository
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required
 from app.v1.repository.AcademicRecordsRepository import AcademicRecordsRepository
 from app.v1.repository.AttendanceRepository import AttendanceRepository
 from app.v1.repository.ActivitiesRepository import ActivitiesRepository
 from app.v1.repository.BehaviorRecordsRepository import BehaviorRecordsRepository
 from app.v1.repository.StudentsRepository import StudentsRepository
 from app.v1.repository.TimeTableRepository import TimeTableRepository
+from app.v1.service.GradeImportService import GradeImportService, GradeImportError, detect_format
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 dashboard_bp = Blueprint('dashboard', __name__)
-users_repository = UsersRepository(scoped_session_factory)
 academic_records_repository = AcademicRecordsRepository(scoped_session_factory)
 attendance_repository = AttendanceRepository(scoped_session_factory)
 activities_repository = ActivitiesRepository(scoped_session_factory)
 behavior_records_repository = BehaviorRecordsRepository(scoped_session_factory)
 students_repository = StudentsRepository(scoped_session_factory)
 time_table_repository = TimeTableRepository(scoped_session_factory)
+grade_import_service = GradeImportService(academic_records_repository, students_repository)
+
+def parse_date_range(start_date, end_date):
+    """Parse optional YYYY-MM-DD query arguments into dates (None when absent)."""
+    start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+    end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    return start, end
+
+def group_records_by_student(rows):
+    """Group (student, record) rows into (student, [records]) pairs, keeping the row order."""
+    grouped = {}
+    for student, record in rows:
+        records = grouped.setdefault(student.student_id, (student, []))[1]
+        if record is not None:
+            records.append(record)
+    return list(grouped.values())
+
+# Compact status codes accepted by the bulk attendance endpoint
+ATTENDANCE_STATUS_CODES = {'p': 'present', 'present': 'present', 'a': 'absence', 'absence': 'absence', 'absent': 'absence'}
+
+def parse_attendance_mark(mark):
+    """
+    Parse one entry of a bulk attendance status map: either a status string ('present',
+    'absence', or the 'p'/'a' shorthand) or {'status': ..., 'notes': ...}.
+    Returns (status, notes), or None when the entry is not valid.
+    """
+    notes = None
+    if isinstance(mark, dict):
+        notes = mark.get('notes')
+        mark = mark.get('status')
+    if not isinstance(mark, str):
+        return None
+    status = ATTENDANCE_STATUS_CODES.get(mark.strip().lower())
+    return (status, notes) if status else None
 
 class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/grades', methods=['GET'])
     @jwt_required()
+    @require_role('parent', 'teacher')
     def get_grades():
         """Retrieve academic grade trends."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role not in ['parent', 'teacher']:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+
+            try:
+                start_date, end_date = parse_date_range(request.args.get('start_date'), request.args.get('end_date'))
+            except ValueError:
+                return jsonify({'error': 'start_date and end_date must be in YYYY-MM-DD format'}), 400
 
             if user.role == 'parent':
                 student_id = user.student_id
                 if not student_id:
                     return jsonify({'error': 'Student ID not found'}), 404
-                student_ids = [student_id]
+                student = students_repository.get_student_by_id(student_id)
+                grades = academic_records_repository.get_records_by_student_id(student_id, start_date, end_date)
+                rows = [(student, grade) for grade in grades] or [(student, None)]
             else:
                 class_value = request.args.get('class_value')
                 section = request.args.get('section')
                 if not class_value or not section:
                     return jsonify({'error': 'class_value and section are required for teachers'}), 400
-                student_ids = [student.student_id for student in students_repository.get_students_by_class_and_section(class_value, section)]
-
-            start_date = request.args.get('start_date')
-            end_date = request.args.get('end_date')
+                rows = academic_records_repository.get_records_by_class_and_section(class_value, section, start_date, end_date)
 
             response = {'students': []}
-            for student_id in student_ids:
-                student = students_repository.get_student_by_id(student_id)
-                grades = academic_records_repository.get_records_by_student_id(student_id)
+            for student, grades in group_records_by_student(rows):
                 student_data = {
-                    'student_id': student_id,
+                    'student_id': student.student_id,
                     'student_name': student.student_name,
                     'gender': student.gender,
                     'subjects': []
@@ -63,10 +98,6 @@ class DashboardController:
 
                 subjects = {}
                 for grade in grades:
-                    if start_date and grade.record_date < datetime.strptime(start_date, '%Y-%m-%d').date():
-                        continue
-                    if end_date and grade.record_date > datetime.strptime(end_date, '%Y-%m-%d').date():
-                        continue
                     if grade.subject not in subjects:
                         subjects[grade.subject] = {'subject': grade.subject, 'grades': [], 'alert': False}
                     subjects[grade.subject]['grades'].append({'date': grade.record_date, 'grade': grade.grade})
@@ -84,14 +115,12 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/grades', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def post_grades():
         """Post academic grade details."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user_id = g.current_user.id
 
             record_data = {
                 'student_id': data['student_id'],
@@ -110,48 +139,74 @@ class DashboardController:
             logger.error(f"Error posting grade record: {e}")
             return jsonify({'error': 'An error occurred while posting the grade record'}), 500
 
+    @staticmethod
+    @dashboard_bp.route('/api/dashboard/grades/import', methods=['POST'])
+    @jwt_required()
+    @require_role('teacher')
+    def import_grades():
+        """
+        Import grades from a CSV or NDJSON file (multipart field 'file', or the raw request body).
+        Rows are streamed, validated and loaded in chunks; the response is an import report.
+        """
+        try:
+            upload = request.files.get('file')
+            if upload:
+                file_format = detect_format(upload.filename, upload.mimetype, request.args.get('format'))
+                stream = upload.stream
+            else:
+                file_format = detect_format(content_type=request.mimetype, requested_format=request.args.get('format'))
+                stream = request.stream
+
+            report = grade_import_service.import_stream(stream, file_format, teacher_id=g.current_user.id)
+            return jsonify(report), 200
+        except GradeImportError as e:
+            logger.error(f"Invalid grade import: {e}")
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error importing grades: {e}")
+            return jsonify({'error': 'An error occurred while importing grades'}), 500
+
     @staticmethod
     @dashboard_bp.route('/api/dashboard/attendance', methods=['GET'])
     @jwt_required()
+    @require_role('parent', 'teacher')
     def get_attendance():
         """Retrieve attendance data formatted for heatmaps."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role not in ['parent', 'teacher']:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+
+            month = request.args.get('month', type=int)
+            year = request.args.get('year', type=int)
+            if month is not None and not 1 <= month <= 12:
+                return jsonify({'error': 'month must be between 1 and 12'}), 400
+            # The year is turned into a [year, year + 1) date range, so year + 1 must be a valid date too.
+            if year is not None and not 1 <= year < datetime.max.year:
+                return jsonify({'error': f"year must be between 1 and {datetime.max.year - 1}"}), 400
 
             if user.role == 'parent':
                 student_id = user.student_id
                 if not student_id:
                     return jsonify({'error': 'Student ID not found'}), 404
-                student_ids = [student_id]
+                student = students_repository.get_student_by_id(student_id)
+                attendance_records = attendance_repository.get_attendance_by_student_id(student_id, month, year)
+                rows = [(student, record) for record in attendance_records] or [(student, None)]
             else:
                 class_value = request.args.get('class_value')
                 section = request.args.get('section')
                 if not class_value or not section:
                     return jsonify({'error': 'class_value and section are required for teachers'}), 400
-                student_ids = [student.student_id for student in students_repository.get_students_by_class_and_section(class_value, section)]
-
-            month = request.args.get('month')
-            year = request.args.get('year')
+                rows = attendance_repository.get_attendance_by_class_and_section(class_value, section, month, year)
 
             response = {'students': []}
-            for student_id in student_ids:
-                student = students_repository.get_student_by_id(student_id)
-                attendance_records = attendance_repository.get_attendance_by_student_id(student_id)
+            for student, attendance_records in group_records_by_student(rows):
                 student_data = {
-                    'student_id': student_id,
+                    'student_id': student.student_id,
                     'student_name': student.student_name,
                     'gender': student.gender,
                     'attendance': []
                 }
 
                 for record in attendance_records:
-                    if month and record.attendance_date.month != int(month):
-                        continue
-                    if year and record.attendance_date.year != int(year):
-                        continue
                     student_data['attendance'].append({
                         'date': record.attendance_date,
                         'status': record.status,
@@ -168,15 +223,11 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/attendance', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def post_attendance():
         """Post attendance details."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
             record_data = {
                 'student_id': data['student_id'],
                 'attendance_date': datetime.strptime(data['attendance_date'], '%Y-%m-%d').date(),
@@ -189,39 +240,107 @@ class DashboardController:
         except KeyError as e:
             logger.error(f"Missing required field: {e}")
             return jsonify({'error': f"Missing required field: {e}"}), 400
+        except IntegrityError as e:
+            logger.error(f"Duplicate attendance record: {e}")
+            return jsonify({'error': 'Attendance has already been recorded for this student and date'}), 409
         except Exception as e:
             logger.error(f"Error posting attendance record: {e}")
             return jsonify({'error': 'An error occurred while posting the attendance record'}), 500
 
+    @staticmethod
+    @dashboard_bp.route('/api/dashboard/attendance/bulk', methods=['POST'])
+    @jwt_required()
+    @require_role('teacher')
+    def post_attendance_bulk():
+        """
+        Record attendance for a whole class section in one transaction.
+        Body: {'class_value', 'section', 'attendance_date', 'statuses': {student_id: status}}.
+        Every entry is reported as inserted, duplicate, not_in_section or invalid.
+        """
+        data = request.json
+        try:
+            attendance_date = datetime.strptime(data['attendance_date'], '%Y-%m-%d').date()
+            statuses = data['statuses']
+            if not isinstance(statuses, dict) or not statuses:
+                return jsonify({'error': 'statuses must be a non-empty object keyed by student_id'}), 400
+
+            roster = {student.student_id for student in
+                      students_repository.get_students_by_class_and_section(data['class_value'], data['section'])}
+
+            results = []
+            records = []
+            marked = set()
+            for raw_student_id, mark in statuses.items():
+                try:
+                    student_id = int(raw_student_id)
+                except (TypeError, ValueError):
+                    results.append({'student_id': raw_student_id, 'result': 'invalid'})
+                    continue
+                parsed = parse_attendance_mark(mark)
+                if parsed is None:
+                    results.append({'student_id': student_id, 'result': 'invalid'})
+                elif student_id not in roster:
+                    results.append({'student_id': student_id, 'result': 'not_in_section'})
+                elif student_id in marked:
+                    results.append({'student_id': student_id, 'result': 'duplicate'})
+                else:
+                    marked.add(student_id)
+                    results.append({'student_id': student_id, 'result': None})
+                    records.append({
+                        'student_id': student_id,
+                        'attendance_date': attendance_date,
+                        'status': parsed[0],
+                        'notes': parsed[1]
+                    })
+
+            inserted = attendance_repository.bulk_create_attendance(records)
+            summary = {'inserted': 0, 'duplicate': 0, 'not_in_section': 0, 'invalid': 0}
+            for result in results:
+                if result['result'] is None:
+                    record_id = inserted.get(result['student_id'])
+                    result['result'] = 'inserted' if record_id else 'duplicate'
+                    if record_id:
+                        result['record_id'] = record_id
+                summary[result['result']] += 1
+
+            return jsonify({'attendance_date': attendance_date.isoformat(), 'summary': summary, 'results': results}), 200
+        except KeyError as e:
+            logger.error(f"Missing required field: {e}")
+            return jsonify({'error': f"Missing required field: {e}"}), 400
+        except ValueError as e:
+            logger.error(f"Invalid value: {e}")
+            return jsonify({'error': 'attendance_date must be in YYYY-MM-DD format'}), 400
+        except Exception as e:
+            logger.error(f"Error posting bulk attendance: {e}")
+            return jsonify({'error': 'An error occurred while posting attendance'}), 500
+
     @staticmethod
     @dashboard_bp.route('/api/dashboard/activities', methods=['GET'])
     @jwt_required()
+    @require_role('parent', 'teacher')
     def get_activities():
         """Get extracurricular participation and badges."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role not in ['parent', 'teacher']:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'parent':
                 student_id = user.student_id
                 if not student_id:
                     return jsonify({'error': 'Student ID not found'}), 404
-                student_ids = [student_id]
+                student = students_repository.get_student_by_id(student_id)
+                activities = activities_repository.get_activities_by_student_id(student_id)
+                rows = [(student, activity) for activity in activities] or [(student, None)]
             else:
                 class_value = request.args.get('class_value')
                 section = request.args.get('section')
                 if not class_value or not section:
                     return jsonify({'error': 'class_value and section are required for teachers'}), 400
-                student_ids = [student.student_id for student in students_repository.get_students_by_class_and_section(class_value, section)]
+                rows = activities_repository.get_activities_by_class_and_section(class_value, section)
 
             response = {'students': []}
-            for student_id in student_ids:
-                student = students_repository.get_student_by_id(student_id)
-                activities = activities_repository.get_activities_by_student_id(student_id)
+            for student, activities in group_records_by_student(rows):
                 student_data = {
-                    'student_id': student_id,
+                    'student_id': student.student_id,
                     'student_name': student.student_name,
                     'gender': student.gender,
                     'activities': [{'activity_name': activity.activity_name, 'badge': activity.badge, 'description': activity.description} for activity in activities]
@@ -237,15 +356,11 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/activities', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def post_activities():
         """Post extracurricular activity details."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
             record_data = {
                 'student_id': data['student_id'],
                 'activity_name': data['activity_name'],
@@ -265,45 +380,41 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/behaviour', methods=['GET'])
     @jwt_required()
+    @require_role('parent', 'teacher')
     def get_behavior():
         """Return behavioral sentiment analysis data."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role not in ['parent', 'teacher']:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
+
+            try:
+                start_date, end_date = parse_date_range(request.args.get('start_date'), request.args.get('end_date'))
+            except ValueError:
+                return jsonify({'error': 'start_date and end_date must be in YYYY-MM-DD format'}), 400
 
             if user.role == 'parent':
                 student_id = user.student_id
                 if not student_id:
                     return jsonify({'error': 'Student ID not found'}), 404
-                student_ids = [student_id]
+                student = students_repository.get_student_by_id(student_id)
+                behavior_records = behavior_records_repository.get_records_by_student_id(student_id, start_date, end_date)
+                rows = [(student, record) for record in behavior_records] or [(student, None)]
             else:
                 class_value = request.args.get('class_value')
                 section = request.args.get('section')
                 if not class_value or not section:
                     return jsonify({'error': 'class_value and section are required for teachers'}), 400
-                student_ids = [student.student_id for student in students_repository.get_students_by_class_and_section(class_value, section)]
-
-            start_date = request.args.get('start_date')
-            end_date = request.args.get('end_date')
+                rows = behavior_records_repository.get_records_by_class_and_section(class_value, section, start_date, end_date)
 
             response = {'students': []}
-            for student_id in student_ids:
-                student = students_repository.get_student_by_id(student_id)
-                behavior_records = behavior_records_repository.get_records_by_student_id(student_id)
+            for student, behavior_records in group_records_by_student(rows):
                 student_data = {
-                    'student_id': student_id,
+                    'student_id': student.student_id,
                     'student_name': student.student_name,
                     'gender': student.gender,
                     'behavior_records': []
                 }
 
                 for record in behavior_records:
-                    if start_date and record.record_date < datetime.strptime(start_date, '%Y-%m-%d').date():
-                        continue
-                    if end_date and record.record_date > datetime.strptime(end_date, '%Y-%m-%d').date():
-                        continue
                     student_data['behavior_records'].append({
                         'behavior_type': record.behaviour_type,
                         'sentiment_score': record.sentiment_score,
@@ -321,14 +432,12 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/timetable', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def create_time_table():
         """Create a new time table entry."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user_id = g.current_user.id
 
             time_table_data = {
                 'class_value': data['class_value'],
@@ -352,15 +461,11 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/timetable/<int:time_table_id>', methods=['PUT'])
     @jwt_required()
+    @require_role('teacher')
     def update_time_table(time_table_id):
         """Update an existing time table entry."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
             time_table_data = {
                 'class_value': data.get('class_value'),
                 'section': data.get('section'),
@@ -381,13 +486,11 @@ class DashboardController:
     @staticmethod
     @dashboard_bp.route('/api/dashboard/timetable', methods=['GET'])
     @jwt_required()
+    @require_role('parent', 'teacher')
     def get_time_table():
         """Retrieve time table entries."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role not in ['parent', 'teacher']:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'parent':
                 student_id = user.student_id
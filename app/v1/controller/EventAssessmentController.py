@@ -1,11 +1,11 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required
 from app.v1.repository.EventRepository import EventRepository
 from app.v1.repository.AssessmentRepository import AssessmentRepository
-from app.v1.repository.UsersRepository import UsersRepository
 from app.v1.repository.StudentsRepository import StudentsRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
 from datetime import datetime
 
 # Set up a logger for this controller
@@ -14,21 +14,18 @@ logger = LogConfig.setup_logger(__name__)
 event_assessment_bp = Blueprint('event_assessment', __name__)
 event_repository = EventRepository(scoped_session_factory)
 assessment_repository = AssessmentRepository(scoped_session_factory)
-users_repository = UsersRepository(scoped_session_factory)
 students_repository = StudentsRepository(scoped_session_factory)
 
 class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/events', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def create_event():
         """Create a new event."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user_id = g.current_user.id
 
             event_data = {
                 'title': data['title'],
@@ -51,14 +48,12 @@ class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/assessments', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def create_assessment():
         """Create a new assessment."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user_id = g.current_user.id
 
             assessment_data = {
                 'title': data['title'],
@@ -81,13 +76,11 @@ class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/events/upcoming', methods=['GET'])
     @jwt_required()
+    @require_role('teacher', 'parent')
     def get_upcoming_events():
         """Retrieve upcoming events."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'teacher':
                 class_value = request.args.get('class_value')
@@ -101,8 +94,6 @@ class EventAssessmentController:
                     return jsonify({'error': 'Student not found'}), 404
                 class_value = student.class_value
                 section = student.section
-            else:
-                return jsonify({'error': 'Unauthorized access'}), 403
 
             events = event_repository.get_upcoming_events(class_value, section)
             response = [{
@@ -119,13 +110,11 @@ class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/assessments/upcoming', methods=['GET'])
     @jwt_required()
+    @require_role('teacher', 'parent')
     def get_upcoming_assessments():
         """Retrieve upcoming assessments."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'teacher':
                 class_value = request.args.get('class_value')
@@ -139,8 +128,6 @@ class EventAssessmentController:
                     return jsonify({'error': 'Student not found'}), 404
                 class_value = student.class_value
                 section = student.section
-            else:
-                return jsonify({'error': 'Unauthorized access'}), 403
 
             assessments = assessment_repository.get_upcoming_assessments(class_value, section)
             response = [{
@@ -157,13 +144,11 @@ class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/events/previous', methods=['GET'])
     @jwt_required()
+    @require_role('teacher', 'parent')
     def get_previous_events():
         """Retrieve previous events."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'teacher':
                 class_value = request.args.get('class_value')
@@ -177,8 +162,6 @@ class EventAssessmentController:
                     return jsonify({'error': 'Student not found'}), 404
                 class_value = student.class_value
                 section = student.section
-            else:
-                return jsonify({'error': 'Unauthorized access'}), 403
 
             events = event_repository.get_previous_events(class_value, section)
             response = [{
@@ -195,13 +178,11 @@ class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/assessments/previous', methods=['GET'])
     @jwt_required()
+    @require_role('teacher', 'parent')
     def get_previous_assessments():
         """Retrieve previous assessments."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'teacher':
                 class_value = request.args.get('class_value')
@@ -215,8 +196,6 @@ class EventAssessmentController:
                     return jsonify({'error': 'Student not found'}), 404
                 class_value = student.class_value
                 section = student.section
-            else:
-                return jsonify({'error': 'Unauthorized access'}), 403
 
             assessments = assessment_repository.get_previous_assessments(class_value, section)
             response = [{
@@ -233,13 +212,11 @@ class EventAssessmentController:
     @staticmethod
     @event_assessment_bp.route('/api/reminders', methods=['GET'])
     @jwt_required()
+    @require_role('teacher', 'parent')
     def get_event_assessment_reminders():
         """Retrieve reminders for upcoming events and assessments."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'teacher':
                 class_value = request.args.get('class_value')
@@ -253,8 +230,6 @@ class EventAssessmentController:
                     return jsonify({'error': 'Student not found'}), 404
                 class_value = student.class_value
                 section = student.section
-            else:
-                return jsonify({'error': 'Unauthorized access'}), 403
 
             events = event_repository.get_upcoming_events(class_value, section)
             assessments = assessment_repository.get_upcoming_assessments(class_value, section)
@@ -2,6 +2,10 @@
 
 from flask import Blueprint, jsonify
 from app.config.logger_config import LogConfig
+from app.config.postgres_orm_config import get_pool_status
+from app.v1.service.LLMClient import get_llm_metrics
+from app.v1.service.IntentClassifier import intent_classifier
+from app.v1.service.ChatContextBuilder import chat_context_builder
 
 # Create a blueprint for health checks
 health_check_bp = Blueprint('health_check', __name__)
@@ -19,3 +23,25 @@ def health_check():
         'status': 'healthy',
         'message': 'Service is up and running.'
     }), 200
+
+
+@health_check_bp.route('/health/db-pool', methods=['GET'])
+def db_pool_status():
+    """
+    Report live database connection pool statistics (occupancy, overflow and checkout wait times).
+    """
+    return jsonify(get_pool_status()), 200
+
+
+@health_check_bp.route('/health/llm', methods=['GET'])
+def llm_status():
+    """
+    Report per-purpose LLM call statistics (calls, errors, retries, tokens and latency),
+    response cache hit/miss counters, how often chatbot intents were classified locally
+    rather than by the LLM and the token sizes of the chatbot data contexts.
+    """
+    return jsonify({
+        **get_llm_metrics(),
+        'intent_routing': intent_classifier.stats(),
+        'chat_context': chat_context_builder.stats()
+    }), 200
@@ -1,29 +1,27 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required
 from app.v1.repository.ParentTeacherChatRepository import ParentTeacherChatRepository
-from app.v1.repository.UsersRepository import UsersRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
+from app.utils.pagination import InvalidCursor
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 parent_teacher_chat_bp = Blueprint('parent_teacher_chat', __name__)
 parent_teacher_chat_repository = ParentTeacherChatRepository(scoped_session_factory)
-users_repository = UsersRepository(scoped_session_factory)
 
 class ParentTeacherChatController:
     @staticmethod
     @parent_teacher_chat_bp.route('/api/chat', methods=['POST'])
     @jwt_required()
+    @require_role('parent', 'teacher')
     def create_chat():
         """Create a new chat message."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role not in ['parent', 'teacher']:
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             if user.role == 'parent':
                 parent_id = user.id
@@ -76,7 +74,9 @@ class ParentTeacherChatController:
     def get_chats_by_teacher(teacher_id):
         """Retrieve chat messages by teacher ID."""
         try:
-            chats = parent_teacher_chat_repository.get_chats_by_teacher_id(teacher_id)
+            chats, next_cursor = parent_teacher_chat_repository.get_chats_by_teacher_id(
+                teacher_id, request.args.get('cursor'), request.args.get('limit', type=int)
+            )
             response = [{
                 'chat_id': chat.chat_id,
                 'teacher_id': chat.teacher_id,
@@ -86,7 +86,10 @@ class ParentTeacherChatController:
                 'is_read': chat.is_read,
                 'created_at': chat.created_at
             } for chat in chats]
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error retrieving chat messages: {e}")
             return jsonify({'error': 'An error occurred while retrieving chat messages'}), 500
@@ -97,7 +100,9 @@ class ParentTeacherChatController:
     def get_chats_by_parent(parent_id):
         """Retrieve chat messages by parent ID."""
         try:
-            chats = parent_teacher_chat_repository.get_chats_by_parent_id(parent_id)
+            chats, next_cursor = parent_teacher_chat_repository.get_chats_by_parent_id(
+                parent_id, request.args.get('cursor'), request.args.get('limit', type=int)
+            )
             response = [{
                 'chat_id': chat.chat_id,
                 'teacher_id': chat.teacher_id,
@@ -107,7 +112,10 @@ class ParentTeacherChatController:
                 'is_read': chat.is_read,
                 'created_at': chat.created_at
             } for chat in chats]
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error retrieving chat messages: {e}")
             return jsonify({'error': 'An error occurred while retrieving chat messages'}), 500
@@ -118,7 +126,9 @@ class ParentTeacherChatController:
     def get_chats_by_teacher_and_parent(teacher_id, parent_id):
         """Retrieve chat messages by both teacher ID and parent ID."""
         try:
-            chats = parent_teacher_chat_repository.get_chats_by_teacher_id_parent_id(teacher_id, parent_id)
+            chats, next_cursor = parent_teacher_chat_repository.get_chats_by_teacher_id_parent_id(
+                teacher_id, parent_id, request.args.get('cursor'), request.args.get('limit', type=int)
+            )
             response = [{
                 'chat_id': chat.chat_id,
                 'teacher_id': chat.teacher_id,
@@ -128,7 +138,10 @@ class ParentTeacherChatController:
                 'is_read': chat.is_read,
                 'created_at': chat.created_at
             } for chat in chats]
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error retrieving chat messages: {e}")
             return jsonify({'error': 'An error occurred while retrieving chat messages'}), 500
@@ -1,74 +1,64 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.v1.repository.UsersRepository import UsersRepository
+from flask import Blueprint, request, jsonify, g, url_for
+from flask_jwt_extended import jwt_required
 from app.v1.repository.BehaviorRecordsRepository import BehaviorRecordsRepository
+from app.v1.repository.StudentsRepository import StudentsRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
-from app.constants.sentiment_analysis import SENTIMENT_ANALYSIS_PROMPT
+from app.config.principal import require_role
+from app.config.unit_of_work import UnitOfWork
+from app.v1.service.LLMClient import llm_client
+from app.v1.service.SentimentScoringService import SENTIMENT_RETRY_DELAY, SentimentScoringService
 from datetime import datetime
-import requests
 import os
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 social_emotional_tracker_bp = Blueprint('social_emotional_tracker', __name__)
-users_repository = UsersRepository(scoped_session_factory)
 behavior_records_repository = BehaviorRecordsRepository(scoped_session_factory)
+students_repository = StudentsRepository(scoped_session_factory)
+sentiment_scoring_service = SentimentScoringService(behavior_records_repository, llm_client)
+
+BEHAVIOUR_BULK_MAX_ITEMS = int(os.getenv("BEHAVIOUR_BULK_MAX_ITEMS", "200"))  # observations per bulk request
+
+@social_emotional_tracker_bp.before_app_request
+def start_sentiment_scoring():
+    """Pick up records left pending by a previous process once this one starts serving."""
+    sentiment_scoring_service.start()
+
+def accepted_behavior_record(record, message):
+    """Queue a just-stored record for sentiment scoring once the request commits and build the 202 response."""
+    UnitOfWork.after_commit(sentiment_scoring_service.submit)
+    return jsonify({
+        'record_id': record.id,
+        'sentiment_status': record.sentiment_status,
+        'sentiment_url': url_for('social_emotional_tracker.get_behavior_sentiment', record_id=record.id),
+        'message': message
+    }), 202
 
 class SocialEmotionalDevelopmentTrackerController:
     @staticmethod
     @social_emotional_tracker_bp.route('/api/behaviour/school', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def log_behavior_school():
         """Log a behavioral milestone from the teacher side."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
-            # Call the external API for sentiment analysis
-            sentiment_analysis_prompt = SENTIMENT_ANALYSIS_PROMPT.format(text=data['observation_text'])
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {os.getenv("GROQ_API_KEY")}'
-                },
-                json={
-                    'model': 'llama-3.3-70b-versatile',
-                    'messages': [{'role': 'user', 'content': sentiment_analysis_prompt}]
-                }
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Error calling sentiment analysis API: {response.text}")
-                return jsonify({'error': 'An error occurred while calling the sentiment analysis API'}), 500
-
-            response_data = response.json()
-            sentiment_response = response_data['choices'][0]['message']['content']
-            try:
-                sentiment_data = eval(sentiment_response)
-                behavior_type = sentiment_data.get('behavior_type', 'General')
-                sentiment_score = sentiment_data.get('sentiment_score')
-            except (SyntaxError, ValueError) as e:
-                logger.error(f"Error parsing sentiment response: {e}")
-                return jsonify({'error': 'An error occurred while parsing the sentiment response'}), 500
+            user_id = g.current_user.id
 
             record_data = {
                 'student_id': data['student_id'],
                 'logged_by': user_id,
                 'source': 'school',
-                'behaviour_type': behavior_type,
-                'sentiment_score': sentiment_score,
+                'sentiment_status': 'pending',
                 'comment': data['observation_text'],
                 'record_date': datetime.now().date()
             }
 
+            # Sentiment is scored in the background; poll sentiment_url for the result.
             record = behavior_records_repository.create_record(record_data)
-            return jsonify({'record_id': record.id, 'message': 'Behavior record logged.'}), 201
+            return accepted_behavior_record(record, 'Behavior record logged.')
         except KeyError as e:
             logger.error(f"Missing required field: {e}")
             return jsonify({'error': f"Missing required field: {e}"}), 400
@@ -76,21 +66,89 @@ class SocialEmotionalDevelopmentTrackerController:
             logger.error(f"Error logging behavior record: {e}")
             return jsonify({'error': 'An error occurred while logging the behavior record'}), 500
 
+    @staticmethod
+    @social_emotional_tracker_bp.route('/api/behaviour/school/bulk', methods=['POST'])
+    @jwt_required()
+    @require_role('teacher')
+    def log_behavior_school_bulk():
+        """Log behavioral observations for many students at once, e.g. a whole class after a session."""
+        data = request.json
+        try:
+            user_id = g.current_user.id
+
+            observations = data['observations']
+            if not isinstance(observations, list) or not observations:
+                return jsonify({'error': 'observations must be a non-empty list'}), 400
+            if not all(isinstance(observation, dict) for observation in observations):
+                return jsonify({'error': 'Each observation must be an object with student_id and observation_text'}), 400
+            if len(observations) > BEHAVIOUR_BULK_MAX_ITEMS:
+                return jsonify({'error': f"At most {BEHAVIOUR_BULK_MAX_ITEMS} observations can be logged per request"}), 400
+
+            # Reject bad items before any LLM call is paid for (one lookup for all students)
+            invalid = {}
+            for index, observation in enumerate(observations):
+                student_id, text = observation.get('student_id'), observation.get('observation_text')
+                if not isinstance(student_id, int) or isinstance(student_id, bool):
+                    invalid[index] = 'student_id must be an integer'
+                elif not isinstance(text, str) or not text.strip():
+                    invalid[index] = 'observation_text must be a non-empty string'
+            known_students = students_repository.get_students_by_ids(
+                observation['student_id'] for index, observation in enumerate(observations) if index not in invalid
+            )
+            for index, observation in enumerate(observations):
+                if index not in invalid and observation['student_id'] not in known_students:
+                    invalid[index] = 'Student ID not found'
+            if invalid:
+                return jsonify({
+                    'error': 'Some observations are invalid; nothing was logged',
+                    'invalid_items': [
+                        {'index': index, 'student_id': observations[index].get('student_id'), 'error': error}
+                        for index, error in sorted(invalid.items())
+                    ]
+                }), 400
+
+            records_data = [{
+                'student_id': observation['student_id'],
+                'logged_by': user_id,
+                'source': 'school',
+                'sentiment_status': 'pending',
+                'comment': observation['observation_text'],
+                'record_date': datetime.now().date()
+            } for observation in observations]
+
+            # Scored in the background: the drain packs pending records into as few LLM calls as it can.
+            records = behavior_records_repository.create_records(records_data)
+            UnitOfWork.after_commit(sentiment_scoring_service.submit)
+
+            items = [{
+                'record_id': record.id,
+                'student_id': record.student_id,
+                'sentiment_status': record.sentiment_status,
+                'sentiment_url': url_for('social_emotional_tracker.get_behavior_sentiment', record_id=record.id)
+            } for record in records]
+            return jsonify({
+                'items': items,
+                'pending': len(records),
+                'message': 'Behavior records logged.'
+            }), 202
+        except KeyError as e:
+            logger.error(f"Missing required field: {e}")
+            return jsonify({'error': f"Missing required field: {e}"}), 400
+        except Exception as e:
+            logger.error(f"Error logging behavior records: {e}")
+            return jsonify({'error': 'An error occurred while logging the behavior records'}), 500
+
     @staticmethod
     @social_emotional_tracker_bp.route('/api/behaviour/teacher/<int:student_id>', methods=['GET'])
     @jwt_required()
+    @require_role('teacher')
     def get_behavior_teacher(student_id):
         """Retrieve teacher-logged behavior records."""
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'teacher':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
             behavior_records = behavior_records_repository.get_records_by_student_id(student_id)
             response = {
                 'student_id': student_id,
-                'behavior_records': [{'behavior_type': record.behaviour_type, 'sentiment_score': record.sentiment_score, 'comment': record.comment, 'date': record.record_date} for record in behavior_records]
+                'behavior_records': [{'record_id': record.id, 'behavior_type': record.behaviour_type, 'sentiment_score': record.sentiment_score, 'sentiment_status': record.sentiment_status, 'comment': record.comment, 'date': record.record_date} for record in behavior_records]
             }
 
             return jsonify(response), 200
@@ -101,55 +159,25 @@ class SocialEmotionalDevelopmentTrackerController:
     @staticmethod
     @social_emotional_tracker_bp.route('/api/behaviour/home', methods=['POST'])
     @jwt_required()
+    @require_role('parent')
     def log_behavior_home():
         """Log a behavioral observation from the parent side."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
-
-            # Call the external API for sentiment analysis
-            sentiment_analysis_prompt = SENTIMENT_ANALYSIS_PROMPT.format(text=data['observation_text'])
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {os.getenv("GROQ_API_KEY")}'
-                },
-                json={
-                    'model': 'llama-3.3-70b-versatile',
-                    'messages': [{'role': 'user', 'content': sentiment_analysis_prompt}]
-                }
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Error calling sentiment analysis API: {response.text}")
-                return jsonify({'error': 'An error occurred while calling the sentiment analysis API'}), 500
-
-            response_data = response.json()
-            sentiment_response = response_data['choices'][0]['message']['content']
-            try:
-                sentiment_data = eval(sentiment_response)
-                behavior_type = sentiment_data.get('behavior_type', 'Observation')
-                sentiment_score = sentiment_data.get('sentiment_score')
-            except (SyntaxError, ValueError) as e:
-                logger.error(f"Error parsing sentiment response: {e}")
-                return jsonify({'error': 'An error occurred while parsing the sentiment response'}), 500
+            user = g.current_user
+            user_id = user.id
 
             record_data = {
                 'student_id': user.student_id,
                 'logged_by': user_id,
                 'source': 'home',
-                'behaviour_type': behavior_type,
-                'sentiment_score': sentiment_score,
+                'sentiment_status': 'pending',
                 'comment': data['observation_text'],
                 'record_date': datetime.now().date()
             }
 
             record = behavior_records_repository.create_record(record_data)
-            return jsonify({'record_id': record.id, 'message': 'Observation recorded successfully.'}), 201
+            return accepted_behavior_record(record, 'Observation recorded successfully.')
         except KeyError as e:
             logger.error(f"Missing required field: {e}")
             return jsonify({'error': f"Missing required field: {e}"}), 400
@@ -157,16 +185,42 @@ class SocialEmotionalDevelopmentTrackerController:
             logger.error(f"Error logging observation: {e}")
             return jsonify({'error': 'An error occurred while logging the observation'}), 500
 
+    @staticmethod
+    @social_emotional_tracker_bp.route('/api/behaviour/<int:record_id>/sentiment', methods=['GET'])
+    @jwt_required()
+    @require_role('teacher', 'parent')
+    def get_behavior_sentiment(record_id):
+        """Poll the sentiment scoring status of a behavior record."""
+        try:
+            record = behavior_records_repository.get_record_by_id(record_id)
+            if not record:
+                return jsonify({'error': 'Behavior record not found'}), 404
+
+            user = g.current_user
+            if user.role == 'parent' and record.student_id != user.student_id:
+                return jsonify({'error': 'Unauthorized access'}), 403
+
+            response = jsonify({
+                'record_id': record.id,
+                'sentiment_status': record.sentiment_status,
+                'behavior_type': record.behaviour_type,
+                'sentiment_score': record.sentiment_score
+            })
+            if record.sentiment_status == 'pending':
+                response.headers['Retry-After'] = str(min(SENTIMENT_RETRY_DELAY, 5))
+            return response, 200
+        except Exception as e:
+            logger.error(f"Error retrieving behavior sentiment: {e}")
+            return jsonify({'error': 'An error occurred while retrieving the behavior sentiment'}), 500
+
     @staticmethod
     @social_emotional_tracker_bp.route('/api/behaviour/analysis', methods=['GET'])
     @jwt_required()
+    @require_role('parent')
     def get_behavior_analysis():
         """Retrieve AI-powered behavioral analysis."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             student_id = user.student_id
             if not student_id:
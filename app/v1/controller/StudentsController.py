@@ -1,28 +1,23 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.v1.repository.StudentsRepository import StudentsRepository
-from app.v1.repository.UsersRepository import UsersRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 students_bp = Blueprint('students', __name__)
 students_repository = StudentsRepository(scoped_session_factory)
-users_repository = UsersRepository(scoped_session_factory)
 
 class StudentsController:
     @staticmethod
     @students_bp.route('/api/students', methods=['GET'])
     @jwt_required()
+    @require_role('teacher')
     def get_students_by_class_and_section():
         """Retrieve students by class value and section."""
-        user_id = get_jwt_identity()
-        user = users_repository.get_user_by_id(user_id)
-        if not user or user.role != 'teacher':
-            return jsonify({'error': 'Unauthorized access'}), 403
-
         class_value = request.args.get('class_value')
         section = request.args.get('section')
         try:
@@ -48,13 +43,9 @@ class StudentsController:
     @staticmethod
     @students_bp.route('/api/students', methods=['POST'])
     @jwt_required()
+    @require_role('teacher')
     def add_student():
         """Add a new student with all details."""
-        user_id = get_jwt_identity()
-        user = users_repository.get_user_by_id(user_id)
-        if not user or user.role != 'teacher':
-            return jsonify({'error': 'Unauthorized access'}), 403
-
         data = request.json
         try:
             student_data = {
@@ -1,28 +1,25 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.v1.repository.UsersRepository import UsersRepository
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required
 from app.v1.repository.TalentProfilesRepository import TalentProfilesRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.config.principal import require_role
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
 talent_future_potential_bp = Blueprint('talent_future_potential', __name__)
-users_repository = UsersRepository(scoped_session_factory)
 talent_profiles_repository = TalentProfilesRepository(scoped_session_factory)
 
 class TalentFuturePotentialIdentifierController:
     @staticmethod
     @talent_future_potential_bp.route('/api/talent/profile', methods=['GET'])
     @jwt_required()
+    @require_role('parent')
     def get_talent_profile():
         """Retrieve the activity DNA profile for a child."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             student_id = user.student_id
             if not student_id:
@@ -44,14 +41,12 @@ class TalentFuturePotentialIdentifierController:
     @staticmethod
     @talent_future_potential_bp.route('/api/talent/profile', methods=['POST'])
     @jwt_required()
+    @require_role('parent')
     def update_talent_profile():
         """Update or add performance data."""
         data = request.json
         try:
-            user_id = get_jwt_identity()
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             student_id = user.student_id
             if not student_id:
@@ -76,13 +71,11 @@ class TalentFuturePotentialIdentifierController:
     @staticmethod
     @talent_future_potential_bp.route('/api/talent/scores', methods=['GET'])
     @jwt_required()
+    @require_role('parent')
     def get_talent_scores():
         """Retrieve the calculated future potential scores."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             student_id = user.student_id
             if not student_id:
@@ -110,13 +103,11 @@ class TalentFuturePotentialIdentifierController:
     @staticmethod
     @talent_future_potential_bp.route('/api/talent/recommendations', methods=['GET'])
     @jwt_required()
+    @require_role('parent')
     def get_talent_recommendations():
         """Provide proactive recommendations based on the brilliance engine."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             student_id = user.student_id
             if not student_id:
@@ -141,13 +132,11 @@ class TalentFuturePotentialIdentifierController:
     @staticmethod
     @talent_future_potential_bp.route('/api/talent/peer-comparison', methods=['GET'])
     @jwt_required()
+    @require_role('parent')
     def get_peer_comparison():
         """Fetch anonymized peer benchmarks for comparison."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
-            if not user or user.role != 'parent':
-                return jsonify({'error': 'Unauthorized access'}), 403
+            user = g.current_user
 
             student_id = user.student_id
             if not student_id:
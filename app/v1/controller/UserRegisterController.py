@@ -4,7 +4,9 @@ from app.v1.repository.UsersRepository import UsersRepository
 from app.v1.repository.StudentsRepository import StudentsRepository
 from app.config.postgres_orm_config import scoped_session_factory
 from app.config.logger_config import LogConfig
+from app.utils.pagination import InvalidCursor
 from app.config.auth import Auth
+from app.config.principal import load_principal, principal_claims
 from datetime import timedelta
 import bcrypt
 import re
@@ -56,7 +58,9 @@ class UserRegisterController:
         try:
             user = users_repository.get_user_by_email(data['email'])
             if user and bcrypt.checkpw(data['password'].encode('utf-8'), user.password_hash.encode('utf-8')):
-                access_token = Auth.create_access_token(identity=str(user.id), expires_delta=timedelta(minutes=30))
+                principal = users_repository.get_principal(user.id)
+                access_token = Auth.create_access_token(identity=str(user.id), expires_delta=timedelta(minutes=30),
+                                                        additional_claims=principal_claims(principal))
                 refresh_token = Auth.create_refresh_token(identity=str(user.id))
                 logger.info(f"User logged in with email: {user.email}")
                 return jsonify({'access_token': access_token, 'refresh_token': refresh_token}), 200
@@ -74,13 +78,12 @@ class UserRegisterController:
     @jwt_required()
     def get_user():
         """Get user details."""
-        user_id = get_jwt_identity()
         try:
-            user = users_repository.get_user_by_id(user_id)
+            user = load_principal()
             if user:
-                logger.info(f"Fetched user details for user ID: {user_id}")
+                logger.info(f"Fetched user details for user ID: {user.id}")
                 return jsonify({'id': user.id, 'name': user.name, 'email': user.email, 'role': user.role}), 200
-            logger.warning(f"User not found for user ID: {user_id}")
+            logger.warning(f"User not found for user ID: {get_jwt_identity()}")
             return jsonify({'error': 'User not found'}), 404
         except Exception as e:
             logger.error(f"Error fetching user details: {e}")
@@ -93,7 +96,9 @@ class UserRegisterController:
         """Generate a new access token using the refresh token."""
         user_id = get_jwt_identity()
         try:
-            access_token = Auth.create_access_token(identity=str(user_id), expires_delta=timedelta(minutes=30))
+            principal = users_repository.get_principal(user_id)
+            access_token = Auth.create_access_token(identity=str(user_id), expires_delta=timedelta(minutes=30),
+                                                    additional_claims=principal_claims(principal))
             logger.info(f"Access token refreshed for user ID: {user_id}")
             return jsonify({'access_token': access_token}), 200
         except Exception as e:
@@ -106,10 +111,13 @@ class UserRegisterController:
     def get_teachers():
         """Get all teachers' details."""
         try:
-            teachers = users_repository.get_users_by_role('teacher')
+            teachers, next_cursor = users_repository.get_users_by_role('teacher', request.args.get('cursor'), request.args.get('limit', type=int))
             response = [{'id': teacher.id, 'name': teacher.name, 'email': teacher.email, 'role': teacher.role, 'subject': teacher.subject} for teacher in teachers]
             logger.info("Fetched all teachers' details")
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error fetching teachers' details: {e}")
             return jsonify({'error': 'An error occurred while fetching teachers\' details'}), 500
@@ -120,10 +128,11 @@ class UserRegisterController:
     def get_parents():
         """Get all parents and their child details."""
         try:
-            parents = users_repository.get_users_by_role('parent')
+            parents, next_cursor = users_repository.get_users_by_role('parent', request.args.get('cursor'), request.args.get('limit', type=int))
+            students = students_repository.get_students_by_ids(parent.student_id for parent in parents)
             response = []
             for parent in parents:
-                student = students_repository.get_student_by_id(parent.student_id)
+                student = students.get(parent.student_id)
                 if student:
                     response.append({
                         'parent_id': parent.id,
@@ -134,7 +143,10 @@ class UserRegisterController:
                         'student_gender': student.gender
                     })
             logger.info("Fetched all parents' details")
-            return jsonify(response), 200
+            return jsonify({'items': response, 'next_cursor': next_cursor}), 200
+        except InvalidCursor as e:
+            logger.error(f"Invalid cursor: {e}")
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Error fetching parents' details: {e}")
             return jsonify({'error': 'An error occurred while fetching parents\' details'}), 500
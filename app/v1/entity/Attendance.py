@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, TIMESTAMP, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, Date, TIMESTAMP, Text, Enum, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
@@ -8,14 +8,18 @@ attendance_status_enum = ENUM('present', 'absence', name='attendance_status', cr
 
 class Attendance(Base):
     __tablename__ = 'attendance'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        # One mark per student per day; also serves the per-student date range lookups.
+        Index('uq_attendance_student_date', 'student_id', 'attendance_date', unique=True),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey('app.students.student_id', ondelete='CASCADE'), nullable=False)
     attendance_date = Column(Date, nullable=False)
     status = Column(attendance_status_enum, nullable=False, default='present')
     notes = Column(Text, nullable=True)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __repr__(self):
         return f"Attendance(id={self.id}, student_id={self.student_id}, attendance_date={self.attendance_date}, status='{self.status}')"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, BigInteger, String, TIMESTAMP, Index, text
+from app.config.postgres_orm_config import Base
+import datetime
+
+class AudioBlob(Base):
+    __tablename__ = 'audio_blobs'
+    __table_args__ = (
+        # Garbage collection only ever looks for unreferenced blobs.
+        Index('ix_audio_blobs_unreferenced', 'sha256', postgresql_where=text('ref_count = 0')),
+        {'schema': 'app'},
+    )
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    mime_type = Column(String(100), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def __repr__(self):
+        return f"AudioBlob(sha256='{self.sha256}', size_bytes={self.size_bytes}, ref_count={self.ref_count})"
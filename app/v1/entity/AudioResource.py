@@ -1,16 +1,37 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, TIMESTAMP, LargeBinary
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, Text, ForeignKey, TIMESTAMP, LargeBinary, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from app.config.postgres_orm_config import Base
 import datetime
 
 class AudioResource(Base):
     __tablename__ = 'audio_resources'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_audio_resources_class_section', 'class_value', 'section'),
+        Index('ix_audio_resources_processing_pending', 'id', postgresql_where=text("processing_status = 'pending'")),
+        {'schema': 'app'},
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    audio_data = Column(LargeBinary, nullable=False)
+    # Legacy inline audio, NULL once the content lives in the blob store (flask audio export-blobs).
+    # Only loaded when accessed explicitly; listings and authorization checks never need the bytes.
+    audio_data = deferred(Column(LargeBinary, nullable=True))
+    mime_type = Column(String(100), nullable=True)
+    content_sha256 = Column(String(64), nullable=True)  # blob key and strong ETag
+    size_bytes = Column(BigInteger, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    # Filled in by AudioProcessingService after upload.
+    processing_status = Column(String(20), nullable=False, default='pending')  # pending, ready or failed
+    processing_error = Column(Text, nullable=True)
+    sample_rate = Column(Integer, nullable=True)
+    channels = Column(Integer, nullable=True)
+    waveform = Column(JSONB, nullable=True)  # peak envelope, values 0..1
+    compact_sha256 = Column(String(64), nullable=True)  # speech-optimised rendition in the blob store
+    compact_size_bytes = Column(BigInteger, nullable=True)
+    compact_mime_type = Column(String(100), nullable=True)
     teacher_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
     class_value = Column(String(50), nullable=False)
     section = Column(String(20), nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, Text, ForeignKey, Enum, Index, text, Float
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
@@ -8,17 +8,25 @@ behavior_source_enum = ENUM('school', 'home', name='behavior_source', create_typ
 
 class BehaviorRecords(Base):
     __tablename__ = 'behavior_records'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_behavior_records_student_date', 'student_id', 'record_date'),
+        Index('ix_behavior_records_sentiment_pending', 'id', postgresql_where=text("sentiment_status = 'pending'")),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey('app.students.student_id', ondelete='CASCADE'), nullable=False)
     logged_by = Column(Integer, ForeignKey('app.users.id', ondelete='SET NULL'), nullable=True)
     source = Column(behavior_source_enum, nullable=False)
     behaviour_type = Column(String(255), nullable=True)
-    sentiment_score = Column(Integer, nullable=True)
+    sentiment_score = Column(Float, nullable=True)  # -1..1
+    sentiment_status = Column(String(10), nullable=False, default='pending')  # pending, scored or failed
+    sentiment_attempts = Column(Integer, nullable=False, default=0)
+    sentiment_retry_at = Column(TIMESTAMP(timezone=True), nullable=True)  # lease / backoff of the scoring worker
+    sentiment_error = Column(Text, nullable=True)
     comment = Column(Text, nullable=True)
     record_date = Column(Date, nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __repr__(self):
         return f"BehaviorRecords(id={self.id}, student_id={self.student_id}, source='{self.source}', behaviour_type='{self.behaviour_type}', record_date={self.record_date})"
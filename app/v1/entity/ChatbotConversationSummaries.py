@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import datetime
+from app.config.postgres_orm_config import Base
+
+class ChatbotConversationSummaries(Base):
+    __tablename__ = 'chatbot_conversation_summaries'
+    __table_args__ = {'schema': 'app'}
+
+    conversation_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
+    summary = Column(Text, nullable=False)
+    # Watermark: id of the newest app.chatbot_conversations turn folded into the summary.
+    summarized_through_id = Column(Integer, nullable=False)
+    turns_summarized = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def __repr__(self):
+        return f"ChatbotConversationSummaries(conversation_id={self.conversation_id}, summarized_through_id={self.summarized_through_id})"
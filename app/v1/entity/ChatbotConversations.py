@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, JSON, String
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, JSON, String, Index, text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
@@ -6,7 +6,15 @@ from app.config.postgres_orm_config import Base
 
 class ChatbotConversations(Base):
     __tablename__ = 'chatbot_conversations'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_chatbot_conversations_user_conversation_created', 'user_id', 'conversation_id', 'created_at'),
+        Index('ix_chatbot_conversations_conversation_id', 'conversation_id'),
+        Index('ix_chatbot_conversations_conversation_turns', 'conversation_id', 'id'),
+        Index('ix_chatbot_conversations_user_created', 'user_id', 'created_at', 'id'),
+        # Training examples for the local intent classifier.
+        Index('ix_chatbot_conversations_llm_intents', 'id', postgresql_where=text("intent_source = 'llm'")),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
@@ -15,7 +23,10 @@ class ChatbotConversations(Base):
     query = Column(Text, nullable=False)
     response = Column(JSON, nullable=False)
     emotion = Column(String, nullable=True)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
+    intent = Column(String(30), nullable=True)
+    intent_source = Column(String(10), nullable=True)  # 'local' (IntentClassifier) or 'llm'
+    context_tokens = Column(Integer, nullable=True)  # estimated size of the record context in the answer prompt
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc), server_default=func.now())
 
     def __repr__(self):
         return f"ChatbotConversations(id={self.id}, user_id={self.user_id}, chat_id={self.chat_id}, conversation_id={self.conversation_id})"
@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Boolean, ForeignKey, Index, text, func
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
 
 class CommunityForum(Base):
     __tablename__ = 'community_forum'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_community_forum_topics', 'created_at', 'id', postgresql_where=text('is_reply = false')),
+        Index('ix_community_forum_replies', 'forum_id', postgresql_where=text('is_reply = true')),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     parent_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
@@ -16,8 +20,8 @@ class CommunityForum(Base):
     is_anonymous = Column(Boolean, default=False)
     is_reply = Column(Boolean, default=False)
     forum_id = Column(Integer, ForeignKey('app.community_forum.id', ondelete='CASCADE'), nullable=True)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __repr__(self):
         return f"CommunityForum(id={self.id}, parent_id={self.parent_id}, student_id={self.student_id}, title='{self.title}', content='{self.content}', language='{self.language}', is_anonymous={self.is_anonymous}, is_reply={self.is_reply}, forum_id={self.forum_id})"
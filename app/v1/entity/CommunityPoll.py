@@ -1,20 +1,24 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
 
 class CommunityPoll(Base):
     __tablename__ = 'community_poll'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_community_poll_created', 'created_at', 'id'),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     parent_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
     student_id = Column(Integer, ForeignKey('app.students.student_id', ondelete='CASCADE'), nullable=False)
     question = Column(Text, nullable=True)
     options = Column(Text, nullable=True)  # JSON string of options
-    votes = Column(Text, nullable=False)  # JSON string of votes
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
+    # JSON string of vote counts cast before votes were recorded per user in app.community_poll_votes
+    votes = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __repr__(self):
         return f"CommunityPoll(id={self.id}, parent_id={self.parent_id}, student_id={self.student_id}, question='{self.question}', options='{self.options}', votes='{self.votes}')"
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, Index
+import datetime
+from app.config.postgres_orm_config import Base
+
+class CommunityPollVotes(Base):
+    __tablename__ = 'community_poll_votes'
+    __table_args__ = (
+        # Index-only scans for the per-option counts.
+        Index('ix_community_poll_votes_poll_option', 'poll_id', 'option'),
+        {'schema': 'app'},
+    )
+
+    # One vote per user per poll: the primary key is the deduplication.
+    poll_id = Column(Integer, ForeignKey('app.community_poll.id', ondelete='CASCADE'), primary_key=True)
+    user_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), primary_key=True)
+    option = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def __repr__(self):
+        return f"CommunityPollVotes(poll_id={self.poll_id}, user_id={self.user_id}, option='{self.option}')"
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, TIMESTAMP, Index
 from app.config.postgres_orm_config import Base
 import datetime
 
 class Event(Base):
     __tablename__ = 'events'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_events_class_section_date', 'class_value', 'section', 'event_date'),
+        {'schema': 'app'},
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -12,5 +15,5 @@ class Event(Base):
     teacher_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
     class_value = Column(String(50), nullable=False)
     section = Column(String(20), nullable=False)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Text, TIMESTAMP, Index
+from app.config.postgres_orm_config import Base
+import datetime
+
+class LLMCacheEntry(Base):
+    __tablename__ = 'llm_response_cache'
+    __table_args__ = (
+        Index('ix_llm_response_cache_expires_at', 'expires_at'),
+        {'schema': 'app'},
+    )
+
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 of the model, parameters and normalized messages
+    model = Column(String(100), nullable=False)
+    purpose = Column(String(50), nullable=True)
+    response = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"LLMCacheEntry(cache_key='{self.cache_key}', model='{self.model}', purpose='{self.purpose}')"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
@@ -8,7 +8,10 @@ notification_status_enum = ENUM('pending', 'delivered', 'failed', name='notifica
 
 class Notifications(Base):
     __tablename__ = 'notifications'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_notifications_user_id', 'user_id'),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
@@ -17,7 +20,7 @@ class Notifications(Base):
     urgency = Column(Integer, nullable=False)
     delivery_method = Column(String(50), nullable=False)
     status = Column(notification_status_enum, nullable=False, default='pending')
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __repr__(self):
         return f"Notifications(id={self.id}, user_id={self.user_id}, message='{self.message}', status='{self.status}')"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, Enum, Boolean, Index, text, func
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
@@ -8,7 +8,13 @@ sender_type_enum = ENUM('teacher', 'parent', name='sender_type', create_type=Fal
 
 class ParentTeacherChat(Base):
     __tablename__ = 'parent_teacher_chat'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_parent_teacher_chat_teacher_parent_created', 'teacher_id', 'parent_id', 'created_at', 'chat_id'),
+        Index('ix_parent_teacher_chat_teacher_created', 'teacher_id', 'created_at', 'chat_id'),
+        Index('ix_parent_teacher_chat_parent_created', 'parent_id', 'created_at', 'chat_id'),
+        Index('ix_parent_teacher_chat_unread', 'teacher_id', 'parent_id', postgresql_where=text('is_read = false')),
+        {'schema': 'app'},
+    )
 
     chat_id = Column(Integer, primary_key=True)
     teacher_id = Column(Integer, ForeignKey('app.users.id', ondelete='CASCADE'), nullable=False)
@@ -16,7 +22,7 @@ class ParentTeacherChat(Base):
     sender = Column(sender_type_enum, nullable=False)
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc), server_default=func.now())
 
     def __repr__(self):
         return f"ParentTeacherChat(chat_id={self.chat_id}, teacher_id={self.teacher_id}, parent_id={self.parent_id}, sender='{self.sender}', message='{self.message}')"
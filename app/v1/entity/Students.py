@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, TIMESTAMP, CheckConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
 from app.config.postgres_orm_config import Base
 
 class Students(Base):
     __tablename__ = 'students'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_students_class_section', 'class_value', 'section'),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     student_id = Column(Integer, primary_key=True)
@@ -16,8 +19,8 @@ class Students(Base):
     section = Column(String(20))
     date_of_birth = Column(Date)
     gender = Column(String(10))
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __repr__(self):
         return f"Students(student_id={self.student_id}, student_name='{self.student_name}', parent_name='{self.parent_name}')"
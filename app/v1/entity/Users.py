@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import ENUM
 import datetime
@@ -7,7 +7,10 @@ from app.v1.entity.Students import Students
 
 class Users(Base):
     __tablename__ = 'users'
-    __table_args__ = ({'schema': 'app'},)
+    __table_args__ = (
+        Index('ix_users_role_created', 'role', 'created_at', 'id'),
+        {'schema': 'app'},
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -18,8 +21,8 @@ class Users(Base):
     phone = Column(String(20))
     subject = Column(String(50), nullable=True)
     student_id = Column(Integer, ForeignKey('app.students.student_id'), nullable=True)
-    created_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = Column(TIMESTAMP(timezone=True), default=datetime.datetime.now(datetime.timezone.utc), onupdate=datetime.datetime.now(datetime.timezone.utc))
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc), onupdate=lambda: datetime.datetime.now(datetime.timezone.utc))
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
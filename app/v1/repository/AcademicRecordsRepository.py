@@ -1,5 +1,10 @@
+import csv
+import datetime
+import io
+from sqlalchemy import and_
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.AcademicRecords import AcademicRecords
+from app.v1.entity.Students import Students
 from app.config.logger_config import LogConfig
 
 # Set up a logger for this repository
@@ -12,20 +17,38 @@ class AcademicRecordsRepository:
     def get_record_by_id(self, record_id):
         """Retrieve an academic record by its ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching academic record with ID: {record_id}")
-            return session.query(AcademicRecords).filter(AcademicRecords.id == record_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching academic record with ID: {record_id}")
+        return session.query(AcademicRecords).filter(AcademicRecords.id == record_id).one_or_none()
 
-    def get_records_by_student_id(self, student_id):
-        """Retrieve academic records by student ID."""
+    def get_records_by_student_id(self, student_id, start_date=None, end_date=None):
+        """Retrieve academic records by student ID, optionally limited to an inclusive date range."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching academic records for student ID: {student_id}")
-            return session.query(AcademicRecords).filter(AcademicRecords.student_id == student_id).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching academic records for student ID: {student_id} between {start_date} and {end_date}")
+        query = session.query(AcademicRecords).filter(AcademicRecords.student_id == student_id)
+        if start_date:
+            query = query.filter(AcademicRecords.record_date >= start_date)
+        if end_date:
+            query = query.filter(AcademicRecords.record_date <= end_date)
+        return query.order_by(AcademicRecords.record_date, AcademicRecords.id).all()
+
+    def get_records_by_class_and_section(self, class_value, section, start_date=None, end_date=None):
+        """
+        Retrieve every student of a class section joined with their academic records in one query.
+        Returns (student, record) rows; record is None for students without records in the range.
+        """
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching academic records for class: {class_value}, section: {section} between {start_date} and {end_date}")
+        join_conditions = [AcademicRecords.student_id == Students.student_id]
+        if start_date:
+            join_conditions.append(AcademicRecords.record_date >= start_date)
+        if end_date:
+            join_conditions.append(AcademicRecords.record_date <= end_date)
+        return session.query(Students, AcademicRecords).outerjoin(
+            AcademicRecords, and_(*join_conditions)
+        ).filter(
+            Students.class_value == class_value,
+            Students.section == section
+        ).order_by(Students.student_id, AcademicRecords.record_date, AcademicRecords.id).all()
 
     def create_record(self, record_data):
         """Create a new academic record."""
@@ -33,15 +56,47 @@ class AcademicRecordsRepository:
         try:
             record = AcademicRecords(**record_data)
             session.add(record)
-            session.commit()
+            session.flush()
             logger.info(f"Created academic record for student ID: {record.student_id}")
             return record
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating academic record: {e}")
             raise e
-        finally:
-            session.close()
+
+    COPY_COLUMNS = ('student_id', 'subject', 'grade', 'record_date', 'teacher_id', 'created_at', 'updated_at')
+
+    def copy_records(self, records):
+        """
+        Bulk load academic records with PostgreSQL COPY on the session's connection, so the
+        rows join the current transaction. Returns the number of rows written.
+        """
+        if not records:
+            return 0
+        session = self.scoped_session_factory()
+        try:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for record in records:
+                writer.writerow([record['student_id'], record['subject'], record['grade'], record['record_date'].isoformat(),
+                                 record.get('teacher_id'), now.isoformat(), now.isoformat()])
+            buffer.seek(0)
+
+            cursor = session.connection().connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {AcademicRecords.__table__.fullname} ({', '.join(self.COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+            logger.info(f"Copied {len(records)} academic records")
+            return len(records)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error copying academic records: {e}")
+            raise e
 
     def update_record(self, record_id, record_data):
         """Update an existing academic record."""
@@ -51,7 +106,7 @@ class AcademicRecordsRepository:
             if record:
                 for key, value in record_data.items():
                     setattr(record, key, value)
-                session.commit()
+                session.flush()
                 logger.info(f"Updated academic record with ID: {record_id}")
                 return record
             logger.warning(f"Academic record with ID: {record_id} not found")
@@ -60,8 +115,6 @@ class AcademicRecordsRepository:
             session.rollback()
             logger.error(f"Error updating academic record: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_record(self, record_id):
         """Delete an academic record by its ID."""
@@ -70,7 +123,7 @@ class AcademicRecordsRepository:
             record = session.query(AcademicRecords).filter(AcademicRecords.id == record_id).one_or_none()
             if record:
                 session.delete(record)
-                session.commit()
+                session.flush()
                 logger.info(f"Deleted academic record with ID: {record_id}")
                 return True
             logger.warning(f"Academic record with ID: {record_id} not found")
@@ -79,5 +132,3 @@ class AcademicRecordsRepository:
             session.rollback()
             logger.error(f"Error deleting academic record: {e}")
             raise e
-        finally:
-            session.close()
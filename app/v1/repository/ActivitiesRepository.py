@@ -1,5 +1,6 @@
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.Activities import Activities
+from app.v1.entity.Students import Students
 from app.config.logger_config import LogConfig
 
 # Set up a logger for this repository
@@ -12,20 +13,28 @@ class ActivitiesRepository:
     def get_activity_by_id(self, activity_id):
         """Retrieve an activity by its ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching activity with ID: {activity_id}")
-            return session.query(Activities).filter(Activities.id == activity_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching activity with ID: {activity_id}")
+        return session.query(Activities).filter(Activities.id == activity_id).one_or_none()
 
     def get_activities_by_student_id(self, student_id):
         """Retrieve activities by student ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching activities for student ID: {student_id}")
-            return session.query(Activities).filter(Activities.student_id == student_id).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching activities for student ID: {student_id}")
+        return session.query(Activities).filter(Activities.student_id == student_id).order_by(Activities.id).all()
+
+    def get_activities_by_class_and_section(self, class_value, section):
+        """
+        Retrieve every student of a class section joined with their activities in one query.
+        Returns (student, activity) rows; activity is None for students without activities.
+        """
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching activities for class: {class_value}, section: {section}")
+        return session.query(Students, Activities).outerjoin(
+            Activities, Activities.student_id == Students.student_id
+        ).filter(
+            Students.class_value == class_value,
+            Students.section == section
+        ).order_by(Students.student_id, Activities.id).all()
 
     def create_activity(self, activity_data):
         """Create a new activity."""
@@ -33,15 +42,13 @@ class ActivitiesRepository:
         try:
             activity = Activities(**activity_data)
             session.add(activity)
-            session.commit()
+            session.flush()
             logger.info(f"Created activity for student ID: {activity.student_id}")
             return activity
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating activity: {e}")
             raise e
-        finally:
-            session.close()
 
     def update_activity(self, activity_id, activity_data):
         """Update an existing activity."""
@@ -51,7 +58,7 @@ class ActivitiesRepository:
             if activity:
                 for key, value in activity_data.items():
                     setattr(activity, key, value)
-                session.commit()
+                session.flush()
                 logger.info(f"Updated activity with ID: {activity_id}")
                 return activity
             logger.warning(f"Activity with ID: {activity_id} not found")
@@ -60,8 +67,6 @@ class ActivitiesRepository:
             session.rollback()
             logger.error(f"Error updating activity: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_activity(self, activity_id):
         """Delete an activity by its ID."""
@@ -70,7 +75,7 @@ class ActivitiesRepository:
             activity = session.query(Activities).filter(Activities.id == activity_id).one_or_none()
             if activity:
                 session.delete(activity)
-                session.commit()
+                session.flush()
                 logger.info(f"Deleted activity with ID: {activity_id}")
                 return True
             logger.warning(f"Activity with ID: {activity_id} not found")
@@ -79,5 +84,3 @@ class ActivitiesRepository:
             session.rollback()
             logger.error(f"Error deleting activity: {e}")
             raise e
-        finally:
-            session.close()
@@ -16,39 +16,30 @@ class AssessmentRepository:
         try:
             assessment = Assessment(**assessment_data)
             session.add(assessment)
-            session.commit()
-            session.refresh(assessment)
+            session.flush()
             logger.info(f"Created assessment with ID: {assessment.id}")
             return assessment
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating assessment: {e}")
             raise e
-        finally:
-            session.close()
 
     def get_upcoming_assessments(self, class_value, section):
         """Retrieve upcoming assessments filtered by class value and section."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching upcoming assessments for class: {class_value}, section: {section}")
-            return session.query(Assessment).filter(
-                Assessment.assessment_date >= datetime.datetime.utcnow(),
-                Assessment.class_value == class_value,
-                Assessment.section == section
-            ).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching upcoming assessments for class: {class_value}, section: {section}")
+        return session.query(Assessment).filter(
+            Assessment.assessment_date >= datetime.datetime.utcnow(),
+            Assessment.class_value == class_value,
+            Assessment.section == section
+        ).all()
 
     def get_previous_assessments(self, class_value, section):
         """Retrieve previous assessments filtered by class value and section."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching previous assessments for class: {class_value}, section: {section}")
-            return session.query(Assessment).filter(
-                Assessment.assessment_date < datetime.datetime.utcnow(),
-                Assessment.class_value == class_value,
-                Assessment.section == section
-            ).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching previous assessments for class: {class_value}, section: {section}")
+        return session.query(Assessment).filter(
+            Assessment.assessment_date < datetime.datetime.utcnow(),
+            Assessment.class_value == class_value,
+            Assessment.section == section
+        ).all()
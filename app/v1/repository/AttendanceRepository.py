@@ -1,6 +1,10 @@
+from sqlalchemy import and_, extract
+from sqlalchemy.dialects.postgresql import insert
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.Attendance import Attendance
+from app.v1.entity.Students import Students
 from app.config.logger_config import LogConfig
+import datetime
 
 # Set up a logger for this repository
 logger = LogConfig.setup_logger(__name__)
@@ -12,20 +16,44 @@ class AttendanceRepository:
     def get_attendance_by_id(self, attendance_id):
         """Retrieve an attendance record by its ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching attendance record with ID: {attendance_id}")
-            return session.query(Attendance).filter(Attendance.id == attendance_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching attendance record with ID: {attendance_id}")
+        return session.query(Attendance).filter(Attendance.id == attendance_id).one_or_none()
+
+    @staticmethod
+    def period_conditions(month=None, year=None):
+        """Build attendance_date conditions for an optional month and/or year (as date ranges where possible)."""
+        if year and month:
+            start = datetime.date(year, month, 1)
+            end = datetime.date(year + 1, 1, 1) if month == 12 else datetime.date(year, month + 1, 1)
+            return [Attendance.attendance_date >= start, Attendance.attendance_date < end]
+        if year:
+            return [Attendance.attendance_date >= datetime.date(year, 1, 1), Attendance.attendance_date < datetime.date(year + 1, 1, 1)]
+        if month:
+            return [extract('month', Attendance.attendance_date) == month]
+        return []
 
-    def get_attendance_by_student_id(self, student_id):
-        """Retrieve attendance records by student ID."""
+    def get_attendance_by_student_id(self, student_id, month=None, year=None):
+        """Retrieve attendance records by student ID, optionally limited to a month and/or year."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching attendance records for student ID: {student_id}")
-            return session.query(Attendance).filter(Attendance.student_id == student_id).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching attendance records for student ID: {student_id}, month: {month}, year: {year}")
+        return session.query(Attendance).filter(
+            Attendance.student_id == student_id,
+            *self.period_conditions(month, year)
+        ).order_by(Attendance.attendance_date, Attendance.id).all()
+
+    def get_attendance_by_class_and_section(self, class_value, section, month=None, year=None):
+        """
+        Retrieve every student of a class section joined with their attendance records in one query.
+        Returns (student, record) rows; record is None for students without records in the period.
+        """
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching attendance records for class: {class_value}, section: {section}, month: {month}, year: {year}")
+        return session.query(Students, Attendance).outerjoin(
+            Attendance, and_(Attendance.student_id == Students.student_id, *self.period_conditions(month, year))
+        ).filter(
+            Students.class_value == class_value,
+            Students.section == section
+        ).order_by(Students.student_id, Attendance.attendance_date, Attendance.id).all()
 
     def create_attendance(self, attendance_data):
         """Create a new attendance record."""
@@ -33,15 +61,34 @@ class AttendanceRepository:
         try:
             attendance = Attendance(**attendance_data)
             session.add(attendance)
-            session.commit()
+            session.flush()
             logger.info(f"Created attendance record for student ID: {attendance.student_id}")
             return attendance
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating attendance record: {e}")
             raise e
-        finally:
-            session.close()
+
+    def bulk_create_attendance(self, records):
+        """
+        Insert many attendance records with one multi-row statement, skipping records that
+        already exist for the same (student_id, attendance_date).
+        Returns {student_id: record_id} for the records that were inserted.
+        """
+        if not records:
+            return {}
+        session = self.scoped_session_factory()
+        try:
+            statement = insert(Attendance).values(records).on_conflict_do_nothing(
+                index_elements=[Attendance.student_id, Attendance.attendance_date]
+            ).returning(Attendance.id, Attendance.student_id)
+            inserted = {row.student_id: row.id for row in session.execute(statement)}
+            logger.info(f"Bulk created {len(inserted)} of {len(records)} attendance records")
+            return inserted
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk creating attendance records: {e}")
+            raise e
 
     def update_attendance(self, attendance_id, attendance_data):
         """Update an existing attendance record."""
@@ -51,7 +98,7 @@ class AttendanceRepository:
             if attendance:
                 for key, value in attendance_data.items():
                     setattr(attendance, key, value)
-                session.commit()
+                session.flush()
                 logger.info(f"Updated attendance record with ID: {attendance_id}")
                 return attendance
             logger.warning(f"Attendance record with ID: {attendance_id} not found")
@@ -60,8 +107,6 @@ class AttendanceRepository:
             session.rollback()
             logger.error(f"Error updating attendance record: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_attendance(self, attendance_id):
         """Delete an attendance record by its ID."""
@@ -70,7 +115,7 @@ class AttendanceRepository:
             attendance = session.query(Attendance).filter(Attendance.id == attendance_id).one_or_none()
             if attendance:
                 session.delete(attendance)
-                session.commit()
+                session.flush()
                 logger.info(f"Deleted attendance record with ID: {attendance_id}")
                 return True
             logger.warning(f"Attendance record with ID: {attendance_id} not found")
@@ -79,5 +124,3 @@ class AttendanceRepository:
             session.rollback()
             logger.error(f"Error deleting attendance record: {e}")
             raise e
-        finally:
-            session.close()
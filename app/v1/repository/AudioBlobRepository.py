@@ -0,0 +1,100 @@
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from app.config.postgres_orm_config import scoped_session_factory
+from app.v1.entity.AudioBlob import AudioBlob
+from app.config.logger_config import LogConfig
+
+# Set up a logger for this repository
+logger = LogConfig.setup_logger(__name__)
+
+class AudioBlobRepository:
+    def __init__(self, scoped_session_factory):
+        self.scoped_session_factory = scoped_session_factory
+
+    def acquire(self, sha256, size_bytes, mime_type=None):
+        """
+        Add a reference to a blob, registering it on first use. Returns the new reference count.
+        The blob row stays locked until the transaction ends, which keeps garbage collection from
+        removing the blob while it is being (re)written.
+        """
+        session = self.scoped_session_factory()
+        try:
+            statement = insert(AudioBlob).values(
+                sha256=sha256, size_bytes=size_bytes, mime_type=mime_type, ref_count=1
+            ).on_conflict_do_update(
+                index_elements=[AudioBlob.sha256],
+                set_={'ref_count': AudioBlob.ref_count + 1}
+            ).returning(AudioBlob.ref_count)
+            ref_count = session.execute(statement).scalar()
+            logger.info(f"Acquired audio blob {sha256} (references: {ref_count})")
+            return ref_count
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error acquiring audio blob: {e}")
+            raise e
+
+    def register_unreferenced(self, sha256, size_bytes):
+        """
+        Register a blob with no references unless it already has a row. Blocks while another
+        transaction holds an uncommitted row for the same hash.
+        """
+        session = self.scoped_session_factory()
+        try:
+            statement = insert(AudioBlob).values(
+                sha256=sha256, size_bytes=size_bytes, ref_count=0
+            ).on_conflict_do_nothing(index_elements=[AudioBlob.sha256])
+            session.execute(statement)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error registering audio blob: {e}")
+            raise e
+
+    def release(self, sha256):
+        """Drop a reference to a blob. Returns the remaining reference count, or None for an unknown blob."""
+        session = self.scoped_session_factory()
+        try:
+            statement = update(AudioBlob).where(
+                AudioBlob.sha256 == sha256,
+                AudioBlob.ref_count > 0
+            ).values(ref_count=AudioBlob.ref_count - 1).returning(AudioBlob.ref_count)
+            ref_count = session.execute(statement).scalar()
+            logger.info(f"Released audio blob {sha256} (references: {ref_count})")
+            return ref_count
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error releasing audio blob: {e}")
+            raise e
+
+    def delete_if_unreferenced(self, sha256):
+        """Delete a blob's row if nothing references it. Returns True if the row was deleted."""
+        session = self.scoped_session_factory()
+        try:
+            statement = delete(AudioBlob).where(
+                AudioBlob.sha256 == sha256,
+                AudioBlob.ref_count == 0
+            ).returning(AudioBlob.sha256)
+            deleted = session.execute(statement).scalar() is not None
+            if deleted:
+                logger.info(f"Deleted unreferenced audio blob {sha256}")
+            return deleted
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting audio blob: {e}")
+            raise e
+
+    def get_unreferenced_hashes(self, limit=None):
+        """Retrieve the hashes of blobs that no audio resource references any more."""
+        session = self.scoped_session_factory()
+        logger.info("Fetching unreferenced audio blobs")
+        query = session.query(AudioBlob.sha256).filter(AudioBlob.ref_count == 0).order_by(AudioBlob.sha256)
+        if limit:
+            query = query.limit(limit)
+        return [sha256 for sha256, in query.all()]
+
+    def get_registered_hashes(self, hashes):
+        """Return the subset of `hashes` that have an app.audio_blobs row."""
+        if not hashes:
+            return set()
+        session = self.scoped_session_factory()
+        rows = session.query(AudioBlob.sha256).filter(AudioBlob.sha256.in_(hashes)).all()
+        return {sha256 for sha256, in rows}
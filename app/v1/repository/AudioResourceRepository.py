@@ -1,7 +1,7 @@
+from sqlalchemy import func
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.AudioResource import AudioResource
 from app.config.logger_config import LogConfig
-import datetime
 
 # Set up a logger for this repository
 logger = LogConfig.setup_logger(__name__)
@@ -16,50 +16,114 @@ class AudioResourceRepository:
         try:
             resource = AudioResource(**resource_data)
             session.add(resource)
-            session.commit()
-            session.refresh(resource)
+            session.flush()
             logger.info(f"Created audio resource with ID: {resource.id}")
             return resource
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating audio resource: {e}")
             raise e
-        finally:
-            session.close()
 
     def get_audio_resources_by_class_and_section(self, class_value, section):
-        """Retrieve audio resources filtered by class value and section."""
+        """Retrieve audio resource metadata filtered by class value and section, without the audio bytes."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching audio resources for class: {class_value}, section: {section}")
-            return session.query(AudioResource).filter(
-                AudioResource.class_value == class_value,
-                AudioResource.section == section
-            ).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching audio resources for class: {class_value}, section: {section}")
+        return session.query(AudioResource).filter(
+            AudioResource.class_value == class_value,
+            AudioResource.section == section
+        ).order_by(AudioResource.created_at, AudioResource.id).all()
 
     def get_audio_resource_by_id(self, resource_id):
         """Retrieve an audio resource by its ID."""
         session = self.scoped_session_factory()
+        logger.info(f"Fetching audio resource with ID: {resource_id}")
+        return session.query(AudioResource).filter(AudioResource.id == resource_id).first()
+
+    def get_audio_content_info(self, resource_id):
+        """
+        Retrieve an audio resource and whether its audio is still stored inline (not yet exported
+        to the blob store), without loading the bytes. Returns (resource, is_inline) or None.
+        """
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching audio content info for resource ID: {resource_id}")
+        return session.query(AudioResource, AudioResource.audio_data.isnot(None)).filter(
+            AudioResource.id == resource_id
+        ).first()
+
+    def get_inline_audio_resource_ids(self, limit):
+        """Retrieve the IDs of resources whose audio is still stored inline."""
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching up to {limit} audio resources with inline audio")
+        return [resource_id for resource_id, in session.query(AudioResource.id).filter(
+            AudioResource.audio_data.isnot(None)
+        ).order_by(AudioResource.id).limit(limit).all()]
+
+    def get_audio_data(self, resource_id):
+        """Retrieve only the inline audio bytes of a resource."""
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching audio data for resource ID: {resource_id}")
+        return session.query(AudioResource.audio_data).filter(AudioResource.id == resource_id).scalar()
+
+    def move_audio_to_blob(self, resource_id, sha256, size_bytes):
+        """Point a resource at its blob and clear the inline audio."""
+        session = self.scoped_session_factory()
         try:
-            logger.info(f"Fetching audio resource with ID: {resource_id}")
-            return session.query(AudioResource).filter(AudioResource.id == resource_id).first()
-        finally:
-            session.close()
+            session.query(AudioResource).filter(AudioResource.id == resource_id).update(
+                {'audio_data': None, 'content_sha256': sha256, 'size_bytes': size_bytes},
+                synchronize_session=False
+            )
+            logger.info(f"Moved audio of resource ID: {resource_id} to blob {sha256}")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error moving audio resource to blob store: {e}")
+            raise e
+
+    def get_audio_chunk(self, resource_id, offset, length):
+        """Retrieve `length` bytes of a resource's audio starting at byte `offset` (0-based)."""
+        session = self.scoped_session_factory()
+        return session.query(func.substring(AudioResource.audio_data, offset + 1, length)).filter(
+            AudioResource.id == resource_id
+        ).scalar()
+
+    def get_audio_resource_ids_by_status(self, statuses, limit, after_id=0):
+        """Retrieve the IDs of resources in the given processing statuses, in ID order after `after_id`."""
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching up to {limit} audio resources with processing status in {statuses}")
+        return [resource_id for resource_id, in session.query(AudioResource.id).filter(
+            AudioResource.processing_status.in_(statuses),
+            AudioResource.id > after_id
+        ).order_by(AudioResource.id).limit(limit).all()]
+
+    def update_processing_result(self, resource_id, result):
+        """Record the outcome of audio processing. Returns False if the resource no longer exists."""
+        session = self.scoped_session_factory()
+        try:
+            updated = session.query(AudioResource).filter(AudioResource.id == resource_id).update(
+                result, synchronize_session=False
+            )
+            logger.info(f"Updated processing result of audio resource ID: {resource_id} ({result.get('processing_status')})")
+            return updated > 0
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating audio processing result: {e}")
+            raise e
 
     def delete_audio_resource(self, resource_id):
-        """Delete an audio resource by its ID."""
+        """
+        Delete an audio resource by its ID. Returns the deleted resource as it was when locked,
+        so callers release the blobs it referenced at that point, or None if it did not exist.
+        """
         session = self.scoped_session_factory()
         try:
             logger.info(f"Deleting audio resource with ID: {resource_id}")
-            resource = session.query(AudioResource).filter(AudioResource.id == resource_id).first()
+            resource = session.query(AudioResource).filter(
+                AudioResource.id == resource_id
+            ).populate_existing().with_for_update().first()
             if resource:
                 session.delete(resource)
-                session.commit()
+                session.flush()
+            return resource
         except Exception as e:
             session.rollback()
             logger.error(f"Error deleting audio resource: {e}")
             raise e
-        finally:
-            session.close()
@@ -1,5 +1,8 @@
+import datetime
+from sqlalchemy import and_, func, or_
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.BehaviorRecords import BehaviorRecords
+from app.v1.entity.Students import Students
 from app.config.logger_config import LogConfig
 
 # Set up a logger for this repository
@@ -12,20 +15,38 @@ class BehaviorRecordsRepository:
     def get_record_by_id(self, record_id):
         """Retrieve a behavior record by its ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching behavior record with ID: {record_id}")
-            return session.query(BehaviorRecords).filter(BehaviorRecords.id == record_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching behavior record with ID: {record_id}")
+        return session.query(BehaviorRecords).filter(BehaviorRecords.id == record_id).one_or_none()
 
-    def get_records_by_student_id(self, student_id):
-        """Retrieve behavior records by student ID."""
+    def get_records_by_student_id(self, student_id, start_date=None, end_date=None):
+        """Retrieve behavior records by student ID, optionally limited to an inclusive date range."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching behavior records for student ID: {student_id}")
-            return session.query(BehaviorRecords).filter(BehaviorRecords.student_id == student_id).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching behavior records for student ID: {student_id} between {start_date} and {end_date}")
+        query = session.query(BehaviorRecords).filter(BehaviorRecords.student_id == student_id)
+        if start_date:
+            query = query.filter(BehaviorRecords.record_date >= start_date)
+        if end_date:
+            query = query.filter(BehaviorRecords.record_date <= end_date)
+        return query.order_by(BehaviorRecords.record_date, BehaviorRecords.id).all()
+
+    def get_records_by_class_and_section(self, class_value, section, start_date=None, end_date=None):
+        """
+        Retrieve every student of a class section joined with their behavior records in one query.
+        Returns (student, record) rows; record is None for students without records in the range.
+        """
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching behavior records for class: {class_value}, section: {section} between {start_date} and {end_date}")
+        join_conditions = [BehaviorRecords.student_id == Students.student_id]
+        if start_date:
+            join_conditions.append(BehaviorRecords.record_date >= start_date)
+        if end_date:
+            join_conditions.append(BehaviorRecords.record_date <= end_date)
+        return session.query(Students, BehaviorRecords).outerjoin(
+            BehaviorRecords, and_(*join_conditions)
+        ).filter(
+            Students.class_value == class_value,
+            Students.section == section
+        ).order_by(Students.student_id, BehaviorRecords.record_date, BehaviorRecords.id).all()
 
     def create_record(self, record_data):
         """Create a new behavior record."""
@@ -33,15 +54,89 @@ class BehaviorRecordsRepository:
         try:
             record = BehaviorRecords(**record_data)
             session.add(record)
-            session.commit()
+            session.flush()
             logger.info(f"Created behavior record for student ID: {record.student_id}")
             return record
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating behavior record: {e}")
             raise e
-        finally:
-            session.close()
+
+    def create_records(self, records_data):
+        """Create several behavior records in the current transaction."""
+        session = self.scoped_session_factory()
+        try:
+            records = [BehaviorRecords(**record_data) for record_data in records_data]
+            session.add_all(records)
+            session.flush()
+            logger.info(f"Created {len(records)} behavior records")
+            return records
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error creating behavior records: {e}")
+            raise e
+
+    def claim_pending_sentiment(self, limit, lease_seconds):
+        """
+        Lock up to `limit` records awaiting sentiment scoring, skipping rows another worker holds,
+        and lease them for `lease_seconds`. Returns (id, source, comment, attempts) tuples.
+        """
+        session = self.scoped_session_factory()
+        try:
+            records = session.query(BehaviorRecords).filter(
+                BehaviorRecords.sentiment_status == 'pending',
+                or_(BehaviorRecords.sentiment_retry_at.is_(None), BehaviorRecords.sentiment_retry_at <= func.now())
+            ).order_by(BehaviorRecords.id).limit(limit).with_for_update(skip_locked=True).all()
+            for record in records:
+                record.sentiment_attempts += 1
+                record.sentiment_retry_at = func.now() + datetime.timedelta(seconds=lease_seconds)
+            session.flush()
+            logger.info(f"Claimed {len(records)} behavior record(s) for sentiment scoring")
+            return [(record.id, record.source, record.comment, record.sentiment_attempts) for record in records]
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming behavior records for sentiment scoring: {e}")
+            raise e
+
+    def save_sentiment(self, record_id, sentiment_data):
+        """Write a scoring result to a record that is still pending. Returns False if it no longer is."""
+        session = self.scoped_session_factory()
+        try:
+            updated = session.query(BehaviorRecords).filter(
+                BehaviorRecords.id == record_id,
+                BehaviorRecords.sentiment_status == 'pending'
+            ).update(sentiment_data, synchronize_session=False)
+            logger.info(f"Saved sentiment ({sentiment_data.get('sentiment_status')}) for behavior record ID: {record_id}")
+            return updated > 0
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving sentiment for behavior record: {e}")
+            raise e
+
+    def get_next_sentiment_retry_at(self):
+        """Return the earliest time a pending record becomes claimable again, or None if none is waiting."""
+        session = self.scoped_session_factory()
+        return session.query(func.min(BehaviorRecords.sentiment_retry_at)).filter(
+            BehaviorRecords.sentiment_status == 'pending',
+            BehaviorRecords.sentiment_retry_at.isnot(None)
+        ).scalar()
+
+    def reset_failed_sentiment(self):
+        """Return records whose scoring failed to the pending queue. Returns the number of records reset."""
+        session = self.scoped_session_factory()
+        try:
+            reset = session.query(BehaviorRecords).filter(BehaviorRecords.sentiment_status == 'failed').update({
+                'sentiment_status': 'pending',
+                'sentiment_attempts': 0,
+                'sentiment_retry_at': None,
+                'sentiment_error': None
+            }, synchronize_session=False)
+            logger.info(f"Reset {reset} failed behavior record(s) to pending sentiment scoring")
+            return reset
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error resetting failed sentiment scoring: {e}")
+            raise e
 
     def update_record(self, record_id, record_data):
         """Update an existing behavior record."""
@@ -51,7 +146,7 @@ class BehaviorRecordsRepository:
             if record:
                 for key, value in record_data.items():
                     setattr(record, key, value)
-                session.commit()
+                session.flush()
                 logger.info(f"Updated behavior record with ID: {record_id}")
                 return record
             logger.warning(f"Behavior record with ID: {record_id} not found")
@@ -60,8 +155,6 @@ class BehaviorRecordsRepository:
             session.rollback()
             logger.error(f"Error updating behavior record: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_record(self, record_id):
         """Delete a behavior record by its ID."""
@@ -70,7 +163,7 @@ class BehaviorRecordsRepository:
             record = session.query(BehaviorRecords).filter(BehaviorRecords.id == record_id).one_or_none()
             if record:
                 session.delete(record)
-                session.commit()
+                session.flush()
                 logger.info(f"Deleted behavior record with ID: {record_id}")
                 return True
             logger.warning(f"Behavior record with ID: {record_id} not found")
@@ -79,5 +172,3 @@ class BehaviorRecordsRepository:
             session.rollback()
             logger.error(f"Error deleting behavior record: {e}")
             raise e
-        finally:
-            session.close()
@@ -0,0 +1,55 @@
+import datetime
+from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert
+from app.config.postgres_orm_config import scoped_session_factory
+from app.v1.entity.ChatbotConversationSummaries import ChatbotConversationSummaries
+from app.config.logger_config import LogConfig
+
+# Set up a logger for this repository
+logger = LogConfig.setup_logger(__name__)
+
+class ChatbotConversationSummariesRepository:
+    def __init__(self, scoped_session_factory):
+        self.scoped_session_factory = scoped_session_factory
+
+    def get_summary(self, conversation_id, user_id=None):
+        """Retrieve the rolling summary of a conversation, optionally only if it belongs to `user_id`."""
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching summary of conversation ID: {conversation_id}")
+        query = session.query(ChatbotConversationSummaries).filter(
+            ChatbotConversationSummaries.conversation_id == conversation_id
+        )
+        if user_id is not None:
+            query = query.filter(ChatbotConversationSummaries.user_id == user_id)
+        return query.one_or_none()
+
+    def save_summary(self, conversation_id, user_id, summary, summarized_through_id, turns_summarized):
+        """
+        Create or advance a conversation summary. A summary is only replaced by one of the same user
+        with a later watermark, so a slow concurrent update can never roll it back. Returns True if stored.
+        """
+        session = self.scoped_session_factory()
+        try:
+            values = {
+                'summary': summary,
+                'summarized_through_id': summarized_through_id,
+                'turns_summarized': turns_summarized,
+                'updated_at': datetime.datetime.now(datetime.timezone.utc)
+            }
+            statement = insert(ChatbotConversationSummaries).values(
+                conversation_id=conversation_id, user_id=user_id, **values
+            ).on_conflict_do_update(
+                index_elements=[ChatbotConversationSummaries.conversation_id],
+                set_=values,
+                where=and_(
+                    ChatbotConversationSummaries.user_id == user_id,
+                    ChatbotConversationSummaries.summarized_through_id < summarized_through_id
+                )
+            )
+            stored = session.execute(statement).rowcount > 0
+            logger.info(f"Saved summary of conversation ID: {conversation_id} through turn {summarized_through_id}: {stored}")
+            return stored
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving conversation summary: {e}")
+            raise e
@@ -1,6 +1,7 @@
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.ChatbotConversations import ChatbotConversations
 from app.config.logger_config import LogConfig
+from app.utils.pagination import paginate
 
 # Set up a logger for this repository
 logger = LogConfig.setup_logger(__name__)
@@ -12,32 +13,49 @@ class ChatbotConversationsRepository:
     def get_conversation_by_id(self, conversation_id):
         """Retrieve a chatbot conversation by its ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching conversation with ID: {conversation_id}")
-            return session.query(ChatbotConversations).filter(ChatbotConversations.conversation_id == conversation_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching conversation with ID: {conversation_id}")
+        return session.query(ChatbotConversations).filter(ChatbotConversations.conversation_id == conversation_id).one_or_none()
 
-    def get_conversations_by_user_id(self, user_id):
-        """Retrieve chatbot conversations by user ID."""
+    def get_conversations_by_user_id(self, user_id, cursor=None, limit=None):
+        """Retrieve one page of chatbot conversations by user ID, newest first. Returns (conversations, next_cursor)."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching chatbot conversations for user ID: {user_id}")
-            return session.query(ChatbotConversations).filter(ChatbotConversations.user_id == user_id).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching chatbot conversations for user ID: {user_id}, cursor: {cursor}, limit: {limit}")
+        query = session.query(ChatbotConversations).filter(ChatbotConversations.user_id == user_id)
+        return paginate(query, ChatbotConversations.created_at, ChatbotConversations.id, cursor, limit)
 
     def get_last_n_conversations(self, user_id, conversation_id, n):
         """Retrieve the last N chatbot conversations for a user and conversation ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching last {n} conversations for user ID: {user_id} and conversation ID: {conversation_id}")
-            return session.query(ChatbotConversations).filter(
-                ChatbotConversations.user_id == user_id,
-                ChatbotConversations.conversation_id == conversation_id
-            ).order_by(ChatbotConversations.created_at.desc()).limit(n).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching last {n} conversations for user ID: {user_id} and conversation ID: {conversation_id}")
+        return session.query(ChatbotConversations).filter(
+            ChatbotConversations.user_id == user_id,
+            ChatbotConversations.conversation_id == conversation_id
+        ).order_by(ChatbotConversations.created_at.desc()).limit(n).all()
+
+    def get_turns_after(self, conversation_id, after_id, user_id=None, limit=None):
+        """
+        Retrieve the turns of a conversation with an ID above `after_id`, oldest first.
+        With `limit`, only the newest `limit` of them are returned.
+        """
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching turns of conversation ID: {conversation_id} after turn {after_id}")
+        query = session.query(ChatbotConversations).filter(
+            ChatbotConversations.conversation_id == conversation_id,
+            ChatbotConversations.id > after_id
+        )
+        if user_id is not None:
+            query = query.filter(ChatbotConversations.user_id == user_id)
+        if limit is not None:
+            return query.order_by(ChatbotConversations.id.desc()).limit(limit).all()[::-1]
+        return query.order_by(ChatbotConversations.id).all()
+
+    def get_llm_labelled_queries(self, limit):
+        """Retrieve the most recent (query, intent) pairs whose intent was classified by the LLM."""
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching up to {limit} LLM-labelled chatbot queries")
+        return session.query(ChatbotConversations.query, ChatbotConversations.intent).filter(
+            ChatbotConversations.intent_source == 'llm'
+        ).order_by(ChatbotConversations.id.desc()).limit(limit).all()
 
     def create_conversation(self, conversation_data):
         """Create a new chatbot conversation."""
@@ -45,16 +63,13 @@ class ChatbotConversationsRepository:
         try:
             conversation = ChatbotConversations(**conversation_data)
             session.add(conversation)
-            session.commit()
-            session.refresh(conversation)
+            session.flush()
             logger.info(f"Created conversation with ID: {conversation.conversation_id}")
             return conversation
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating conversation: {e}")
             raise e
-        finally:
-            session.close()
 
     def update_conversation(self, conversation_id, conversation_data):
         """Update an existing chatbot conversation."""
@@ -64,7 +79,7 @@ class ChatbotConversationsRepository:
             if conversation:
                 for key, value in conversation_data.items():
                     setattr(conversation, key, value)
-                session.commit()
+                session.flush()
                 logger.info(f"Updated chatbot conversation with ID: {conversation_id}")
                 return conversation
             logger.warning(f"Chatbot conversation with ID: {conversation_id} not found")
@@ -73,8 +88,6 @@ class ChatbotConversationsRepository:
             session.rollback()
             logger.error(f"Error updating chatbot conversation: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_conversation(self, conversation_id):
         """Delete a chatbot conversation by its ID."""
@@ -83,7 +96,7 @@ class ChatbotConversationsRepository:
             conversation = session.query(ChatbotConversations).filter(ChatbotConversations.id == conversation_id).one_or_none()
             if conversation:
                 session.delete(conversation)
-                session.commit()
+                session.flush()
                 logger.info(f"Deleted chatbot conversation with ID: {conversation_id}")
                 return True
             logger.warning(f"Chatbot conversation with ID: {conversation_id} not found")
@@ -92,5 +105,3 @@ class ChatbotConversationsRepository:
             session.rollback()
             logger.error(f"Error deleting chatbot conversation: {e}")
             raise e
-        finally:
-            session.close()
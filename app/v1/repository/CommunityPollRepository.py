@@ -1,6 +1,10 @@
+from sqlalchemy import cast, func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from app.config.postgres_orm_config import scoped_session_factory
 from app.v1.entity.CommunityPoll import CommunityPoll
+from app.v1.entity.CommunityPollVotes import CommunityPollVotes
 from app.config.logger_config import LogConfig
+from app.utils.pagination import paginate
 
 # Set up a logger for this repository
 logger = LogConfig.setup_logger(__name__)
@@ -9,14 +13,11 @@ class CommunityPollRepository:
     def __init__(self, scoped_session_factory):
         self.scoped_session_factory = scoped_session_factory
 
-    def get_all_polls(self):
-        """Retrieve all active polls."""
+    def get_all_polls(self, cursor=None, limit=None):
+        """Retrieve one page of active polls, newest first. Returns (polls, next_cursor)."""
         session = self.scoped_session_factory()
-        try:
-            logger.info("Fetching all active polls")
-            return session.query(CommunityPoll).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching active polls, cursor: {cursor}, limit: {limit}")
+        return paginate(session.query(CommunityPoll), CommunityPoll.created_at, CommunityPoll.id, cursor, limit)
 
     def create_poll(self, poll_data):
         """Create a new poll."""
@@ -24,16 +25,13 @@ class CommunityPollRepository:
         try:
             poll = CommunityPoll(**poll_data)
             session.add(poll)
-            session.commit()
-            session.refresh(poll)  # Ensure the poll instance is bound to the session
+            session.flush()
             logger.info(f"Created poll with ID: {poll.id}")
             return poll
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating poll: {e}")
             raise e
-        finally:
-            session.close()
 
     def update_poll_votes(self, poll_id, votes):
         """Update votes for a poll."""
@@ -42,7 +40,7 @@ class CommunityPollRepository:
             poll = session.query(CommunityPoll).filter(CommunityPoll.id == poll_id).one_or_none()
             if poll:
                 poll.votes = votes
-                session.commit()
+                session.flush()
                 logger.info(f"Updated votes for poll with ID: {poll_id}")
                 return None
             logger.warning(f"Poll with ID: {poll_id} not found")
@@ -51,14 +49,62 @@ class CommunityPollRepository:
             session.rollback()
             logger.error(f"Error updating poll votes: {e}")
             raise e
-        finally:
-            session.close()
 
     def get_poll_by_id(self, poll_id):
         """Retrieve a poll by its ID."""
         session = self.scoped_session_factory()
+        logger.info(f"Fetching poll with ID: {poll_id}")
+        return session.query(CommunityPoll).filter(CommunityPoll.id == poll_id).one_or_none()
+
+    def cast_vote(self, poll_id, user_id, option):
+        """
+        Record a vote in a single statement. It is inserted only if the poll exists and offers
+        `option`, and at most once per user. Returns True if the vote was counted.
+        """
+        session = self.scoped_session_factory()
         try:
-            logger.info(f"Fetching poll with ID: {poll_id}")
-            return session.query(CommunityPoll).filter(CommunityPoll.id == poll_id).one_or_none()
-        finally:
-            session.close()
+            offered = select(
+                literal(poll_id, CommunityPollVotes.poll_id.type),
+                literal(user_id, CommunityPollVotes.user_id.type),
+                literal(option, CommunityPollVotes.option.type)
+            ).where(
+                CommunityPoll.id == poll_id,
+                cast(CommunityPoll.options, JSONB).contains([option])
+            )
+            statement = insert(CommunityPollVotes).from_select(
+                ['poll_id', 'user_id', 'option'], offered
+            ).on_conflict_do_nothing(
+                index_elements=[CommunityPollVotes.poll_id, CommunityPollVotes.user_id]
+            ).returning(CommunityPollVotes.poll_id)
+            counted = session.execute(statement).first() is not None
+            logger.info(f"Vote by user ID: {user_id} on poll ID: {poll_id} counted: {counted}")
+            return counted
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error casting poll vote: {e}")
+            raise e
+
+    def get_user_vote(self, poll_id, user_id):
+        """Retrieve the option a user voted for in a poll, or None."""
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching vote of user ID: {user_id} on poll ID: {poll_id}")
+        return session.query(CommunityPollVotes.option).filter(
+            CommunityPollVotes.poll_id == poll_id,
+            CommunityPollVotes.user_id == user_id
+        ).scalar()
+
+    def get_vote_counts(self, poll_ids):
+        """Count the recorded votes of several polls in one query. Returns {poll_id: {option: count}}."""
+        session = self.scoped_session_factory()
+        logger.info(f"Counting votes for {len(poll_ids)} polls")
+        counts = {poll_id: {} for poll_id in poll_ids}
+        if not poll_ids:
+            return counts
+        rows = session.query(
+            CommunityPollVotes.poll_id, CommunityPollVotes.option, func.count()
+        ).filter(CommunityPollVotes.poll_id.in_(poll_ids)).group_by(
+            CommunityPollVotes.poll_id, CommunityPollVotes.option
+        ).all()
+        for poll_id, option, count in rows:
+            counts[poll_id][option] = count
+        return counts
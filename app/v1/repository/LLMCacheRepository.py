@@ -0,0 +1,65 @@
+import datetime
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from app.config.postgres_orm_config import scoped_session_factory
+from app.v1.entity.LLMCacheEntry import LLMCacheEntry
+from app.config.logger_config import LogConfig
+
+# Set up a logger for this repository
+logger = LogConfig.setup_logger(__name__)
+
+class LLMCacheRepository:
+    """
+    Persistent LLM response cache. Reads and writes run in savepoints so that a cache failure
+    never aborts the surrounding request transaction.
+    """
+
+    def __init__(self, scoped_session_factory):
+        self.scoped_session_factory = scoped_session_factory
+
+    def get_response(self, cache_key):
+        """Retrieve an unexpired cached response, or None."""
+        session = self.scoped_session_factory()
+        with session.begin_nested():
+            return session.query(LLMCacheEntry.response).filter(
+                LLMCacheEntry.cache_key == cache_key,
+                LLMCacheEntry.expires_at > datetime.datetime.now(datetime.timezone.utc)
+            ).scalar()
+
+    def put_response(self, cache_key, model, purpose, response, ttl_seconds):
+        """Store (or refresh) a cached response."""
+        session = self.scoped_session_factory()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        values = {
+            'model': model,
+            'purpose': purpose,
+            'response': response,
+            'created_at': now,
+            'expires_at': now + datetime.timedelta(seconds=ttl_seconds)
+        }
+        statement = insert(LLMCacheEntry).values(cache_key=cache_key, **values).on_conflict_do_update(
+            index_elements=[LLMCacheEntry.cache_key], set_=values
+        )
+        with session.begin_nested():
+            session.execute(statement)
+
+    def delete_response(self, cache_key):
+        """Delete one cached response."""
+        session = self.scoped_session_factory()
+        with session.begin_nested():
+            session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.cache_key == cache_key))
+
+    def delete_expired(self, include_unexpired=False):
+        """Delete expired entries (or every entry). Returns the number of rows deleted."""
+        session = self.scoped_session_factory()
+        try:
+            statement = delete(LLMCacheEntry)
+            if not include_unexpired:
+                statement = statement.where(LLMCacheEntry.expires_at <= datetime.datetime.now(datetime.timezone.utc))
+            deleted = session.execute(statement).rowcount
+            logger.info(f"Deleted {deleted} LLM cache entries")
+            return deleted
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting LLM cache entries: {e}")
+            raise e
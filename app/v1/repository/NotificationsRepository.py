@@ -12,20 +12,14 @@ class NotificationsRepository:
     def get_notification_by_id(self, notification_id):
         """Retrieve a notification by its ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching notification with ID: {notification_id}")
-            return session.query(Notifications).filter(Notifications.id == notification_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching notification with ID: {notification_id}")
+        return session.query(Notifications).filter(Notifications.id == notification_id).one_or_none()
 
     def get_notifications_by_user_id(self, user_id):
         """Retrieve notifications by user ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching notifications for user ID: {user_id}")
-            return session.query(Notifications).filter(Notifications.user_id == user_id).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching notifications for user ID: {user_id}")
+        return session.query(Notifications).filter(Notifications.user_id == user_id).all()
 
     def create_notification(self, notification_data):
         """Create a new notification."""
@@ -33,15 +27,13 @@ class NotificationsRepository:
         try:
             notification = Notifications(**notification_data)
             session.add(notification)
-            session.commit()
+            session.flush()
             logger.info(f"Created notification for user ID: {notification.user_id}")
             return notification
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating notification: {e}")
             raise e
-        finally:
-            session.close()
 
     def update_notification(self, notification_id, notification_data):
         """Update an existing notification."""
@@ -51,7 +43,7 @@ class NotificationsRepository:
             if notification:
                 for key, value in notification_data.items():
                     setattr(notification, key, value)
-                session.commit()
+                session.flush()
                 logger.info(f"Updated notification with ID: {notification_id}")
                 return notification
             logger.warning(f"Notification with ID: {notification_id} not found")
@@ -60,8 +52,6 @@ class NotificationsRepository:
             session.rollback()
             logger.error(f"Error updating notification: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_notification(self, notification_id):
         """Delete a notification by its ID."""
@@ -70,7 +60,7 @@ class NotificationsRepository:
             notification = session.query(Notifications).filter(Notifications.id == notification_id).one_or_none()
             if notification:
                 session.delete(notification)
-                session.commit()
+                session.flush()
                 logger.info(f"Deleted notification with ID: {notification_id}")
                 return True
             logger.warning(f"Notification with ID: {notification_id} not found")
@@ -79,5 +69,3 @@ class NotificationsRepository:
             session.rollback()
             logger.error(f"Error deleting notification: {e}")
             raise e
-        finally:
-            session.close()
@@ -12,29 +12,30 @@ class StudentsRepository:
     def get_all_students(self):
         """Retrieve all students."""
         session = self.scoped_session_factory()
-        try:
-            logger.info("Fetching all students")
-            return session.query(Students).all()
-        finally:
-            session.close()
+        logger.info("Fetching all students")
+        return session.query(Students).all()
 
     def get_students_by_class_and_section(self, class_value, section):
         """Retrieve students by class and section."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching students for class: {class_value}, section: {section}")
-            return session.query(Students).filter(Students.class_value == class_value, Students.section == section).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching students for class: {class_value}, section: {section}")
+        return session.query(Students).filter(Students.class_value == class_value, Students.section == section).all()
 
     def get_student_by_id(self, student_id):
         """Retrieve a student by their ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching student with ID: {student_id}")
-            return session.query(Students).filter(Students.student_id == student_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching student with ID: {student_id}")
+        return session.query(Students).filter(Students.student_id == student_id).one_or_none()
+
+    def get_students_by_ids(self, student_ids):
+        """Retrieve several students in one query, keyed by student ID."""
+        student_ids = {student_id for student_id in student_ids if student_id is not None}
+        if not student_ids:
+            return {}
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching {len(student_ids)} students by ID")
+        students = session.query(Students).filter(Students.student_id.in_(student_ids)).all()
+        return {student.student_id: student for student in students}
 
     def create_student(self, student_data):
         """Create a new student."""
@@ -47,7 +48,7 @@ class StudentsRepository:
 
             student = Students(**student_data)
             session.add(student)
-            session.commit()
+            session.flush()
             # session.refresh(student)
             # logger.info(f"Created student with ID: {student.student_id}")
             # return student
@@ -55,5 +56,3 @@ class StudentsRepository:
             session.rollback()
             logger.error(f"Error creating student: {e}")
             raise e
-        finally:
-            session.close()
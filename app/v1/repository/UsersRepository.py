@@ -1,10 +1,24 @@
+import os
+from collections import namedtuple
 from app.config.postgres_orm_config import scoped_session_factory
+from app.config.unit_of_work import UnitOfWork
 from app.v1.entity.Users import Users
 from app.config.logger_config import LogConfig
+from app.utils.pagination import paginate
+from app.utils.ttl_cache import TTLCache
 
 # Set up a logger for this controller
 logger = LogConfig.setup_logger(__name__)
 
+# The authorization-relevant view of a user, safe to share between requests and threads.
+Principal = namedtuple('Principal', ['id', 'name', 'email', 'role', 'student_id', 'language', 'subject'])
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # seconds a cached principal stays valid
+
+# Shared by every UsersRepository instance so that updates made through any of them invalidate it.
+principal_cache = TTLCache(max_size=PRINCIPAL_CACHE_SIZE, ttl_seconds=PRINCIPAL_CACHE_TTL)
+
 class UsersRepository:
     def __init__(self, scoped_session_factory):
         self.scoped_session_factory = scoped_session_factory
@@ -12,20 +26,38 @@ class UsersRepository:
     def get_user_by_id(self, user_id):
         """Retrieve a user by their ID."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching user with ID: {user_id}")
-            return session.query(Users).filter(Users.id == user_id).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching user with ID: {user_id}")
+        return session.query(Users).filter(Users.id == user_id).one_or_none()
+
+    def get_users_by_ids(self, user_ids):
+        """Retrieve several users in one query, keyed by user ID."""
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return {}
+        session = self.scoped_session_factory()
+        logger.info(f"Fetching {len(user_ids)} users by ID")
+        users = session.query(Users).filter(Users.id.in_(user_ids)).all()
+        return {user.id: user for user in users}
+
+    def get_principal(self, user_id):
+        """Retrieve the principal for a user ID, served from the principal cache when possible."""
+        user_id = int(user_id)
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+
+        user = self.get_user_by_id(user_id)
+        if not user:
+            return None
+        principal = Principal(user.id, user.name, user.email, user.role, user.student_id, user.language, user.subject)
+        principal_cache.set(user_id, principal)
+        return principal
 
     def get_user_by_email(self, email):
         """Retrieve a user by their email."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching user with email: {email}")
-            return session.query(Users).filter(Users.email == email).one_or_none()
-        finally:
-            session.close()
+        logger.info(f"Fetching user with email: {email}")
+        return session.query(Users).filter(Users.email == email).one_or_none()
 
     def create_user(self, user_data):
         """Create a new user."""
@@ -33,15 +65,17 @@ class UsersRepository:
         try:
             user = Users(**user_data)
             session.add(user)
-            session.commit()
+            session.flush()
             logger.info(f"Created user with email: {user.email}")
             return user
         except Exception as e:
             session.rollback()
             logger.error(f"Error creating user: {e}")
             raise e
-        finally:
-            session.close()
+
+    def _invalidate_principal_after_commit(self, user_id):
+        # Evicting before commit would let a concurrent request re-cache the old row for the whole TTL.
+        UnitOfWork.after_commit(lambda: principal_cache.invalidate(user_id), self.scoped_session_factory)
 
     def update_user(self, user_id, user_data):
         """Update an existing user."""
@@ -51,7 +85,8 @@ class UsersRepository:
             if user:
                 for key, value in user_data.items():
                     setattr(user, key, value)
-                session.commit()
+                session.flush()
+                self._invalidate_principal_after_commit(int(user_id))
                 logger.info(f"Updated user with ID: {user_id}")
                 return user
             logger.warning(f"User with ID: {user_id} not found")
@@ -60,8 +95,6 @@ class UsersRepository:
             session.rollback()
             logger.error(f"Error updating user: {e}")
             raise e
-        finally:
-            session.close()
 
     def delete_user(self, user_id):
         """Delete a user by their ID."""
@@ -70,7 +103,8 @@ class UsersRepository:
             user = session.query(Users).filter(Users.id == user_id).one_or_none()
             if user:
                 session.delete(user)
-                session.commit()
+                session.flush()
+                self._invalidate_principal_after_commit(int(user_id))
                 logger.info(f"Deleted user with ID: {user_id}")
                 return True
             logger.warning(f"User with ID: {user_id} not found")
@@ -79,14 +113,9 @@ class UsersRepository:
             session.rollback()
             logger.error(f"Error deleting user: {e}")
             raise e
-        finally:
-            session.close()
 
-    def get_users_by_role(self, role):
-        """Retrieve users by their role."""
+    def get_users_by_role(self, role, cursor=None, limit=None):
+        """Retrieve one page of users with a role, newest first. Returns (users, next_cursor)."""
         session = self.scoped_session_factory()
-        try:
-            logger.info(f"Fetching users with role: {role}")
-            return session.query(Users).filter(Users.role == role).all()
-        finally:
-            session.close()
+        logger.info(f"Fetching users with role: {role}, cursor: {cursor}, limit: {limit}")
+        return paginate(session.query(Users).filter(Users.role == role), Users.created_at, Users.id, cursor, limit)
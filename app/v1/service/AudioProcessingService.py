@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+
+# Set up a logger for this service
+logger = LogConfig.setup_logger(__name__)
+
+AUDIO_PROCESSING_WORKERS = int(os.getenv("AUDIO_PROCESSING_WORKERS", "2"))
+AUDIO_PROCESSING_TIMEOUT = int(os.getenv("AUDIO_PROCESSING_TIMEOUT", "600"))  # seconds per ffmpeg run
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+FFPROBE_PATH = os.getenv("FFPROBE_PATH", "ffprobe")
+WAVEFORM_POINTS = int(os.getenv("WAVEFORM_POINTS", "200"))
+COMPACT_AUDIO_BITRATE = os.getenv("COMPACT_AUDIO_BITRATE", "24k")
+COMPACT_AUDIO_MIME_TYPE = 'audio/ogg'
+
+ANALYSIS_SAMPLE_RATE = 8000  # mono PCM rate the waveform is computed from
+PEAKS_PER_SECOND = 100
+PCM_READ_BLOCKS = 64  # peak blocks decoded per read
+
+class AudioProcessingError(Exception):
+    """Raised when a recording cannot be analysed."""
+
+def pcm_peak(frames, sample_width):
+    """Return the absolute peak of little-endian signed PCM frames (unsigned for 8-bit), scaled to 0..1."""
+    if not frames:
+        return 0.0
+    if sample_width == 1:
+        return max(abs(b - 128) for b in frames) / 128.0
+    if sample_width in (2, 4):
+        samples = array('h' if sample_width == 2 else 'i')
+        samples.frombytes(frames[:len(frames) - len(frames) % sample_width])
+        if sys.byteorder == 'big':
+            samples.byteswap()
+    else:
+        samples = [int.from_bytes(frames[i:i + sample_width], 'little', signed=True)
+                   for i in range(0, len(frames) - sample_width + 1, sample_width)]
+    if not samples:
+        return 0.0
+    return min(1.0, max(max(samples), -min(samples)) / float(1 << (8 * sample_width - 1)))
+
+def downsample_peaks(peaks, points=WAVEFORM_POINTS):
+    """Reduce a peak envelope to at most `points` values by taking the maximum of each bucket."""
+    if len(peaks) <= points:
+        return [round(peak, 3) for peak in peaks]
+    return [
+        round(max(peaks[i * len(peaks) // points:(i + 1) * len(peaks) // points]), 3)
+        for i in range(points)
+    ]
+
+class AudioProcessingService:
+    """
+    Analyses uploaded recordings off the request path: duration, sample rate, channels and a
+    downsampled waveform, plus a compact mono Opus rendition for speech. Work runs on a small
+    thread pool; results and the pending/ready/failed state are written back to the resource.
+
+    ffmpeg/ffprobe are used when available. Without them WAV files are still analysed with the
+    standard library, and no compact rendition is produced.
+    """
+
+    def __init__(self, audio_resource_repository, audio_storage_service, blob_store, max_workers=AUDIO_PROCESSING_WORKERS):
+        self.audio_resource_repository = audio_resource_repository
+        self.audio_storage_service = audio_storage_service
+        self.blob_store = blob_store
+        self.max_workers = max_workers
+        self.executor = None
+        self.has_ffmpeg = bool(shutil.which(FFMPEG_PATH) and shutil.which(FFPROBE_PATH))
+
+    def submit(self, resource_id):
+        """Queue a resource for processing on the worker pool."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='audio-processing')
+        self.executor.submit(self.process, resource_id)
+
+    def process(self, resource_id, statuses=('pending',)):
+        """Process one resource if its status is in `statuses`. Returns the resulting status, or None if skipped."""
+        with UnitOfWork.scope():
+            row = self.audio_resource_repository.get_audio_content_info(resource_id)
+        if not row:
+            return None
+        resource, is_inline = row
+        if resource.processing_status not in statuses or is_inline:
+            # Inline (not yet exported) audio is processed once it reaches the blob store.
+            return None
+
+        try:
+            with tempfile.TemporaryDirectory(prefix='audio-processing-') as workdir:
+                source_path = os.path.join(workdir, 'source')
+                with self.blob_store.open(resource.content_sha256) as blob, open(source_path, 'wb') as source:
+                    shutil.copyfileobj(blob, source)
+
+                result = self.analyze(source_path)
+                compact_path = self.encode_compact(source_path, workdir, resource.size_bytes)
+                with UnitOfWork.scope():
+                    if compact_path:
+                        result.update(self.store_rendition(compact_path))
+                    result['processing_status'] = 'ready'
+                    result['processing_error'] = None
+                    if not self.audio_resource_repository.update_processing_result(resource_id, result):
+                        # Deleted meanwhile: roll back the rendition's blob reference. The rollback
+                        # also discards the rendition file (AudioStorageService.store's after-rollback hook).
+                        raise AudioProcessingError('Audio resource was deleted during processing')
+            logger.info(f"Processed audio resource {resource_id}: {result.get('duration_seconds')}s")
+            return 'ready'
+        except Exception as e:
+            logger.error(f"Error processing audio resource {resource_id}: {e}")
+            with UnitOfWork.scope():
+                self.audio_resource_repository.update_processing_result(
+                    resource_id, {'processing_status': 'failed', 'processing_error': str(e)[:500]}
+                )
+            return 'failed'
+
+    def analyze(self, path):
+        """Return duration, sample rate, channels and waveform for an audio file."""
+        if self.has_ffmpeg:
+            return self._analyze_with_ffmpeg(path)
+        return self._analyze_wav(path)
+
+    def _analyze_with_ffmpeg(self, path):
+        probe = subprocess.run(
+            [FFPROBE_PATH, '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'stream=sample_rate,channels:format=duration', '-of', 'json', path],
+            capture_output=True, timeout=AUDIO_PROCESSING_TIMEOUT, check=True
+        )
+        info = json.loads(probe.stdout or b'{}')
+        if not info.get('streams'):
+            raise AudioProcessingError('No audio stream found')
+        stream = info['streams'][0]
+
+        # Decode to 8 kHz mono PCM through a pipe and keep one peak per 10 ms block.
+        block_bytes = ANALYSIS_SAMPLE_RATE // PEAKS_PER_SECOND * 2
+        decoder = subprocess.Popen(
+            [FFMPEG_PATH, '-v', 'error', '-i', path, '-ac', '1', '-ar', str(ANALYSIS_SAMPLE_RATE), '-f', 's16le', '-'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        peaks = array('f')
+        total_bytes = 0
+        try:
+            while True:
+                data = decoder.stdout.read(block_bytes * PCM_READ_BLOCKS)
+                if not data:
+                    break
+                total_bytes += len(data)
+                for offset in range(0, len(data), block_bytes):
+                    peaks.append(pcm_peak(data[offset:offset + block_bytes], 2))
+        finally:
+            decoder.stdout.close()
+            if decoder.wait(timeout=AUDIO_PROCESSING_TIMEOUT) != 0:
+                raise AudioProcessingError('ffmpeg could not decode the recording')
+
+        duration = info.get('format', {}).get('duration')
+        return {
+            'duration_seconds': round(float(duration) if duration else total_bytes / 2 / ANALYSIS_SAMPLE_RATE, 3),
+            'sample_rate': int(stream['sample_rate']) if stream.get('sample_rate') else None,
+            'channels': stream.get('channels'),
+            'waveform': downsample_peaks(peaks)
+        }
+
+    def _analyze_wav(self, path):
+        try:
+            recording = wave.open(path, 'rb')
+        except (wave.Error, EOFError) as e:
+            raise AudioProcessingError(f"ffmpeg is not available and the recording is not a readable WAV file: {e}")
+        with recording:
+            sample_rate = recording.getframerate()
+            block_frames = max(1, sample_rate // PEAKS_PER_SECOND)
+            peaks = array('f')
+            while True:
+                frames = recording.readframes(block_frames * PCM_READ_BLOCKS)
+                if not frames:
+                    break
+                block_bytes = block_frames * recording.getsampwidth() * recording.getnchannels()
+                for offset in range(0, len(frames), block_bytes):
+                    peaks.append(pcm_peak(frames[offset:offset + block_bytes], recording.getsampwidth()))
+            return {
+                'duration_seconds': round(recording.getnframes() / float(sample_rate), 3) if sample_rate else None,
+                'sample_rate': sample_rate,
+                'channels': recording.getnchannels(),
+                'waveform': downsample_peaks(peaks)
+            }
+
+    def encode_compact(self, path, workdir, original_size):
+        """Re-encode to mono Opus for speech. Returns the output path, or None if it would not be smaller."""
+        if not self.has_ffmpeg:
+            return None
+        output_path = os.path.join(workdir, 'compact.ogg')
+        subprocess.run(
+            [FFMPEG_PATH, '-v', 'error', '-y', '-i', path, '-vn', '-ac', '1', '-ar', '16000',
+             '-c:a', 'libopus', '-b:a', COMPACT_AUDIO_BITRATE, '-application', 'voip', output_path],
+            capture_output=True, timeout=AUDIO_PROCESSING_TIMEOUT, check=True
+        )
+        if original_size and os.path.getsize(output_path) >= original_size:
+            return None
+        return output_path
+
+    def store_rendition(self, path):
+        """
+        Store the compact rendition in the blob store (in the current transaction) and describe it.
+        If the transaction rolls back, the rendition file is discarded with it.
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as rendition:
+            for chunk in iter(lambda: rendition.read(1024 * 1024), b''):
+                digest.update(chunk)
+        size = os.path.getsize(path)
+        with open(path, 'rb') as rendition:
+            self.audio_storage_service.store(rendition, digest.hexdigest(), size, COMPACT_AUDIO_MIME_TYPE)
+        return {
+            'compact_sha256': digest.hexdigest(),
+            'compact_size_bytes': size,
+            'compact_mime_type': COMPACT_AUDIO_MIME_TYPE
+        }
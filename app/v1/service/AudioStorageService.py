@@ -0,0 +1,76 @@
+import os
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+
+# Set up a logger for this service
+logger = LogConfig.setup_logger(__name__)
+
+BLOB_ORPHAN_GRACE_SECONDS = int(os.getenv("BLOB_ORPHAN_GRACE_SECONDS", "3600"))  # age before an unregistered file is swept
+
+class AudioStorageService:
+    """
+    Keeps audio content in the blob store and the app.audio_blobs reference counts in step.
+    Identical recordings share one blob; a blob is deleted once the transaction that dropped
+    its last reference has committed.
+    """
+
+    def __init__(self, audio_blob_repository, blob_store):
+        self.audio_blob_repository = audio_blob_repository
+        self.blob_store = blob_store
+
+    def store(self, file, sha256, size_bytes, mime_type=None):
+        """Reference the blob for `sha256` in the current transaction and write `file` to it if it is new."""
+        # Reference first: the locked blob row keeps a concurrent collect() from deleting the file.
+        self.audio_blob_repository.acquire(sha256, size_bytes, mime_type)
+        # If the transaction rolls back, the file may be left without a row; remove it then.
+        UnitOfWork.after_rollback(lambda: self.discard(sha256, size_bytes))
+        self.blob_store.put(sha256, file)
+
+    def release(self, sha256):
+        """Drop one reference in the current transaction and collect the blob after commit if it is unused."""
+        if self.audio_blob_repository.release(sha256) == 0:
+            UnitOfWork.after_commit(lambda: self.collect(sha256))
+
+    def collect(self, sha256):
+        """Delete a blob that nothing references, in its own transaction. Returns True if it was deleted."""
+        with UnitOfWork.scope():
+            deleted = self.audio_blob_repository.delete_if_unreferenced(sha256)
+            if deleted:
+                # Removed while the row lock is held, so a concurrent store() waits and rewrites it.
+                self.blob_store.delete(sha256)
+        return deleted
+
+    def discard(self, sha256, size_bytes):
+        """
+        Delete a stored file that no app.audio_blobs row accounts for, in its own transaction.
+        Returns True if it was deleted.
+        """
+        with UnitOfWork.scope():
+            # Registering the hash waits for any concurrent upload of the same content to finish;
+            # the file is only removed if the row is still unreferenced afterwards.
+            self.audio_blob_repository.register_unreferenced(sha256, size_bytes)
+            deleted = self.audio_blob_repository.delete_if_unreferenced(sha256)
+            if deleted:
+                self.blob_store.delete(sha256)
+        return deleted
+
+    def collect_garbage(self, limit=None, orphan_grace_seconds=BLOB_ORPHAN_GRACE_SECONDS):
+        """
+        Delete every unreferenced blob, then every stored file older than `orphan_grace_seconds`
+        that has no app.audio_blobs row (left by a crash between writing it and committing).
+        Returns the number of blobs deleted.
+        """
+        with UnitOfWork.scope():
+            hashes = self.audio_blob_repository.get_unreferenced_hashes(limit)
+        deleted = sum(1 for sha256 in hashes if self.collect(sha256))
+        logger.info(f"Collected {deleted} unreferenced audio blob(s)")
+
+        orphans = 0
+        stored = list(self.blob_store.iter_hashes(older_than=orphan_grace_seconds))
+        for start in range(0, len(stored), 500):
+            batch = dict(stored[start:start + 500])
+            with UnitOfWork.scope():
+                registered = self.audio_blob_repository.get_registered_hashes(list(batch))
+            orphans += sum(1 for sha256, size in batch.items() if sha256 not in registered and self.discard(sha256, size))
+        logger.info(f"Collected {orphans} orphaned audio blob file(s)")
+        return deleted + orphans
@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import time
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the blob store
+logger = LogConfig.setup_logger(__name__)
+
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+BLOB_STORE_ROOT = os.getenv("BLOB_STORE_ROOT", os.path.join(os.getcwd(), 'data', 'blobs'))
+BLOB_READ_CHUNK_SIZE = 256 * 1024
+
+class BlobStore:
+    """
+    Immutable, content-addressed storage for large binary payloads. Blobs are identified by the
+    hex SHA-256 of their content, so storing the same bytes twice is a no-op. Reference counts
+    live in the database (app.audio_blobs); a store only moves bytes.
+    """
+
+    def put(self, sha256, file):
+        """Store the content of a readable binary file under `sha256` unless it is already present."""
+        raise NotImplementedError
+
+    def exists(self, sha256):
+        raise NotImplementedError
+
+    def open(self, sha256):
+        """Open a blob for reading as a binary file object."""
+        raise NotImplementedError
+
+    def iter_range(self, sha256, start, stop, chunk_size=BLOB_READ_CHUNK_SIZE):
+        """Yield the bytes in [start, stop) of a blob, at most `chunk_size` at a time."""
+        raise NotImplementedError
+
+    def delete(self, sha256):
+        """Remove a blob. Deleting a missing blob is not an error."""
+        raise NotImplementedError
+
+    def iter_hashes(self, older_than=0):
+        """Yield (sha256, size_bytes) for every stored blob last written at least `older_than` seconds ago."""
+        raise NotImplementedError
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory, fanned out as <root>/ab/cd/abcd...."""
+
+    def __init__(self, root=BLOB_STORE_ROOT):
+        self.root = root
+
+    def path(self, sha256):
+        if len(sha256) != 64 or not all(c in '0123456789abcdef' for c in sha256):
+            raise ValueError(f"Invalid blob hash: {sha256!r}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def put(self, sha256, file):
+        path = self.path(sha256)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file next to the target and rename it into place, so readers
+        # never see a partially written blob.
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                shutil.copyfileobj(file, temp_file, BLOB_READ_CHUNK_SIZE)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        logger.info(f"Stored blob {sha256}")
+
+    def exists(self, sha256):
+        return os.path.exists(self.path(sha256))
+
+    def open(self, sha256):
+        return open(self.path(sha256), 'rb')
+
+    def iter_range(self, sha256, start, stop, chunk_size=BLOB_READ_CHUNK_SIZE):
+        with open(self.path(sha256), 'rb') as blob:
+            blob.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                chunk = blob.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, sha256):
+        try:
+            os.unlink(self.path(sha256))
+            logger.info(f"Deleted blob {sha256}")
+        except FileNotFoundError:
+            pass
+
+    def iter_hashes(self, older_than=0):
+        cutoff = time.time() - older_than
+        for directory, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if info.st_mtime > cutoff:
+                    continue
+                if file_name.startswith('.tmp-'):
+                    # Left behind by a process killed mid-write.
+                    os.unlink(path)
+                elif len(file_name) == 64 and path == self.path(file_name):
+                    yield file_name, info.st_size
+
+def get_blob_store():
+    """Build the blob store configured by BLOB_STORE_BACKEND."""
+    if BLOB_STORE_BACKEND == 'local':
+        return LocalBlobStore(BLOB_STORE_ROOT)
+    raise ValueError(f"Unsupported blob store backend: {BLOB_STORE_BACKEND}")
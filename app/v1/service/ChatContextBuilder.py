@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+from collections import Counter
+from app.utils.token_budget import estimate_tokens
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the chat context builder
+logger = LogConfig.setup_logger(__name__)
+
+CHAT_CONTEXT_RECENT_ITEMS = int(os.getenv("CHAT_CONTEXT_RECENT_ITEMS", "10"))  # latest raw records kept per set
+CHAT_CONTEXT_TEXT_CHARS = int(os.getenv("CHAT_CONTEXT_TEXT_CHARS", "160"))  # notes and comments are cut to this
+CHAT_CONTEXT_MONTHS = int(os.getenv("CHAT_CONTEXT_MONTHS", "6"))  # months of attendance broken down
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "600"))
+# Per-intent overrides, e.g. CHAT_CONTEXT_TOKEN_BUDGET_GRADE=900
+CHAT_CONTEXT_TOKEN_BUDGETS = {
+    intent: int(os.getenv(f"CHAT_CONTEXT_TOKEN_BUDGET_{intent.upper()}", str(CHAT_CONTEXT_TOKEN_BUDGET)))
+    for intent in ('attendance', 'activity', 'behaviour', 'grade')
+}
+
+GRADE_POINTS = {
+    'A+': 4.3, 'A': 4.0, 'A-': 3.7, 'B+': 3.3, 'B': 3.0, 'B-': 2.7, 'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'D-': 0.7, 'E': 0.5, 'F': 0.0
+}
+TREND_THRESHOLD = 0.25  # change in grade points (or sentiment) that counts as a trend
+
+def _clip(text):
+    if not text or len(text) <= CHAT_CONTEXT_TEXT_CHARS:
+        return text
+    return text[:CHAT_CONTEXT_TEXT_CHARS - 1].rstrip() + '…'
+
+def _average(values):
+    return round(sum(values) / len(values), 2) if values else None
+
+def _trend(earlier, later):
+    if earlier is None or later is None:
+        return None
+    if later - earlier >= TREND_THRESHOLD:
+        return 'improving'
+    if earlier - later >= TREND_THRESHOLD:
+        return 'declining'
+    return 'steady'
+
+def grade_points(grade):
+    """Numeric value of a letter grade or a numeric grade string, or None if it is neither."""
+    grade = (grade or '').strip().upper()
+    if grade in GRADE_POINTS:
+        return GRADE_POINTS[grade]
+    try:
+        return float(grade)
+    except ValueError:
+        return None
+
+def summarize_attendance(records):
+    records = sorted(records, key=lambda record: record['date'])
+    statuses = [record['status'] for record in records]
+    counts = Counter(statuses)
+
+    streak_status, streak = statuses[-1], 0
+    for status in reversed(statuses):
+        if status != streak_status:
+            break
+        streak += 1
+    longest_absence, run = 0, 0
+    for status in statuses:
+        run = run + 1 if status == 'absence' else 0
+        longest_absence = max(longest_absence, run)
+
+    by_month = {}
+    for record in records:
+        month = by_month.setdefault(record['date'].strftime('%Y-%m'), {'present': 0, 'absence': 0})
+        month[record['status']] = month.get(record['status'], 0) + 1
+    absences = [record for record in records if record['status'] == 'absence']
+    return {
+        'days_recorded': len(records),
+        'present': counts.get('present', 0),
+        'absent': counts.get('absence', 0),
+        'attendance_rate': round(counts.get('present', 0) / len(records), 3),
+        'period': [records[0]['date'].isoformat(), records[-1]['date'].isoformat()],
+        'current_streak': {'status': streak_status, 'days': streak},
+        'longest_absence_streak': longest_absence,
+        'by_month': dict(list(by_month.items())[-CHAT_CONTEXT_MONTHS:][::-1]),
+        'recent_absences': [
+            {'date': record['date'].isoformat(), 'notes': _clip(record['notes'])}
+            for record in absences[::-1][:CHAT_CONTEXT_RECENT_ITEMS]
+        ],
+        'recent': [
+            {'date': record['date'].isoformat(), 'status': record['status']}
+            for record in records[::-1][:CHAT_CONTEXT_RECENT_ITEMS]
+        ]
+    }
+
+def summarize_activity(records):
+    badges = Counter(record['badge'] for record in records if record['badge'])
+    return {
+        'activities': len(records),
+        'badges': dict(badges.most_common()),
+        'recent': [
+            {'activity_name': record['activity_name'], 'badge': record['badge'], 'description': _clip(record['description'])}
+            for record in records[::-1][:CHAT_CONTEXT_RECENT_ITEMS]
+        ]
+    }
+
+def summarize_behaviour(records):
+    records = sorted(records, key=lambda record: record['date'])
+    scored = [record for record in records if record['sentiment_score'] is not None]
+    scores = [record['sentiment_score'] for record in scored]
+    half = len(scored) // 2
+    return {
+        'records': len(records),
+        'awaiting_score': len(records) - len(scored),
+        'average_sentiment': _average(scores),
+        'positive': sum(1 for score in scores if score > 0),
+        'negative': sum(1 for score in scores if score < 0),
+        'sentiment_trend': _trend(_average(scores[:half]), _average(scores[half:])) if half else None,
+        'behaviour_types': dict(Counter(record['behavior_type'] for record in scored if record['behavior_type']).most_common()),
+        'recent': [
+            {'date': record['date'].isoformat(), 'behavior_type': record['behavior_type'],
+             'sentiment_score': record['sentiment_score'], 'comment': _clip(record['comment'])}
+            for record in records[::-1][:CHAT_CONTEXT_RECENT_ITEMS]
+        ]
+    }
+
+def summarize_grade(records):
+    records = sorted(records, key=lambda record: record['date'])
+    subjects = {}
+    for record in records:
+        subjects.setdefault(record['subject'], []).append(record)
+    summary = {}
+    for subject, subject_records in subjects.items():
+        points = [grade_points(record['grade']) for record in subject_records]
+        points = [point for point in points if point is not None]
+        summary[subject] = {
+            'grades': len(subject_records),
+            'latest': subject_records[-1]['grade'],
+            'latest_date': subject_records[-1]['date'].isoformat(),
+            'average_points': _average(points),
+            'trend': _trend(points[0], points[-1]) if len(points) > 1 else None
+        }
+    return {
+        'grades': len(records),
+        'subjects': summary,
+        'recent': [
+            {'subject': record['subject'], 'grade': record['grade'], 'date': record['date'].isoformat()}
+            for record in records[::-1][:CHAT_CONTEXT_RECENT_ITEMS]
+        ]
+    }
+
+# Per intent: the summarizer and the collections to shorten (oldest entries first) when over budget.
+SUMMARIZERS = {
+    'attendance': (summarize_attendance, ('recent', 'recent_absences', 'by_month')),
+    'activity': (summarize_activity, ('recent', 'badges')),
+    'behaviour': (summarize_behaviour, ('recent', 'behaviour_types')),
+    'grade': (summarize_grade, ('recent', 'subjects')),
+}
+
+def _drop_last(collection):
+    if isinstance(collection, dict):
+        collection.pop(next(reversed(collection)))
+    else:
+        collection.pop()
+
+class ChatContextBuilder:
+    """
+    Turns a student's record sets into the compact data context of the chatbot answer prompt:
+    aggregates (counts, rates, streaks, per-subject trends) plus the most recent records, cut
+    down to a per-intent token budget so prompts stay bounded however much history a student
+    has. Keeps per-intent token statistics.
+    """
+
+    def __init__(self, budgets=CHAT_CONTEXT_TOKEN_BUDGETS):
+        self.budgets = budgets
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def build(self, intent, records):
+        """Return (context text for FINAL_ANSWER_PROMPT, estimated tokens). Empty record sets give ('', 0)."""
+        if not records:
+            self._record(intent, 0, 0)
+            return '', 0
+        summarize, trimmable = SUMMARIZERS[intent]
+        context = summarize(records)
+        budget = self.budgets.get(intent, CHAT_CONTEXT_TOKEN_BUDGET)
+
+        text = json.dumps(context, default=str, ensure_ascii=False, separators=(',', ':'))
+        tokens = estimate_tokens(text)
+        omitted = 0
+        while tokens > budget:
+            key = next((key for key in trimmable if context.get(key)), None)
+            if key is None:
+                logger.warning(f"{intent} context is {tokens} tokens even without recent items (budget {budget})")
+                break
+            _drop_last(context[key])
+            omitted += 1
+            text = json.dumps(context, default=str, ensure_ascii=False, separators=(',', ':'))
+            tokens = estimate_tokens(text)
+        self._record(intent, tokens, omitted)
+        return text, tokens
+
+    def _record(self, intent, tokens, omitted):
+        with self._lock:
+            stats = self._stats.setdefault(intent, {'requests': 0, 'tokens': 0, 'max_tokens': 0, 'trimmed': 0})
+            stats['requests'] += 1
+            stats['tokens'] += tokens
+            stats['max_tokens'] = max(stats['max_tokens'], tokens)
+            stats['trimmed'] += 1 if omitted else 0
+
+    def stats(self):
+        """Return per-intent context sizes: requests, average and max tokens, and how often trimming was needed."""
+        with self._lock:
+            stats = {intent: dict(values) for intent, values in self._stats.items()}
+        return {
+            intent: {
+                'requests': values['requests'],
+                'avg_tokens': round(values['tokens'] / values['requests'], 1),
+                'max_tokens': values['max_tokens'],
+                'trimmed': values['trimmed'],
+                'budget': self.budgets.get(intent, CHAT_CONTEXT_TOKEN_BUDGET)
+            }
+            for intent, values in stats.items()
+        }
+
+# Shared by every request so that the statistics cover the whole process.
+chat_context_builder = ChatContextBuilder()
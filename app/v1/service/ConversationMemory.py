@@ -0,0 +1,119 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.constants.llm_prompts import CONVERSATION_SUMMARY_PROMPT
+from app.v1.service.LLMClient import LLMError
+
+# Set up a logger for the conversation memory
+logger = LogConfig.setup_logger(__name__)
+
+CHAT_MEMORY_RECENT_TURNS = int(os.getenv("CHAT_MEMORY_RECENT_TURNS", "3"))  # raw turns sent with every prompt
+CHAT_MEMORY_SUMMARY_WORDS = int(os.getenv("CHAT_MEMORY_SUMMARY_WORDS", "150"))
+CHAT_MEMORY_FOLD_TURNS = int(os.getenv("CHAT_MEMORY_FOLD_TURNS", "10"))  # turns folded into the summary per LLM call
+CHAT_MEMORY_TURN_CHARS = int(os.getenv("CHAT_MEMORY_TURN_CHARS", "1500"))  # each query/answer is cut to this
+CHAT_MEMORY_WORKERS = int(os.getenv("CHAT_MEMORY_WORKERS", "2"))
+
+def _clip(text):
+    text = str(text or '')
+    return text if len(text) <= CHAT_MEMORY_TURN_CHARS else text[:CHAT_MEMORY_TURN_CHARS] + '…'
+
+class ConversationMemory:
+    """
+    Chatbot memory of fixed size: a rolling summary per conversation plus its last few raw turns.
+
+    Turns that fall out of the raw window are folded into the summary off the request path,
+    after the turn that pushed them out has committed. The summary row records the id of the
+    last turn it covers (a watermark), so each update only summarises new turns, and updates
+    of the same conversation never run concurrently within a process.
+    """
+
+    def __init__(self, conversations_repository, summaries_repository, llm_client,
+                 recent_turns=CHAT_MEMORY_RECENT_TURNS, max_workers=CHAT_MEMORY_WORKERS):
+        self.conversations_repository = conversations_repository
+        self.summaries_repository = summaries_repository
+        self.llm_client = llm_client
+        self.recent_turns = recent_turns
+        self.max_workers = max_workers
+        self.executor = None
+        self._lock = threading.Lock()
+        self._running = set()
+        self._rerun = set()
+
+    def build_messages(self, user_id, conversation_id, query):
+        """Return the chat messages for a new query: summary, recent raw turns, then the query."""
+        summary = self.summaries_repository.get_summary(conversation_id, user_id)
+        watermark = summary.summarized_through_id if summary else 0
+        turns = self.conversations_repository.get_turns_after(conversation_id, watermark, user_id, self.recent_turns)
+        messages = []
+        if summary:
+            messages.append({'role': 'system', 'content': f"Summary of the earlier conversation with this parent:\n{summary.summary}"})
+        for turn in turns:
+            messages.append({'role': 'user', 'content': turn.query})
+            messages.append({'role': 'assistant', 'content': turn.response})
+        messages.append({'role': 'user', 'content': query})
+        return messages
+
+    def schedule_update(self, conversation_id, user_id):
+        """Update the conversation's summary in the background once the current transaction commits."""
+        UnitOfWork.after_commit(lambda: self.submit(conversation_id, user_id))
+
+    def submit(self, conversation_id, user_id):
+        with self._lock:
+            if conversation_id in self._running:
+                # Picked up by the running update when it finishes.
+                self._rerun.add(conversation_id)
+                return
+            self._running.add(conversation_id)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='chat-memory')
+        self.executor.submit(self._run, conversation_id, user_id)
+
+    def _run(self, conversation_id, user_id):
+        while True:
+            try:
+                self.update(conversation_id, user_id)
+            except Exception as e:
+                logger.error(f"Error updating summary of conversation {conversation_id}: {e}")
+            with self._lock:
+                if conversation_id not in self._rerun:
+                    self._running.discard(conversation_id)
+                    return
+                self._rerun.discard(conversation_id)
+
+    def update(self, conversation_id, user_id):
+        """Fold the turns that have left the raw window into the summary. Returns the number of turns folded."""
+        folded = 0
+        while True:
+            with UnitOfWork.scope():
+                summary = self.summaries_repository.get_summary(conversation_id, user_id)
+                watermark = summary.summarized_through_id if summary else 0
+                turns = self.conversations_repository.get_turns_after(conversation_id, watermark, user_id)
+            to_fold = turns[:max(0, len(turns) - self.recent_turns)][:CHAT_MEMORY_FOLD_TURNS]
+            if not to_fold:
+                return folded
+
+            # The LLM call runs outside any transaction; the watermark guard in save_summary
+            # discards the result if another process advanced the summary meanwhile.
+            new_summary = self.summarize(summary.summary if summary else '', to_fold)
+            with UnitOfWork.scope():
+                stored = self.summaries_repository.save_summary(
+                    conversation_id, user_id, new_summary, to_fold[-1].id,
+                    (summary.turns_summarized if summary else 0) + len(to_fold)
+                )
+            if not stored:
+                return folded
+            folded += len(to_fold)
+
+    def summarize(self, summary, turns):
+        """Return `summary` updated with `turns` (raises LLMError if the model gives nothing back)."""
+        prompt = CONVERSATION_SUMMARY_PROMPT.format(
+            max_words=CHAT_MEMORY_SUMMARY_WORDS,
+            summary=summary or '(none yet)',
+            turns='\n\n'.join(f"Parent: {_clip(turn.query)}\nEduPal: {_clip(turn.response)}" for turn in turns)
+        )
+        new_summary = self.llm_client.chat_completion([{'role': 'user', 'content': prompt}], purpose='summary').strip()
+        if not new_summary:
+            raise LLMError('Empty conversation summary')
+        return new_summary
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime
+from app.v1.entity.AcademicRecords import AcademicRecords
+from app.config.logger_config import LogConfig
+
+# Set up a logger for this service
+logger = LogConfig.setup_logger(__name__)
+
+GRADE_IMPORT_CHUNK_SIZE = int(os.getenv("GRADE_IMPORT_CHUNK_SIZE", "5000"))  # rows per COPY
+GRADE_IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("GRADE_IMPORT_MAX_REPORTED_ERRORS", "100"))
+
+SUPPORTED_FORMATS = ('csv', 'ndjson')
+REQUIRED_FIELDS = ('student_id', 'subject', 'grade', 'record_date')
+
+class GradeImportError(ValueError):
+    """Raised when an import cannot start (unknown format, missing CSV columns)."""
+
+def detect_format(file_name=None, content_type=None, requested_format=None):
+    """Pick the import format from an explicit request, the file extension or the content type."""
+    if requested_format:
+        file_format = requested_format.lower()
+    elif file_name and file_name.lower().endswith(('.ndjson', '.jsonl')):
+        file_format = 'ndjson'
+    elif file_name and file_name.lower().endswith('.csv'):
+        file_format = 'csv'
+    elif content_type and ('ndjson' in content_type or 'jsonlines' in content_type):
+        file_format = 'ndjson'
+    else:
+        file_format = 'csv'
+    if file_format not in SUPPORTED_FORMATS:
+        raise GradeImportError(f"Unsupported format: {file_format}. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+    return file_format
+
+class GradeImportService:
+    """
+    Streams grade rows out of a CSV or NDJSON file, validates them against the
+    AcademicRecords columns and loads them chunk by chunk with COPY. Only one chunk is held
+    in memory at a time, whatever the size of the file.
+    """
+
+    def __init__(self, academic_records_repository, students_repository, chunk_size=GRADE_IMPORT_CHUNK_SIZE):
+        self.academic_records_repository = academic_records_repository
+        self.students_repository = students_repository
+        self.chunk_size = chunk_size
+        self.subject_length = AcademicRecords.__table__.c.subject.type.length
+        self.grade_length = AcademicRecords.__table__.c.grade.type.length
+
+    @staticmethod
+    def iter_rows(binary_stream, file_format):
+        """Yield (line_number, row) pairs from a binary stream without reading it all at once."""
+        text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='' if file_format == 'csv' else None)
+        if file_format == 'csv':
+            reader = csv.DictReader(text_stream)
+            missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+            if missing:
+                raise GradeImportError(f"CSV header is missing columns: {', '.join(missing)}")
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(text_stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+
+    def validate(self, row, teacher_id):
+        """Return (record, None) for a valid row or (None, error message)."""
+        if row is None:
+            return None, 'Malformed row'
+        missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, '')]
+        if missing:
+            return None, f"Missing required field(s): {', '.join(missing)}"
+        try:
+            student_id = int(row['student_id'])
+        except (TypeError, ValueError):
+            return None, 'student_id must be an integer'
+        subject = str(row['subject']).strip()
+        grade = str(row['grade']).strip()
+        if not subject or len(subject) > self.subject_length:
+            return None, f"subject must be 1-{self.subject_length} characters"
+        if not grade or len(grade) > self.grade_length:
+            return None, f"grade must be 1-{self.grade_length} characters"
+        try:
+            record_date = datetime.strptime(str(row['record_date']).strip(), '%Y-%m-%d').date()
+        except ValueError:
+            return None, 'record_date must be in YYYY-MM-DD format'
+        return {
+            'student_id': student_id,
+            'subject': subject,
+            'grade': grade,
+            'record_date': record_date,
+            'teacher_id': teacher_id
+        }, None
+
+    def import_stream(self, binary_stream, file_format, teacher_id=None):
+        """Import every valid row of the stream and return an import report."""
+        started = time.perf_counter()
+        report = {
+            'format': file_format,
+            'rows_read': 0,
+            'rows_imported': 0,
+            'rows_rejected': 0,
+            'chunks': 0,
+            'errors': []
+        }
+        chunk = []
+
+        for line_number, row in self.iter_rows(binary_stream, file_format):
+            report['rows_read'] += 1
+            record, error = self.validate(row, teacher_id)
+            if error:
+                self._reject(report, line_number, error)
+                continue
+            chunk.append((line_number, record))
+            if len(chunk) >= self.chunk_size:
+                self._load_chunk(report, chunk)
+                chunk = []
+        self._load_chunk(report, chunk)
+
+        elapsed = time.perf_counter() - started
+        report['elapsed_seconds'] = round(elapsed, 3)
+        report['rows_per_second'] = round(report['rows_read'] / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info(f"Grade import finished: {report['rows_imported']} imported, {report['rows_rejected']} rejected "
+                    f"in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)")
+        return report
+
+    def _load_chunk(self, report, chunk):
+        """Drop rows for unknown students (one lookup per chunk) and COPY the rest."""
+        if not chunk:
+            return
+        known_students = self.students_repository.get_students_by_ids(record['student_id'] for _, record in chunk)
+        records = []
+        for line_number, record in chunk:
+            if record['student_id'] in known_students:
+                records.append(record)
+            else:
+                self._reject(report, line_number, f"Unknown student_id: {record['student_id']}")
+        report['rows_imported'] += self.academic_records_repository.copy_records(records)
+        report['chunks'] += 1
+
+    @staticmethod
+    def _reject(report, line_number, error):
+        report['rows_rejected'] += 1
+        if len(report['errors']) < GRADE_IMPORT_MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'error': error})
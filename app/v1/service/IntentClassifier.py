@@ -0,0 +1,197 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+from app.constants.intent_classification import INTENT_CLASSIFICATION_PROMPT
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the intent classifier
+logger = LogConfig.setup_logger(__name__)
+
+INTENT_LOCAL_MIN_SCORE = float(os.getenv("INTENT_LOCAL_MIN_SCORE", "0.45"))  # best intent score to answer locally
+INTENT_LOCAL_MIN_MARGIN = float(os.getenv("INTENT_LOCAL_MIN_MARGIN", "0.2"))  # lead over the runner-up
+INTENT_RETRAIN_INTERVAL = float(os.getenv("INTENT_RETRAIN_INTERVAL", "300"))  # min seconds between retrains
+INTENT_MAX_LEARNED_EXAMPLES = int(os.getenv("INTENT_MAX_LEARNED_EXAMPLES", "5000"))
+
+INTENTS = ('attendance', 'activity', 'behaviour', 'grade', 'general_question')
+
+# Strong lexical cues; a match adds RULE_WEIGHT to the intent's similarity score.
+INTENT_RULES = {
+    'attendance': re.compile(r"\b(attend\w*|absen\w*|present|late|tardy|miss(ed)? (school|class)|leave|truan\w*)\b"),
+    'activity': re.compile(r"\b(activit\w*|extracurricular|clubs?|sports?|basketball|football|soccer|cricket|robotic\w*|"
+                           r"awards?|badges?|competitions?|tournaments?|teams?|music|dance|drama|chess)\b"),
+    'behaviour': re.compile(r"\b(behaviou?r\w*|conduct|disruptive|discipline\w*|social\w*|emotional\w*|feedback|"
+                            r"participat\w*|attitude|mood|friends?|bull\w*|polite|rude)\b"),
+    'grade': re.compile(r"\b(grades?|marks?|scores?|exams?|tests?|results?|report card|gpa|math\w*|english|physics|"
+                        r"history|science|chemistry|biology|geography|subjects?|academic\w*)\b"),
+    'general_question': re.compile(r"\b(tips?|advice|motivat\w*|encourag\w*|how (can|do|should) i|"
+                                   r"ways to|help my child|teach)\b"),
+}
+RULE_WEIGHT = 0.35
+
+STOP_WORDS = frozenset(('the', 'a', 'an', 'my', 'child', 'kid', 'son', 'daughter', 'please', 'of', 'to', 'me',
+                        'is', 'was', 'on', 'for', 'and', 'any', 'there', 'this', 'that'))
+
+Classification = namedtuple('Classification', ['intent', 'score', 'margin', 'confident'])
+
+
+def tokenize(text):
+    """Lower-case word tokens with possessives and common suffixes stripped, plus bigrams."""
+    words = []
+    for word in re.findall(r"[a-z0-9']+", text.lower()):
+        word = word.replace("'s", '').strip("'")
+        if not word or word in STOP_WORDS:
+            continue
+        for suffix, replacement in (('ies', 'y'), ('ing', ''), ('ed', ''), ('es', ''), ('s', '')):
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                word = word[:-len(suffix)] + replacement
+                break
+        words.append(word)
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def parse_prompt_examples(prompt):
+    """Extract {intent: [example questions]} from the '<Name> Intent' sections of the classification prompt."""
+    examples = {}
+    intent = None
+    for line in prompt.splitlines():
+        line = line.strip()
+        header = re.fullmatch(r"([A-Za-z ]+) Intent", line)
+        if header:
+            name = header.group(1).strip().lower().replace(' ', '_')
+            intent = name if name in INTENTS else None
+        elif line.startswith('"') and line.endswith('"'):
+            if intent:
+                examples.setdefault(intent, []).append(line.strip('"'))
+        elif line:
+            intent = None
+    return examples
+
+
+class IntentClassifier:
+    """
+    In-process chatbot intent classifier: keyword rules plus a TF-IDF nearest-centroid model.
+
+    The model is trained from the examples in INTENT_CLASSIFICATION_PROMPT and from queries the
+    LLM has already labelled. Only confident predictions (score and lead over the runner-up
+    above the configured thresholds) should be used; anything else goes to the LLM, whose
+    answer is fed back as a training example.
+    """
+
+    def __init__(self, seed_examples, min_score=INTENT_LOCAL_MIN_SCORE, min_margin=INTENT_LOCAL_MIN_MARGIN):
+        self.seed_examples = [(text, intent) for intent, texts in seed_examples.items() for text in texts]
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self._lock = threading.Lock()
+        self._learned = []
+        self._dirty = False
+        self._logged_examples_loaded = False
+        self._trained_at = 0.0
+        self._idf = {}
+        self._centroids = {}
+        self._routes = Counter()
+        self._route_intents = Counter()
+        self.train()
+
+    @classmethod
+    def from_prompt(cls, prompt=INTENT_CLASSIFICATION_PROMPT):
+        return cls(parse_prompt_examples(prompt))
+
+    def _vectorize(self, tokens, idf):
+        counts = Counter(token for token in tokens if token in idf)
+        vector = {token: (1 + math.log(count)) * idf[token] for token, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {token: value / norm for token, value in vector.items()} if norm else {}
+
+    def train(self):
+        """Rebuild the TF-IDF model from the seed and learned examples."""
+        with self._lock:
+            examples = self.seed_examples + self._learned
+            self._dirty = False
+        documents = [(tokenize(text), intent) for text, intent in examples if intent in INTENTS]
+        document_frequency = Counter(token for tokens, _ in documents for token in set(tokens))
+        idf = {token: math.log((1 + len(documents)) / (1 + df)) + 1 for token, df in document_frequency.items()}
+
+        sums = {}
+        for tokens, intent in documents:
+            centroid = sums.setdefault(intent, Counter())
+            for token, value in self._vectorize(tokens, idf).items():
+                centroid[token] += value
+        centroids = {}
+        for intent, centroid in sums.items():
+            norm = math.sqrt(sum(value * value for value in centroid.values()))
+            centroids[intent] = {token: value / norm for token, value in centroid.items()} if norm else {}
+
+        with self._lock:
+            self._idf, self._centroids = idf, centroids
+            self._trained_at = time.monotonic()
+        logger.info(f"Trained intent classifier on {len(documents)} examples")
+
+    def learn(self, examples):
+        """Add (query, intent) examples labelled elsewhere (the LLM); they are used from the next retrain."""
+        with self._lock:
+            for text, intent in examples:
+                if intent in INTENTS and text:
+                    self._learned.append((text, intent))
+                    self._dirty = True
+            del self._learned[:-INTENT_MAX_LEARNED_EXAMPLES]
+
+    def load_logged_examples(self, loader):
+        """Once per process, learn from the queries `loader()` returns ((query, intent) pairs) and retrain."""
+        if self._logged_examples_loaded:
+            return
+        self._logged_examples_loaded = True
+        try:
+            self.learn(loader())
+            self.train()
+        except Exception as e:
+            logger.error(f"Error loading logged intent examples: {e}")
+
+    def retrain_if_due(self):
+        """Retrain when new examples have been learned and the retrain interval has passed."""
+        if self._dirty and time.monotonic() - self._trained_at >= INTENT_RETRAIN_INTERVAL:
+            self.train()
+
+    def classify(self, query):
+        """Return the most likely intent with its score, margin over the runner-up and confidence."""
+        with self._lock:
+            idf, centroids = self._idf, self._centroids
+        vector = self._vectorize(tokenize(query), idf)
+        text = query.lower()
+        scores = {}
+        for intent in INTENTS:
+            centroid = centroids.get(intent, {})
+            similarity = sum(value * centroid.get(token, 0.0) for token, value in vector.items())
+            scores[intent] = similarity + (RULE_WEIGHT if INTENT_RULES[intent].search(text) else 0.0)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (intent, score), (_, runner_up) = ranked[0], ranked[1]
+        margin = score - runner_up
+        return Classification(intent, round(score, 4), round(margin, 4),
+                              score >= self.min_score and margin >= self.min_margin)
+
+    def record_route(self, source, intent):
+        """Count whether an intent was decided locally or by the LLM."""
+        with self._lock:
+            self._routes[source] += 1
+            self._route_intents[(source, intent)] += 1
+
+    def stats(self):
+        """Return local-vs-LLM routing counters."""
+        with self._lock:
+            routes = dict(self._routes)
+            by_intent = {f"{source}:{intent}": count for (source, intent), count in self._route_intents.items()}
+            learned = len(self._learned)
+        total = sum(routes.values())
+        return {
+            'local': routes.get('local', 0),
+            'llm': routes.get('llm', 0),
+            'local_rate': round(routes.get('local', 0) / total, 4) if total else 0.0,
+            'by_intent': by_intent,
+            'learned_examples': learned
+        }
+
+
+# Shared by every request so that learned examples and routing statistics accumulate in one place.
+intent_classifier = IntentClassifier.from_prompt()
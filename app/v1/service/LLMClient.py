@@ -0,0 +1,263 @@
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from app.utils.metrics import LatencyHistogram
+from app.config.postgres_orm_config import scoped_session_factory
+from app.config.logger_config import LogConfig
+from app.v1.repository.LLMCacheRepository import LLMCacheRepository
+from app.v1.service.LLMResponseCache import LLM_CACHE_PERSISTENT, LLMResponseCache, cache_key
+
+# Set up a logger for the LLM client
+logger = LogConfig.setup_logger(__name__)
+
+LLM_API_URL = os.getenv("LLM_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))  # keep-alive connections to the API
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3.05"))  # seconds
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))  # seconds between bytes of the response
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.25"))  # seconds, doubled per attempt
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "4"))
+
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+
+def _is_valid(validate, content):
+    if validate is None:
+        return True
+    try:
+        return bool(validate(content))
+    except Exception:
+        return False
+
+
+class LLMError(Exception):
+    """Raised when the LLM API does not return a usable completion."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMMetrics:
+    """Thread-safe per-purpose call, retry, latency and token counters for LLM calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._purposes = {}
+
+    def _purpose(self, purpose):
+        if purpose not in self._purposes:
+            self._purposes[purpose] = {
+                'calls': 0,
+                'errors': 0,
+                'retries': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'latency': LatencyHistogram(),
+                'first_token_latency': LatencyHistogram()
+            }
+        return self._purposes[purpose]
+
+    def record_call(self, purpose, seconds, usage=None):
+        """Record a successful call that took `seconds` end to end (retries included)."""
+        usage = usage or {}
+        with self._lock:
+            stats = self._purpose(purpose)
+            stats['calls'] += 1
+            stats['prompt_tokens'] += usage.get('prompt_tokens') or 0
+            stats['completion_tokens'] += usage.get('completion_tokens') or 0
+            latency = stats['latency']
+        latency.observe(seconds)
+
+    def record_first_token(self, purpose, seconds):
+        """Record how long a streamed call took to produce its first content fragment."""
+        with self._lock:
+            latency = self._purpose(purpose)['first_token_latency']
+        latency.observe(seconds)
+
+    def record_error(self, purpose):
+        with self._lock:
+            self._purpose(purpose)['errors'] += 1
+
+    def record_retry(self, purpose):
+        with self._lock:
+            self._purpose(purpose)['retries'] += 1
+
+    def snapshot(self):
+        """Return a JSON-serialisable view of the counters, keyed by purpose."""
+        with self._lock:
+            purposes = {name: dict(stats) for name, stats in self._purposes.items()}
+        return {
+            name: {key: value.snapshot() if isinstance(value, LatencyHistogram) else value
+                   for key, value in stats.items()}
+            for name, stats in purposes.items()
+        }
+
+
+class LLMClient:
+    """
+    Chat-completions client for the Groq (OpenAI-compatible) API.
+
+    One requests.Session is shared by every caller, so connections (and their TLS sessions)
+    are kept alive and reused across requests. Every call has connect and read timeouts, and
+    transient failures (connection errors, timeouts, 429 and 5xx responses) are retried a
+    bounded number of times with full-jitter exponential backoff. Completions are served from
+    an optional LLMResponseCache when the same prompt has been answered before.
+    """
+
+    def __init__(self, api_url=LLM_API_URL, model=LLM_MODEL, api_key=None, pool_size=LLM_POOL_SIZE,
+                 connect_timeout=LLM_CONNECT_TIMEOUT, read_timeout=LLM_READ_TIMEOUT, max_retries=LLM_MAX_RETRIES,
+                 cache=None):
+        self.api_url = api_url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.cache = cache
+        self.metrics = LLMMetrics()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _headers(self):
+        # Read lazily so the key can come from a .env file loaded after this module is imported.
+        return {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key or os.getenv("GROQ_API_KEY")}'
+        }
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0-based), honouring a Retry-After hint."""
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+    def post(self, payload, purpose='chat', stream=False):
+        """
+        POST a chat-completions payload, retrying transient failures, and return the response.
+        Raises LLMError once the retries are exhausted or on a non-retryable error status.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(self.api_url, headers=self._headers(), json=payload,
+                                             timeout=self.timeout, stream=stream)
+                if response.status_code == 200:
+                    return response
+                error = LLMError(f"LLM API returned {response.status_code}: {response.text[:500]}", response.status_code)
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(f"LLM API request failed: {e}")
+                retryable = True
+
+            if not retryable or attempt == self.max_retries:
+                self.metrics.record_error(purpose)
+                logger.error(f"LLM call ({purpose}) failed after {attempt + 1} attempt(s): {error}")
+                raise error
+            self.metrics.record_retry(purpose)
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"LLM call ({purpose}) attempt {attempt + 1} failed, retrying in {delay:.2f}s: {error}")
+            time.sleep(delay)
+
+    def chat_completion(self, messages, purpose='chat', model=None, use_cache=True, validate=None, **params):
+        """
+        Return the content of the first choice of a chat completion for `messages`.
+        Pass use_cache=False for prompts whose answer must not be reused. When `validate` is
+        given, a completion is only cached (or served from the cache) if validate(content)
+        returns a true value without raising, so an answer the caller cannot parse is asked
+        for again next time instead of being replayed for the whole TTL.
+        """
+        model = model or self.model
+        key = None
+        if self.cache is not None and self.cache.enabled:
+            if use_cache:
+                key = cache_key(model, messages, params)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    if _is_valid(validate, cached):
+                        return cached
+                    self.cache.delete(key)
+            else:
+                self.cache.record_bypass()
+
+        started = time.perf_counter()
+        payload = {'model': model, 'messages': messages, **params}
+        response = self.post(payload, purpose)
+        try:
+            response_data = response.json()
+            content = response_data['choices'][0]['message']['content']
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            self.metrics.record_error(purpose)
+            raise LLMError(f"Unexpected LLM API response: {e}")
+        self.metrics.record_call(purpose, time.perf_counter() - started, response_data.get('usage'))
+        if key is not None:
+            if _is_valid(validate, content):
+                self.cache.set(key, content, model, purpose)
+            else:
+                self.cache.record_rejected()
+        return content
+
+    def stream_chat_completion(self, messages, purpose='chat', model=None, **params):
+        """
+        Generate the content of a streamed chat completion fragment by fragment, as the API
+        produces it. The request (and its retries) is made when the first fragment is requested;
+        closing the generator early closes the upstream connection. Streams are never cached.
+        """
+        started = time.perf_counter()
+        payload = {'model': model or self.model, 'messages': messages, 'stream': True, **params}
+        response = self.post(payload, purpose, stream=True)
+        usage = None
+        first_token = True
+        try:
+            # chunk_size=None hands lines over as they arrive instead of filling a buffer first.
+            for line in response.iter_lines(chunk_size=None):
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    break
+                try:
+                    chunk = json.loads(data)
+                    choices = chunk.get('choices') or []
+                    content = choices[0].get('delta', {}).get('content') if choices else None
+                except (ValueError, AttributeError, IndexError) as e:
+                    raise LLMError(f"Unexpected LLM API stream event: {e}")
+                # Groq reports usage on the final event under x_groq.
+                usage = chunk.get('usage') or (chunk.get('x_groq') or {}).get('usage') or usage
+                if content:
+                    if first_token:
+                        self.metrics.record_first_token(purpose, time.perf_counter() - started)
+                        first_token = False
+                    yield content
+        except requests.RequestException as e:
+            self.metrics.record_error(purpose)
+            raise LLMError(f"LLM API stream interrupted: {e}")
+        except LLMError:
+            self.metrics.record_error(purpose)
+            raise
+        finally:
+            response.close()
+        self.metrics.record_call(purpose, time.perf_counter() - started, usage)
+
+
+# Shared by every caller so that the connection pool and the response cache are shared too.
+llm_client = LLMClient(cache=LLMResponseCache(LLMCacheRepository(scoped_session_factory) if LLM_CACHE_PERSISTENT else None))
+
+
+def get_llm_metrics():
+    """Return per-purpose LLM call statistics and response cache statistics for the shared client."""
+    return {
+        'purposes': llm_client.metrics.snapshot(),
+        'cache': llm_client.cache.stats()
+    }
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from flask import has_request_context
+from app.config.unit_of_work import UnitOfWork
+from app.utils.ttl_cache import TTLCache
+from app.config.logger_config import LogConfig
+
+# Set up a logger for the LLM response cache
+logger = LogConfig.setup_logger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "2048"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds a cached response stays valid
+LLM_CACHE_PERSISTENT = os.getenv("LLM_CACHE_PERSISTENT", "0") == "1"  # also cache in app.llm_response_cache
+
+
+QUOTED_PADDING = re.compile(r'"\s*(.*?)\s*"', re.DOTALL)
+
+
+def normalize_text(text):
+    """
+    Case-fold, collapse whitespace and trim padding inside quotes (where prompt templates put
+    user text) so trivially different prompts share a cache entry.
+    """
+    return QUOTED_PADDING.sub(r'"\1"', ' '.join(str(text).split()).casefold())
+
+
+def cache_key(model, messages, params=None):
+    """Return the cache key for a chat completion: a SHA-256 of the model, parameters and normalized messages."""
+    normalized = {
+        'model': model,
+        'messages': [{'role': message['role'], 'content': normalize_text(message['content'])} for message in messages],
+        'params': params or {}
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM completions keyed by model, parameters and normalized prompt.
+
+    The in-memory tier is a bounded TTL/LRU cache local to the process. The optional persistent
+    tier (LLM_CACHE_PERSISTENT) is shared by every process through Postgres; its hits are copied
+    into the memory tier. Persistent-tier failures are logged and treated as misses.
+    """
+
+    def __init__(self, repository=None, max_size=LLM_CACHE_MEMORY_SIZE, ttl_seconds=LLM_CACHE_TTL,
+                 enabled=LLM_CACHE_ENABLED):
+        self.repository = repository
+        self.memory = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'persistent_hits': 0, 'misses': 0, 'stores': 0, 'rejected': 0, 'bypassed': 0, 'errors': 0}
+
+    @contextmanager
+    def _persistent(self):
+        """
+        Transaction for a persistent-tier call. Inside a request or UnitOfWork.scope() the
+        repository uses a savepoint of the current session; elsewhere (e.g. a worker calling the
+        LLM between scopes) the call gets a scope of its own, so no session is left idle in
+        transaction holding a pooled connection.
+        """
+        session_factory = self.repository.scoped_session_factory
+        if has_request_context() or session_factory.registry.has():
+            yield
+        else:
+            with UnitOfWork.scope(session_factory):
+                yield
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key):
+        """Return the cached response for `key`, or None."""
+        response = self.memory.get(key)
+        if response is not None:
+            self._count('hits')
+            return response
+        if self.repository is not None:
+            try:
+                with self._persistent():
+                    response = self.repository.get_response(key)
+            except Exception as e:
+                self._count('errors')
+                logger.error(f"Error reading the persistent LLM cache: {e}")
+            if response is not None:
+                self.memory.set(key, response)
+                self._count('hits')
+                self._count('persistent_hits')
+                return response
+        self._count('misses')
+        return None
+
+    def set(self, key, response, model=None, purpose=None):
+        """Store a response in every tier."""
+        self.memory.set(key, response)
+        if self.repository is not None:
+            try:
+                with self._persistent():
+                    self.repository.put_response(key, model, purpose, response, self.ttl_seconds)
+            except Exception as e:
+                self._count('errors')
+                logger.error(f"Error writing the persistent LLM cache: {e}")
+        self._count('stores')
+
+    def delete(self, key):
+        """Drop `key` from every tier."""
+        self.memory.invalidate(key)
+        if self.repository is not None:
+            try:
+                with self._persistent():
+                    self.repository.delete_response(key)
+            except Exception as e:
+                self._count('errors')
+                logger.error(f"Error deleting from the persistent LLM cache: {e}")
+
+    def record_rejected(self):
+        """Count a response that was not cached because the caller could not use it."""
+        self._count('rejected')
+
+    def record_bypass(self):
+        self._count('bypassed')
+
+    def stats(self):
+        """Return a JSON-serialisable view of the cache counters."""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'enabled': self.enabled,
+            'persistent': self.repository is not None,
+            **counters,
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else 0.0,
+            'memory': self.memory.stats()
+        }
@@ -0,0 +1,259 @@
+import ast
+import datetime
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config.unit_of_work import UnitOfWork
+from app.config.logger_config import LogConfig
+from app.constants.sentiment_analysis import BATCH_SENTIMENT_ANALYSIS_PROMPT, SENTIMENT_ANALYSIS_PROMPT
+from app.utils.token_budget import estimate_tokens
+from app.v1.service.LLMClient import LLMError
+
+# Set up a logger for this service
+logger = LogConfig.setup_logger(__name__)
+
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "20"))  # records claimed per transaction
+SENTIMENT_MAX_ATTEMPTS = int(os.getenv("SENTIMENT_MAX_ATTEMPTS", "5"))
+SENTIMENT_LEASE_SECONDS = int(os.getenv("SENTIMENT_LEASE_SECONDS", "120"))  # claim held while a batch is scored
+SENTIMENT_RETRY_DELAY = int(os.getenv("SENTIMENT_RETRY_DELAY", "30"))  # seconds, doubled per failed attempt
+SENTIMENT_PROMPT_MAX_ITEMS = int(os.getenv("SENTIMENT_PROMPT_MAX_ITEMS", "25"))  # observations packed into one LLM call
+SENTIMENT_PROMPT_TOKEN_BUDGET = int(os.getenv("SENTIMENT_PROMPT_TOKEN_BUDGET", "3000"))  # observation tokens per call
+PACKED_ITEM_OVERHEAD_TOKENS = 25  # JSON framing of an item plus its share of the response
+
+# behaviour_type used when the model does not name one, as the synchronous endpoints did.
+DEFAULT_BEHAVIOUR_TYPES = {'school': 'General', 'home': 'Observation'}
+
+JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+def _load_json(text, pattern):
+    match = pattern.search(text or '')
+    if not match:
+        raise ValueError('No JSON in sentiment response')
+    try:
+        return json.loads(match.group(0))
+    except ValueError:
+        try:
+            return ast.literal_eval(match.group(0))
+        except (SyntaxError, ValueError):
+            raise ValueError('Sentiment response is not valid JSON')
+
+def _sentiment_result(data):
+    if not isinstance(data, dict):
+        raise ValueError('Sentiment result is not a JSON object')
+    try:
+        score = float(data['sentiment_score'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Sentiment result has no numeric sentiment_score')
+    behavior_type = data.get('behavior_type')
+    return (str(behavior_type)[:255] if behavior_type else None), max(-1.0, min(1.0, score))
+
+def parse_sentiment_response(text):
+    """
+    Parse the JSON object SENTIMENT_ANALYSIS_PROMPT asks for, tolerating code fences or prose
+    around it; single-quoted (Python literal) objects are accepted too, but nothing is evaluated.
+    Returns (behavior_type or None, sentiment_score clamped to -1..1).
+    Raises ValueError when the response has no usable score.
+    """
+    return _sentiment_result(_load_json(text, JSON_OBJECT))
+
+def parse_batch_sentiment_response(text):
+    """
+    Parse the JSON array BATCH_SENTIMENT_ANALYSIS_PROMPT asks for into {id: (behavior_type, score)}.
+    Malformed items are left out, so callers must handle ids that are missing.
+    """
+    items = _load_json(text, JSON_ARRAY)
+    if not isinstance(items, list):
+        raise ValueError('Batch sentiment response is not a JSON array')
+    results = {}
+    for item in items:
+        try:
+            results[int(item['id'])] = _sentiment_result(item)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
+
+def pack_observations(texts, max_items=SENTIMENT_PROMPT_MAX_ITEMS, token_budget=SENTIMENT_PROMPT_TOKEN_BUDGET):
+    """Split texts into as few groups (lists of indexes) as the per-call item and token limits allow."""
+    groups, group, group_tokens = [], [], 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text) + PACKED_ITEM_OVERHEAD_TOKENS
+        if group and (len(group) >= max_items or group_tokens + tokens > token_budget):
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(index)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+class SentimentScoringService:
+    """
+    Scores behaviour observations off the request path. Endpoints store records with
+    sentiment_status 'pending' and call submit() after commit; a single background drain then
+    claims pending records in batches (FOR UPDATE SKIP LOCKED, so several processes can run
+    it), scores each batch with as few packed LLM calls as possible and writes behaviour_type
+    and sentiment_score back. Failed calls are retried with
+    backoff until SENTIMENT_MAX_ATTEMPTS, after which the record is marked 'failed'.
+
+    When a drain ends with records still waiting for a retry (or held by an expired lease), a
+    timer schedules the next drain for the earliest of them. start() drains once when the
+    process begins serving, which picks up records left pending by a restart, so no external
+    worker is needed; 'flask behaviour score-sentiment --watch' can still run as one.
+    """
+
+    def __init__(self, behavior_records_repository, llm_client, batch_size=SENTIMENT_BATCH_SIZE):
+        self.behavior_records_repository = behavior_records_repository
+        self.llm_client = llm_client
+        self.batch_size = batch_size
+        self.executor = None
+        self._lock = threading.Lock()
+        self._queued = False
+        self._started = False
+        self._timer = None
+        self._timer_at = None
+
+    def start(self):
+        """Drain once when the process starts serving; later calls do nothing."""
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.submit()
+
+    def submit(self):
+        """Schedule a drain of the pending queue unless one is already waiting to run."""
+        with self._lock:
+            if self._queued:
+                return
+            self._queued = True
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sentiment-scoring')
+        self.executor.submit(self._drain)
+
+    def _drain(self):
+        with self._lock:
+            self._queued = False
+        try:
+            self.drain()
+        except Exception as e:
+            logger.error(f"Error scoring pending behavior records: {e}")
+        try:
+            self._schedule_retry()
+        except Exception as e:
+            logger.error(f"Error scheduling the next sentiment retry: {e}")
+
+    def _schedule_retry(self):
+        """Arm a timer that drains again when the earliest waiting record becomes claimable."""
+        with UnitOfWork.scope():
+            retry_at = self.behavior_records_repository.get_next_sentiment_retry_at()
+        if retry_at is None:
+            return
+        delay = max(1.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds() + 1)
+        with self._lock:
+            if self._timer is not None and self._timer.is_alive() and self._timer_at <= retry_at:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.submit)
+            self._timer.daemon = True
+            self._timer_at = retry_at
+            self._timer.start()
+        logger.info(f"Next sentiment scoring retry in {delay:.0f}s")
+
+    def drain(self):
+        """Score claimable pending records until none are left. Returns {'scored': n, 'retrying': n, 'failed': n}."""
+        outcomes = {'scored': 0, 'retrying': 0, 'failed': 0}
+        while True:
+            batch_outcomes = self.score_batch()
+            if not batch_outcomes:
+                return outcomes
+            for outcome in batch_outcomes:
+                outcomes[outcome] += 1
+
+    def score_batch(self):
+        """Claim and score one batch. Returns the outcome of each claimed record."""
+        with UnitOfWork.scope():
+            claimed = self.behavior_records_repository.claim_pending_sentiment(self.batch_size, SENTIMENT_LEASE_SECONDS)
+        # The lease, not a held transaction, keeps other workers away while the LLM is called.
+        results = self.score_texts([comment or '' for _, _, comment, _ in claimed])
+        for (record_id, _, _, attempts), result in zip(claimed, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scoring behavior record {record_id} (attempt {attempts}): {result}")
+        with UnitOfWork.scope():
+            return [self._save(record, result) for record, result in zip(claimed, results)]
+
+    def score_text(self, observation_text):
+        """Score one observation synchronously. Returns (behavior_type or None, sentiment_score)."""
+        prompt = SENTIMENT_ANALYSIS_PROMPT.format(text=observation_text)
+        response = self.llm_client.chat_completion(
+            [{'role': 'user', 'content': prompt}], purpose='sentiment', validate=parse_sentiment_response
+        )
+        return parse_sentiment_response(response)
+
+    def score_texts(self, texts):
+        """
+        Score many observations, packing them into as few LLM calls as the per-call limits allow.
+        Returns, in order, a (behavior_type or None, sentiment_score) tuple or the exception
+        explaining why that observation could not be scored.
+        """
+        results = [None] * len(texts)
+        for group in pack_observations(texts):
+            if len(group) == 1:
+                try:
+                    results[group[0]] = self.score_text(texts[group[0]])
+                except (LLMError, ValueError) as e:
+                    results[group[0]] = e
+                continue
+            # Ids are positions within the group, so they stay short and carry nothing identifying.
+            items = [{'id': position, 'text': texts[index]} for position, index in enumerate(group, 1)]
+            prompt = BATCH_SENTIMENT_ANALYSIS_PROMPT.format(texts=json.dumps(items, ensure_ascii=False, indent=1))
+            try:
+                # Only cache an answer that scores every item; a partial one is asked for again on retry.
+                response = self.llm_client.chat_completion(
+                    [{'role': 'user', 'content': prompt}], purpose='sentiment_batch',
+                    validate=lambda text, ids=set(range(1, len(group) + 1)): ids <= parse_batch_sentiment_response(text).keys()
+                )
+                parsed = parse_batch_sentiment_response(response)
+            except (LLMError, ValueError) as e:
+                for index in group:
+                    results[index] = e
+                continue
+            for position, index in enumerate(group, 1):
+                results[index] = parsed.get(position) or ValueError('Batch sentiment response has no result for this text')
+        return results
+
+    @staticmethod
+    def scored_fields(source, result):
+        """Record columns for a successful (behavior_type, sentiment_score) result."""
+        behavior_type, sentiment_score = result
+        return {
+            'behaviour_type': behavior_type or DEFAULT_BEHAVIOUR_TYPES.get(source),
+            'sentiment_score': sentiment_score,
+            'sentiment_status': 'scored',
+            'sentiment_retry_at': None,
+            'sentiment_error': None
+        }
+
+    def _save(self, record, result):
+        record_id, source, comment, attempts = record
+        if not isinstance(result, Exception):
+            self.behavior_records_repository.save_sentiment(record_id, self.scored_fields(source, result))
+            return 'scored'
+        if attempts >= SENTIMENT_MAX_ATTEMPTS:
+            self.behavior_records_repository.save_sentiment(record_id, {
+                'sentiment_status': 'failed',
+                'sentiment_retry_at': None,
+                'sentiment_error': str(result)[:500]
+            })
+            return 'failed'
+        delay = SENTIMENT_RETRY_DELAY * (2 ** (attempts - 1))
+        self.behavior_records_repository.save_sentiment(record_id, {
+            'sentiment_retry_at': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delay),
+            'sentiment_error': str(result)[:500]
+        })
+        return 'retrying'
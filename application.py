@@ -16,7 +16,13 @@ from app.v1.controller.StudentsController import students_bp
 from app.v1.controller.ChatbotConversationsController import chatbot_conversations_bp
 from app.v1.controller.EventAssessmentController import event_assessment_bp
 from app.v1.controller.AudioResourceController import audio_resource_bp
+from app.v1.command.AudioCommands import audio_cli
+from app.v1.command.BehaviourCommands import behaviour_cli
+from app.v1.command.DatabaseCommands import database_cli
+from app.v1.command.GradeCommands import grades_cli
+from app.v1.command.LLMCommands import llm_cli
 from app.config.auth import Auth
+from app.config.unit_of_work import UnitOfWork
 from datetime import timedelta
 from flask_cors import CORS
 
@@ -35,6 +41,9 @@ jwt = JWTManager(app)
 # Initialize the Auth class with the app
 auth = Auth(app)
 
+# Share one session per request and commit/rollback at the request boundary
+unit_of_work = UnitOfWork(app)
+
 # Get the 'werkzeug' logger
 werkzeug_logger = logging.getLogger('werkzeug')
 werkzeug_logger.setLevel(logging.INFO)
@@ -68,6 +77,13 @@ app.register_blueprint(chatbot_conversations_bp, url_prefix="/edu-platform/v1")
 app.register_blueprint(event_assessment_bp, url_prefix="/edu-platform/v1")
 app.register_blueprint(audio_resource_bp, url_prefix="/edu-platform/v1")
 
+# Register the CLI command groups (flask db ..., flask grades ..., flask audio ..., flask llm ..., flask behaviour ...)
+app.cli.add_command(database_cli)
+app.cli.add_command(grades_cli)
+app.cli.add_command(audio_cli)
+app.cli.add_command(llm_cli)
+app.cli.add_command(behaviour_cli)
+
 if __name__ == '__main__':
     debug = os.getenv("FLask_DEBUG", "0") == "1"
     app.run(host="0.0.0.0", port=5000, debug=debug)
@@ -0,0 +1,38 @@
+-- migrate:no-transaction
+-- Composite indexes backing the repository access paths. Built CONCURRENTLY so that
+-- applying them does not block attendance and grade writes during school hours.
+
+-- Users: teacher/parent listings
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_role ON app.users (role);
+
+-- Students: class rosters
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_students_class_section ON app.students (class_value, section);
+
+-- Per-student records, filtered and ordered by date
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_academic_records_student_date ON app.academic_records (student_id, record_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_student_id ON app.activities (student_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_student_date ON app.attendance (student_id, attendance_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_behavior_records_student_date ON app.behavior_records (student_id, record_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_talent_profiles_student_id ON app.talent_profiles (student_id);
+
+-- Chatbot history lookups
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chatbot_conversations_user_conversation_created ON app.chatbot_conversations (user_id, conversation_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chatbot_conversations_conversation_id ON app.chatbot_conversations (conversation_id);
+
+-- Community forum: top-level topics and replies are always queried separately
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_community_forum_topics ON app.community_forum (created_at, id) WHERE is_reply = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_community_forum_replies ON app.community_forum (forum_id) WHERE is_reply = true;
+
+-- Class/section calendars and resources
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_events_class_section_date ON app.events (class_value, section, event_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assessments_class_section_date ON app.assessments (class_value, section, assessment_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_time_table_class_section ON app.time_table (class_value, section);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audio_resources_class_section ON app.audio_resources (class_value, section);
+
+-- Notifications inbox
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_user_id ON app.notifications (user_id);
+
+-- Parent/teacher chat threads, plus a partial index for unread messages
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parent_teacher_chat_teacher_parent ON app.parent_teacher_chat (teacher_id, parent_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parent_teacher_chat_parent_id ON app.parent_teacher_chat (parent_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parent_teacher_chat_unread ON app.parent_teacher_chat (teacher_id, parent_id) WHERE is_read = false;
@@ -0,0 +1,19 @@
+-- migrate:no-transaction
+-- Attendance may only be marked once per student per day. Bulk roll-call relies on this
+-- constraint to skip rows that were already recorded (INSERT ... ON CONFLICT DO NOTHING).
+--
+-- Pause attendance writes while this runs. A duplicate marked between the DELETE and the index
+-- build fails the build and leaves an INVALID index; `flask db migrate` then drops that index
+-- and runs this file again, but keeps failing if duplicates keep arriving.
+
+-- Keep the most recent mark where a student was recorded more than once on the same day
+DELETE FROM app.attendance a
+USING app.attendance b
+WHERE a.student_id = b.student_id
+  AND a.attendance_date = b.attendance_date
+  AND a.id < b.id;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_attendance_student_date ON app.attendance (student_id, attendance_date);
+
+-- The unique index covers the same (student_id, attendance_date) lookups
+DROP INDEX CONCURRENTLY IF EXISTS app.ix_attendance_student_date;
@@ -0,0 +1,16 @@
+-- migrate:no-transaction
+-- Indexes matching the (created_at, id) keyset order of the paginated list endpoints.
+-- Where a new index extends an existing one, the old index is dropped afterwards.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_role_created ON app.users (role, created_at, id);
+DROP INDEX CONCURRENTLY IF EXISTS app.ix_users_role;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_community_poll_created ON app.community_poll (created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chatbot_conversations_user_created ON app.chatbot_conversations (user_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parent_teacher_chat_teacher_parent_created ON app.parent_teacher_chat (teacher_id, parent_id, created_at, chat_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parent_teacher_chat_teacher_created ON app.parent_teacher_chat (teacher_id, created_at, chat_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_parent_teacher_chat_parent_created ON app.parent_teacher_chat (parent_id, created_at, chat_id);
+DROP INDEX CONCURRENTLY IF EXISTS app.ix_parent_teacher_chat_teacher_parent;
+DROP INDEX CONCURRENTLY IF EXISTS app.ix_parent_teacher_chat_parent_id;
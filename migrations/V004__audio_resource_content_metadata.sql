@@ -0,0 +1,25 @@
+-- Content metadata for streaming audio downloads: the MIME type served as Content-Type and
+-- the SHA-256 of the bytes served as a strong ETag.
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS mime_type VARCHAR(100);
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64);
+
+UPDATE app.audio_resources
+SET content_sha256 = encode(sha256(audio_data), 'hex')
+WHERE content_sha256 IS NULL;
+
+UPDATE app.audio_resources
+SET mime_type = CASE
+    WHEN substring(audio_data FROM 1 FOR 4) = '\x52494646'::bytea THEN 'audio/wav'
+    WHEN substring(audio_data FROM 1 FOR 3) = '\x494433'::bytea THEN 'audio/mpeg'
+    WHEN substring(audio_data FROM 1 FOR 2) IN ('\xfffb'::bytea, '\xfff3'::bytea, '\xfff2'::bytea) THEN 'audio/mpeg'
+    WHEN substring(audio_data FROM 1 FOR 4) = '\x4f676753'::bytea THEN 'audio/ogg'
+    WHEN substring(audio_data FROM 1 FOR 4) = '\x664c6143'::bytea THEN 'audio/flac'
+    WHEN substring(audio_data FROM 1 FOR 4) = '\x1a45dfa3'::bytea THEN 'audio/webm'
+    WHEN substring(audio_data FROM 5 FOR 4) = '\x66747970'::bytea THEN 'audio/mp4'
+    ELSE 'application/octet-stream'
+END
+WHERE mime_type IS NULL;
+
+-- Audio is already compressed: store it out of line without pglz so that ranged reads
+-- (substring) only fetch the TOAST chunks they need. Applies to rows written from now on.
+ALTER TABLE app.audio_resources ALTER COLUMN audio_data SET STORAGE EXTERNAL;
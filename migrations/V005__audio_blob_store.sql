@@ -0,0 +1,23 @@
+-- Audio content moves out of app.audio_resources into a content-addressed blob store. Rows keep
+-- the content hash, size, duration and MIME type; app.audio_blobs reference-counts the stored
+-- blobs so that deleting the last resource that uses one lets it be garbage collected.
+CREATE TABLE IF NOT EXISTS app.audio_blobs (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    size_bytes BIGINT NOT NULL,
+    mime_type VARCHAR(100),
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_audio_blobs_unreferenced ON app.audio_blobs (sha256) WHERE ref_count = 0;
+
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS size_bytes BIGINT;
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS duration_seconds DOUBLE PRECISION;
+ALTER TABLE app.audio_resources ALTER COLUMN audio_data DROP NOT NULL;
+
+UPDATE app.audio_resources
+SET size_bytes = octet_length(audio_data)
+WHERE size_bytes IS NULL AND audio_data IS NOT NULL;
+
+-- Existing rows keep their inline audio_data until `flask audio export-blobs` copies it into the
+-- blob store and clears the column.
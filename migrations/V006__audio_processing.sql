@@ -0,0 +1,14 @@
+-- Results of the background audio processing stage: analysis (duration is already a column),
+-- a waveform summary for listings and an optional compact speech-optimised rendition.
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS processing_status VARCHAR(20) NOT NULL DEFAULT 'pending';
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS processing_error TEXT;
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS sample_rate INTEGER;
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS channels INTEGER;
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS waveform JSONB;
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS compact_sha256 VARCHAR(64);
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS compact_size_bytes BIGINT;
+ALTER TABLE app.audio_resources ADD COLUMN IF NOT EXISTS compact_mime_type VARCHAR(100);
+
+-- Existing recordings start out pending; `flask audio process` works through them.
+CREATE INDEX IF NOT EXISTS ix_audio_resources_processing_pending
+    ON app.audio_resources (id) WHERE processing_status = 'pending';
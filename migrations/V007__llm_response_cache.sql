@@ -0,0 +1,11 @@
+-- Persistent tier of the LLM response cache, shared by every application process.
+CREATE TABLE IF NOT EXISTS app.llm_response_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    purpose VARCHAR(50),
+    response TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_llm_response_cache_expires_at ON app.llm_response_cache (expires_at);
@@ -0,0 +1,7 @@
+-- Record which intent each chatbot query was routed to and whether the local classifier or the
+-- LLM decided it. LLM-labelled queries are training examples for the local classifier.
+ALTER TABLE app.chatbot_conversations ADD COLUMN IF NOT EXISTS intent VARCHAR(30);
+ALTER TABLE app.chatbot_conversations ADD COLUMN IF NOT EXISTS intent_source VARCHAR(10);
+
+CREATE INDEX IF NOT EXISTS ix_chatbot_conversations_llm_intents
+    ON app.chatbot_conversations (id) WHERE intent_source = 'llm';
@@ -0,0 +1,10 @@
+-- Behaviour observations are stored before their sentiment is known; a background worker
+-- scores the pending rows. Rows logged before this migration were scored synchronously.
+ALTER TABLE app.behavior_records ADD COLUMN IF NOT EXISTS sentiment_status VARCHAR(10) NOT NULL DEFAULT 'scored';
+ALTER TABLE app.behavior_records ALTER COLUMN sentiment_status SET DEFAULT 'pending';
+ALTER TABLE app.behavior_records ADD COLUMN IF NOT EXISTS sentiment_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE app.behavior_records ADD COLUMN IF NOT EXISTS sentiment_retry_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE app.behavior_records ADD COLUMN IF NOT EXISTS sentiment_error TEXT;
+
+CREATE INDEX IF NOT EXISTS ix_behavior_records_sentiment_pending
+    ON app.behavior_records (id) WHERE sentiment_status = 'pending';
@@ -0,0 +1,2 @@
+-- Estimated token size of the student data context sent with each chatbot answer prompt.
+ALTER TABLE app.chatbot_conversations ADD COLUMN IF NOT EXISTS context_tokens INTEGER;
@@ -0,0 +1,14 @@
+-- Rolling per-conversation summaries for the chatbot's memory. summarized_through_id is the
+-- id of the newest app.chatbot_conversations turn folded into the summary.
+CREATE TABLE IF NOT EXISTS app.chatbot_conversation_summaries (
+    conversation_id UUID PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES app.users (id) ON DELETE CASCADE,
+    summary TEXT NOT NULL,
+    summarized_through_id INTEGER NOT NULL,
+    turns_summarized INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
+
+-- Turns of one conversation in id order, for the raw window and the summary watermark.
+CREATE INDEX IF NOT EXISTS ix_chatbot_conversations_conversation_turns
+    ON app.chatbot_conversations (conversation_id, id);
@@ -0,0 +1,13 @@
+-- One row per vote, deduplicated per user by the primary key, instead of read-modify-write
+-- updates of the JSON counts in app.community_poll.votes (which lost concurrent votes).
+-- Counts already in app.community_poll.votes are kept as the baseline for existing polls.
+CREATE TABLE IF NOT EXISTS app.community_poll_votes (
+    poll_id INTEGER NOT NULL REFERENCES app.community_poll (id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES app.users (id) ON DELETE CASCADE,
+    option VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    PRIMARY KEY (poll_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_community_poll_votes_poll_option
+    ON app.community_poll_votes (poll_id, option);
@@ -0,0 +1,4 @@
+-- Poll options are not limited to 255 characters, so a vote for a long option failed the insert.
+-- New polls cap options at POLL_OPTION_MAX_LENGTH characters, which keeps them within the
+-- btree entry limit of ix_community_poll_votes_poll_option.
+ALTER TABLE app.community_poll_votes ALTER COLUMN option TYPE TEXT;
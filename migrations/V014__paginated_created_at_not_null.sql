@@ -0,0 +1,18 @@
+-- The paginated list endpoints order by (created_at, id). A NULL created_at sorted first in
+-- DESC order, never matched the keyset comparison and produced an undecodable cursor, so the
+-- columns get a database default and become NOT NULL. Rows written without a timestamp take
+-- their updated_at where there is one and the epoch otherwise, i.e. they page as the oldest.
+UPDATE app.users SET created_at = COALESCE(updated_at, to_timestamp(0)) WHERE created_at IS NULL;
+ALTER TABLE app.users ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE app.community_poll SET created_at = COALESCE(updated_at, to_timestamp(0)) WHERE created_at IS NULL;
+ALTER TABLE app.community_poll ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE app.community_forum SET created_at = COALESCE(updated_at, to_timestamp(0)) WHERE created_at IS NULL;
+ALTER TABLE app.community_forum ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE app.parent_teacher_chat SET created_at = to_timestamp(0) WHERE created_at IS NULL;
+ALTER TABLE app.parent_teacher_chat ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE app.chatbot_conversations SET created_at = to_timestamp(0) WHERE created_at IS NULL;
+ALTER TABLE app.chatbot_conversations ALTER COLUMN created_at SET DEFAULT now(), ALTER COLUMN created_at SET NOT NULL;
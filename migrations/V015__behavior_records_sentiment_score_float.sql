@@ -0,0 +1,2 @@
+-- Sentiment scores are fractions in -1..1 but the column was INTEGER, so 0.85 was stored as 1.
+ALTER TABLE app.behavior_records ALTER COLUMN sentiment_score TYPE DOUBLE PRECISION;
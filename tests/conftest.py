@@ -0,0 +1,38 @@
+# Run with `pip install pytest && python -m pytest` against a database migrated with `flask db migrate`.
+# Without DB_USERNAME (or an unreachable database) the database tests are skipped.
+import os
+import pytest
+from sqlalchemy import text
+
+@pytest.fixture(scope='session')
+def app():
+    """The Flask application, bound to the database configured in the environment (or .env)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    if not os.environ.get("DB_USERNAME"):
+        pytest.skip("DB_USERNAME is not set; these tests need a migrated Postgres database")
+
+    import application
+    from app.config.postgres_orm_config import engine
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"Postgres is not reachable: {e}")
+    application.app.config['TESTING'] = True
+    return application.app
+
+@pytest.fixture(scope='session')
+def engine(app):
+    from app.config.postgres_orm_config import engine
+    return engine
+
+@pytest.fixture(scope='session')
+def auth_header(app):
+    """Return Authorization headers carrying an access token for a user id."""
+    from flask_jwt_extended import create_access_token
+
+    def header(user_id):
+        with app.app_context():
+            return {'Authorization': f"Bearer {create_access_token(identity=str(user_id))}"}
+    return header
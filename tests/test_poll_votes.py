@@ -0,0 +1,84 @@
+import threading
+import uuid
+import pytest
+from sqlalchemy import text
+
+POLLS_URL = '/edu-platform/v1/api/community/polls'
+VOTERS = 40
+
+@pytest.fixture
+def voters(engine):
+    """A student and VOTERS parent accounts, removed again (with their polls and votes) afterwards."""
+    tag = uuid.uuid4().hex[:12]
+    with engine.begin() as connection:
+        student_id = connection.execute(text(
+            "INSERT INTO app.students (id, student_id, student_name, parent_name, class_value, section) "
+            "SELECT COALESCE(MAX(id), 0) + 1, COALESCE(MAX(student_id), 0) + 1, 'Poll Test', 'Poll Test', '5', 'A' "
+            "FROM app.students RETURNING student_id"
+        )).scalar()
+        user_ids = [connection.execute(text(
+            "INSERT INTO app.users (name, email, password_hash, role, language, student_id) "
+            "VALUES (:name, :email, 'x', 'parent', 'en', :student_id) RETURNING id"
+        ), {'name': f"Voter {i}", 'email': f"voter-{i}-{tag}@example.test", 'student_id': student_id}).scalar()
+            for i in range(VOTERS)]
+    yield user_ids
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM app.users WHERE id = ANY(:ids)"), {'ids': user_ids})
+        connection.execute(text("DELETE FROM app.students WHERE student_id = :id"), {'id': student_id})
+
+def create_poll(app, auth_header, user_id):
+    response = app.test_client().post(
+        POLLS_URL, json={'question': 'Field trip in May?', 'options': ['Yes', 'No']}, headers=auth_header(user_id)
+    )
+    assert response.status_code == 201, response.get_data(as_text=True)
+    return response.get_json()['poll_id']
+
+def test_concurrent_votes_are_counted_exactly_once_per_user(app, engine, auth_header, voters):
+    poll_id = create_poll(app, auth_header, voters[0])
+    choices = {user_id: 'No' if i % 4 == 0 else 'Yes' for i, user_id in enumerate(voters)}
+    headers = {user_id: auth_header(user_id) for user_id in voters}
+    barrier = threading.Barrier(VOTERS * 2)
+    statuses = {user_id: [] for user_id in voters}
+
+    def vote(user_id):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post(POLLS_URL, json={'poll_id': poll_id, 'selected_option': choices[user_id]},
+                               headers=headers[user_id])
+        statuses[user_id].append(response.status_code)
+
+    # Every voter votes twice, both at once and alongside everyone else; only one vote may count.
+    threads = [threading.Thread(target=vote, args=(user_id,)) for user_id in voters for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(sorted(codes) == [200, 409] for codes in statuses.values()), statuses
+
+    with engine.connect() as connection:
+        rows = connection.execute(text(
+            "SELECT user_id, option FROM app.community_poll_votes WHERE poll_id = :poll_id"
+        ), {'poll_id': poll_id}).all()
+    assert dict(rows) == choices
+
+    expected = {'Yes': sum(1 for c in choices.values() if c == 'Yes'), 'No': sum(1 for c in choices.values() if c == 'No')}
+    with app.app_context():
+        from app.v1.controller.CommunityPulseController import community_poll_repository, poll_vote_totals
+        from app.config.unit_of_work import UnitOfWork
+        with UnitOfWork.scope():
+            poll = community_poll_repository.get_poll_by_id(poll_id)
+            totals = poll_vote_totals(poll, community_poll_repository.get_vote_counts([poll_id])[poll_id])
+    assert totals == expected
+
+def test_votes_for_unknown_polls_or_options_are_rejected(app, auth_header, voters):
+    poll_id = create_poll(app, auth_header, voters[0])
+    client = app.test_client()
+    headers = auth_header(voters[1])
+
+    response = client.post(POLLS_URL, json={'poll_id': poll_id, 'selected_option': 'Maybe'}, headers=headers)
+    assert response.status_code == 400
+    response = client.post(POLLS_URL, json={'poll_id': poll_id + 1000000, 'selected_option': 'Yes'}, headers=headers)
+    assert response.status_code == 404
+    response = client.post(POLLS_URL, json={'poll_id': poll_id, 'selected_option': 'Yes'}, headers=headers)
+    assert response.status_code == 200